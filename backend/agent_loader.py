@@ -0,0 +1,167 @@
+# backend/agent_loader.py
+import os
+import time
+import logging
+import importlib
+import threading
+from collections.abc import Mapping
+
+# Agent functions by category and ID, as (module, function name). Async
+# counterparts live in the same module under the "a"-prefixed name.
+AGENT_SPECS = {
+    "blog": {
+        "1": ("ai_agents.blog1", "blog1"),
+        "2": ("ai_agents.blog2", "blog2"),
+        "3": ("ai_agents.blog3", "blog3"),
+        "4": ("ai_agents.blog4", "blog4"),
+    },
+    "linkedin": {
+        "1": ("ai_agents.linkedin1", "linkedin_post1"),
+        "2": ("ai_agents.linkedin2", "linkedin_post2"),
+        "3": ("ai_agents.linkedin3", "linkedin_post3"),
+        "4": ("ai_agents.linkedin4", "linkedin_post4"),
+    },
+    "travel": {
+        "1": ("ai_agents.travel1", "itinerary1"),
+        "2": ("ai_agents.travel2", "itinerary2"),
+        "3": ("ai_agents.travel3", "itinerary3"),
+        "4": ("ai_agents.travel4", "itinerary4"),
+    },
+    "youtube": {
+        "1": ("ai_agents.youtube1", "youtube_summarizer1"),
+        "2": ("ai_agents.youtube2", "youtube_summarizer2"),
+        "3": ("ai_agents.youtube3", "youtube_summarizer3"),
+        "4": ("ai_agents.youtube4", "youtube_summarizer4"),
+    },
+}
+
+# Agents imported at boot rather than on first use: "all", or a comma-separated
+# list of categories ("blog") and single agents ("youtube:3")
+WARM_ON_BOOT = os.getenv("AGENT_WARM_ON_BOOT", "")
+
+_import_lock = threading.Lock()
+_import_seconds = {}
+
+
+
+class AgentLoadError(RuntimeError):
+    """An agent's module failed to import; kept apart from KeyError, which means no such agent."""
+
+
+# Filled in by record_boot once the app module has finished importing
+BOOT_STATS = {}
+
+
+def _load(module_name: str, function_name: str):
+    """Imports an agent module on first use, recording how long it took."""
+    if module_name not in _import_seconds:
+        with _import_lock:
+            if module_name not in _import_seconds:
+                start = time.perf_counter()
+                importlib.import_module(module_name)
+                _import_seconds[module_name] = time.perf_counter() - start
+                logging.info("Loaded %s in %.3fs", module_name, _import_seconds[module_name])
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+class LazyAgents(Mapping):
+    """
+    The agents of one category, keyed by ID. Looking an agent up imports its
+    module (and with it the provider SDK) the first time only; an import
+    failure raises AgentLoadError. Membership tests never import.
+    """
+
+    def __init__(self, specs: dict, prefix: str = ""):
+        self._specs = specs
+        self._prefix = prefix
+
+    def __getitem__(self, entry_id):
+        module_name, function_name = self._specs[entry_id]
+        try:
+            return _load(module_name, self._prefix + function_name)
+        except Exception as e:
+            raise AgentLoadError(f"could not load {module_name}.{self._prefix}{function_name}: {e}") from e
+
+    def __contains__(self, entry_id):
+        return entry_id in self._specs
+
+    def __iter__(self):
+        return iter(self._specs)
+
+    def __len__(self):
+        return len(self._specs)
+
+
+def lazy_functions(prefix: str = "") -> dict:
+    """Builds the category -> LazyAgents registry, e.g. `prefix="a"` for the async variants."""
+    return {category: LazyAgents(specs, prefix) for category, specs in AGENT_SPECS.items()}
+
+
+def warm(selection: str = WARM_ON_BOOT):
+    """Imports the agents named by `selection` (see WARM_ON_BOOT)."""
+    for item in filter(None, (part.strip() for part in selection.split(","))):
+        if item == "all":
+            targets = [spec for specs in AGENT_SPECS.values() for spec in specs.values()]
+        elif ":" in item:
+            category, entry_id = item.split(":", 1)
+            targets = [AGENT_SPECS[category][entry_id]]
+        else:
+            targets = list(AGENT_SPECS[item].values())
+        for module_name, function_name in targets:
+            _load(module_name, function_name)
+
+
+def record_boot(started: float):
+    """
+    Startup timing hook: logs how long the app took to import (including any
+    warm-on-boot agents) and the worker's RSS once it is ready to serve.
+    """
+    BOOT_STATS.update(
+        pid=os.getpid(),
+        import_seconds=round(time.perf_counter() - started, 3),
+        rss_mb=current_rss_mb(),
+        warmed=sorted(_import_seconds),
+    )
+    logging.warning(
+        "Worker %s booted in %.3fs, RSS %.1f MB, warmed %d agent module(s)",
+        BOOT_STATS["pid"], BOOT_STATS["import_seconds"], BOOT_STATS["rss_mb"], len(BOOT_STATS["warmed"]),
+    )
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (Linux), or the peak RSS elsewhere."""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError):
+        import resource
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def memory_mb() -> dict:
+    """
+    RSS, PSS and USS (pages private to this process) in MB, from Linux's
+    smaps_rollup. With forked workers USS is the true per-worker cost: pages
+    still shared copy-on-write with the master count towards RSS only.
+    """
+    fields = {}
+    try:
+        with open("/proc/self/smaps_rollup") as rollup:
+            for line in rollup:
+                name, _, value = line.partition(":")
+                if value.strip().endswith("kB"):
+                    fields[name] = int(value.split()[0])
+    except OSError:
+        return {"rss": current_rss_mb()}
+    return {
+        "rss": round(fields["Rss"] / 1024, 1),
+        "pss": round(fields["Pss"] / 1024, 1),
+        "uss": round((fields["Private_Clean"] + fields["Private_Dirty"]) / 1024, 1),
+    }
+
+
+def loader_stats() -> dict:
+    with _import_lock:
+        loaded = {name: round(seconds, 3) for name, seconds in _import_seconds.items()}
+    return {"boot": dict(BOOT_STATS), "loaded_modules": loaded, "memory_mb": memory_mb()}
@@ -0,0 +1,66 @@
+# backend/agent_registry.py
+import os
+import threading
+from uuid import uuid4
+
+# Set to 0 to build every agent's assistants from scratch on each call
+REGISTRY_ENABLED = os.getenv("AGENT_REGISTRY_ENABLED", "1") == "1"
+
+_prototypes = {}
+_lock = threading.Lock()
+
+
+def _fresh(prototype):
+    """
+    Returns a per-call copy of a prebuilt Assistant.
+
+    The copy shares the LLM's configuration, client and registered tools but
+    gets its own memory (chat history), run ID and LLM metrics, so nothing a
+    run records leaks into other requests.
+    """
+    from phi.memory.assistant import AssistantMemory
+
+    llm = prototype.llm.model_copy(update={"metrics": {}}) if prototype.llm is not None else None
+    return prototype.model_copy(update={"memory": AssistantMemory(), "run_id": str(uuid4()), "llm": llm})
+
+
+def copy_llm(llm):
+    """
+    Returns a private deep copy of `llm` for one of several concurrent calls,
+    such as the map step of transcript summarization: a phi LLM records
+    per-run state (metrics, function calls) on itself, which concurrent calls
+    on one object would interleave. SDK and HTTP clients are pooled outside
+    the model (groq_patch, http_pool), so the copy does not open connections.
+    """
+    return llm.model_copy(deep=True)
+
+
+def get_assistants(agent_id: str, build, *args):
+    """
+    Returns fresh copies of the assistants `build(*args)` creates for
+    `agent_id`, building them (pydantic validation, tool registration) only
+    on the worker's first call with those arguments.
+    """
+    if not REGISTRY_ENABLED:
+        return build(*args)
+
+    key = (agent_id, args)
+    prototypes = _prototypes.get(key)
+    if prototypes is None:
+        with _lock:
+            prototypes = _prototypes.get(key)
+            if prototypes is None:
+                built = build(*args)
+                prototypes = built if isinstance(built, tuple) else (built,)
+                for prototype in prototypes:
+                    # Register tools on the shared LLM now, not racily on first use
+                    prototype.update_llm()
+                _prototypes[key] = prototypes
+
+    copies = tuple(_fresh(prototype) for prototype in prototypes)
+    return copies if len(copies) > 1 else copies[0]
+
+
+def registry_stats() -> dict:
+    with _lock:
+        return {"enabled": REGISTRY_ENABLED, "agents": sorted({agent_id for agent_id, _ in _prototypes})}
@@ -1,7 +1,9 @@
 from textwrap import dedent
 from azure_openai_patch import AzureOpenAIChat as OpenAIChat
 from phi.assistant import Assistant
-from phi.tools.serpapi_tools import SerpApiTools
+from agent_registry import get_assistants
+from rate_limit import ProviderError
+from ai_agents.researchers import aresearch_topic, research_topic
 import os
 import time
 from dotenv import load_dotenv
@@ -10,13 +12,34 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _assistants():
+    """Builds the writer assistant."""
+    writer = Assistant(
+        name="Writer",
+        role="Drafts a blog post based on research",
+        llm=OpenAIChat(),
+        description=dedent(
+            """\
+            You are a professional blog writer. Use the research data to draft a blog that is engaging and structured.
+            """
+        ),
+        instructions=[
+            "Draft a blog post using the research insights provided.",
+            "Ensure the blog has an introduction, structured body, and conclusion.",
+            "Include a CTA and naturally integrate relevant keywords for SEO.",
+        ],
+    )
+    return writer
+
+
 # Blog generation function
-def blog1(topic: str) -> str:
+def blog1(topic: str, stream: bool = False) -> str:
     """
     Generates a blog based on the given topic and target audience.
 
     Args:
         topic (str): The blog topic.
+        stream (bool): If True, the final stage's tokens are returned as a generator.
 
     Returns:
         str: The generated blog post.
@@ -28,50 +51,56 @@ def blog1(topic: str) -> str:
     if not serp_api_key:
         return "Error: SerpApi key is not set. Please ensure the environment variables are configured."
 
-    # Set up assistants
-    researcher = Assistant(
-        name="Researcher",
-        role="Conducts research for blog topics and gathers information",
-        llm=OpenAIChat(),
-        description=dedent(
-            """\
-            You are an expert researcher. Given a blog topic, generate a list of search terms, research the topic, 
-            and return 10 high-quality references or insights for the blog.
-            """
-        ),
-        instructions=[
-            "Generate 3 search terms for the given blog topic.",
-            "Use `search_google` to gather data for these terms.",
-            "Analyze the results and return the 10 most relevant insights or references.",
-        ],
-        tools=[SerpApiTools(api_key=serp_api_key)],
-    )
+    writer = get_assistants("blog1", _assistants)
 
-    writer = Assistant(
-        name="Writer",
-        role="Drafts a blog post based on research",
-        llm=OpenAIChat(),
-        description=dedent(
-            """\
-            You are a professional blog writer. Use the research data to draft a blog that is engaging and structured.
-            """
-        ),
-        instructions=[
-            "Draft a blog post using the research insights provided.",
-            "Ensure the blog has an introduction, structured body, and conclusion.",
-            "Include a CTA and naturally integrate relevant keywords for SEO.",
-        ],
-    )
+    try:
+        # Research phase
+        start_time = time.time()
+        research_results = research_topic("blog", topic, serp_api_key)
+
+        # Writing phase
+        blog_prompt = f"Write a blog on '{topic}' using: {research_results}"
+        blog = writer.llm.run(blog_prompt, stream=stream)
+        if stream:
+            # The caller drains the token generator and records the response time
+            return {"stream": blog, "start_time": start_time}
+
+        end_time = time.time()
+        response_time = end_time - start_time
+
+        return {
+            "content": blog if isinstance(blog, str) else str(blog),
+            "response_time": response_time,
+        }
+
+    except ProviderError:
+        raise
+    except Exception as e:
+        return {"content": f"An error occurred: {e}", "response_time": None}
+
+
+async def ablog1(topic: str, stream: bool = False) -> str:
+    """Async counterpart of `blog1`, run on the event loop by the asyncio engine."""
+    # Get SerpApi key
+    serp_api_key = os.getenv("SERPER_API_KEY")
+
+    if not serp_api_key:
+        return "Error: SerpApi key is not set. Please ensure the environment variables are configured."
+
+    writer = get_assistants("blog1", _assistants)
 
     try:
         # Research phase
         start_time = time.time()
-        research_prompt = f"Topic: {topic}"
-        research_results = researcher.llm.run(research_prompt)
+        research_results = await aresearch_topic("blog", topic, serp_api_key)
 
         # Writing phase
         blog_prompt = f"Write a blog on '{topic}' using: {research_results}"
-        blog = writer.llm.run(blog_prompt)
+        blog = await writer.llm.arun(blog_prompt, stream=stream)
+        if stream:
+            # The caller drains the token generator and records the response time
+            return {"stream": blog, "start_time": start_time}
+
         end_time = time.time()
         response_time = end_time - start_time
 
@@ -80,5 +109,7 @@ def blog1(topic: str) -> str:
             "response_time": response_time,
         }
 
+    except ProviderError:
+        raise
     except Exception as e:
         return {"content": f"An error occurred: {e}", "response_time": None}
@@ -1,7 +1,9 @@
 from textwrap import dedent
 from phi.assistant import Assistant
-from phi.tools.serpapi_tools import SerpApiTools
-from phi.llm.groq import Groq
+from groq_patch import Groq
+from agent_registry import get_assistants
+from rate_limit import ProviderError
+from ai_agents.researchers import aresearch_topic, research_topic
 import os
 import time
 from dotenv import load_dotenv
@@ -9,44 +11,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
-def blog2(topic: str) -> str:
-    """
-    Generates a blog based on the given topic and target audience using Groq and SerpAPI.
-
-    Args:
-        topic (str): The blog topic.
-
-    Returns:
-        str: The generated blog post.
-    """
-    # Get API keys
-    groq_api_key = os.getenv("GROQ_API_KEY")
-    serp_api_key = os.getenv("SERPER_API_KEY")
-
-    if not groq_api_key or not serp_api_key:
-        return "Error: API keys are not set. Please ensure the environment variables are configured."
-
-    # Set up assistants
-    researcher = Assistant(
-        name="Researcher",
-        role="Searches for blog topic-related information and generates relevant references",
-        llm=Groq(model="llama-3.3-70b-versatile"),
-        description=dedent(
-            """\
-            You are a world-class blog researcher. Given a blog topic , generate a list of search terms for finding relevant articles, research papers, and other resources.
-            Then search the web for each term, analyze the results, and return the 10 most relevant insights.
-            """
-        ),
-        instructions=[
-            "Given a blog topic , first generate a list of 3 search terms related to that topic and the audience.",
-            "For each search term, `search_google` and analyze the results.",
-            "From the results of all searches, return the 10 most relevant insights or references to inform the blog post.",
-            "Remember: the quality of the results is important.",
-        ],
-        tools=[SerpApiTools(api_key=serp_api_key)],
-        add_datetime_to_instructions=True,
-    )
-
+def _assistants():
+    """Builds the writer assistant."""
     writer = Assistant(
         name="Writer",
         role="Generates a draft blog post based on the research results",
@@ -67,20 +33,83 @@ def blog2(topic: str) -> str:
         add_chat_history_to_prompt=True,
         num_history_messages=3,
     )
+    return writer
+
+
+def blog2(topic: str, stream: bool = False) -> str:
+    """
+    Generates a blog based on the given topic and target audience using Groq and SerpAPI.
+
+    Args:
+        topic (str): The blog topic.
+        stream (bool): If True, the final stage's tokens are returned as a generator.
+
+    Returns:
+        str: The generated blog post.
+    """
+    # Get API keys
+    groq_api_key = os.getenv("GROQ_API_KEY")
+    serp_api_key = os.getenv("SERPER_API_KEY")
+
+    if not groq_api_key or not serp_api_key:
+        return "Error: API keys are not set. Please ensure the environment variables are configured."
+
+    writer = get_assistants("blog2", _assistants)
 
     try:
         # Research phase
         start_time = time.time()
 
-        research_results = researcher.run(
-            f"Research blog topic: {topic} ", stream=False
-        )
+        research_results = research_topic("blog", topic, serp_api_key)
 
         # Writing phase
         blog = writer.run(
             f"Write a blog on the topic '{topic}' using the following research:\n\n{research_results}",
-            stream=False,
+            stream=stream,
+        )
+        if stream:
+            # The caller drains the token generator and records the response time
+            return {"stream": blog, "start_time": start_time}
+
+        end_time = time.time()
+        response_time = end_time - start_time
+
+        return {
+            "blog": blog,
+            "response_time": response_time,
+        }
+
+    except ProviderError:
+        raise
+    except Exception as e:
+        return {"content": f"An error occurred: {e}", "response_time": None}
+
+
+async def ablog2(topic: str, stream: bool = False) -> str:
+    """Async counterpart of `blog2`, run on the event loop by the asyncio engine."""
+    # Get API keys
+    groq_api_key = os.getenv("GROQ_API_KEY")
+    serp_api_key = os.getenv("SERPER_API_KEY")
+
+    if not groq_api_key or not serp_api_key:
+        return "Error: API keys are not set. Please ensure the environment variables are configured."
+
+    writer = get_assistants("blog2", _assistants)
+
+    try:
+        # Research phase
+        start_time = time.time()
+
+        research_results = await aresearch_topic("blog", topic, serp_api_key)
+
+        # Writing phase
+        blog = await writer.arun(
+            f"Write a blog on the topic '{topic}' using the following research:\n\n{research_results}",
+            stream=stream,
         )
+        if stream:
+            # The caller drains the token generator and records the response time
+            return {"stream": blog, "start_time": start_time}
 
         end_time = time.time()
         response_time = end_time - start_time
@@ -90,5 +119,7 @@ def blog2(topic: str) -> str:
             "response_time": response_time,
         }
 
+    except ProviderError:
+        raise
     except Exception as e:
         return {"content": f"An error occurred: {e}", "response_time": None}
@@ -1,55 +1,18 @@
 from textwrap import dedent
 from gemini_patch import GeminiChat as Gemini
 from phi.assistant import Assistant
-from phi.tools.serpapi_tools import SerpApiTools
+from agent_registry import get_assistants
+from rate_limit import ProviderError
+from ai_agents.researchers import aresearch_topic, research_topic
 import os
 import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def blog3(topic: str) -> dict:
-    """
-    Generates a blog based on the given topic and target audience using Gemini and SerpAPI.
-
-    Args:
-        topic (str): The blog topic.
-
-    Returns:
-        dict: A dictionary containing the generated blog post and response time.
-    """
-    # Get SerpAPI key
-    serp_api_key = os.getenv("SERPER_API_KEY")
-
-    if not serp_api_key:
-        return {
-            "error": "SerpAPI key is not set. Please ensure the environment variables are configured.",
-            "blog": None,
-            "response_time": None
-        }
-
-    # Set up assistants
-    researcher = Assistant(
-        name="Researcher",
-        role="Searches for blog topic-related information and generates relevant references",
-        llm=Gemini(model="gemini-2.5-flash"),
-        description=dedent(
-            """\
-            You are a world-class blog researcher. Given a blog topic, generate a list of search terms for finding relevant articles, research papers, and other resources.
-            Then search the web for each term, analyze the results, and return the 10 most relevant insights.
-            """
-        ),
-        instructions=[
-            "Generate a list of 3 search terms related to the topic.",
-            "Search the web for each term using the SerpAPI tool.",
-            "Analyze the results and return the 10 most relevant insights or references.",
-        ],
-        tools=[SerpApiTools(api_key=serp_api_key)],
-        show_tool_calls=True,
-        add_datetime_to_instructions=True,
-        markdown=True,
-    )
 
+def _assistants():
+    """Builds the writer assistant."""
     writer = Assistant(
         name="Writer",
         role="Generates a draft blog post based on user preferences and research results",
@@ -74,15 +37,88 @@ def blog3(topic: str) -> dict:
         num_history_messages=3,
         markdown=True,
     )
+    return writer
+
+
+def blog3(topic: str, stream: bool = False) -> dict:
+    """
+    Generates a blog based on the given topic and target audience using Gemini and SerpAPI.
+
+    Args:
+        topic (str): The blog topic.
+        stream (bool): If True, the final stage's tokens are returned as a generator.
+
+    Returns:
+        dict: A dictionary containing the generated blog post and response time.
+    """
+    # Get SerpAPI key
+    serp_api_key = os.getenv("SERPER_API_KEY")
+
+    if not serp_api_key:
+        return {
+            "error": "SerpAPI key is not set. Please ensure the environment variables are configured.",
+            "blog": None,
+            "response_time": None
+        }
+
+    writer = get_assistants("blog3", _assistants)
+
+    try:
+        # Research phase
+        start_time = time.time()
+        
+        research_results = research_topic("blog", topic, serp_api_key)
+
+        # Writing phase
+        blog = writer.llm.run(f"Write a blog on '{topic}' using the following research:\n\n{research_results}", stream=stream)
+        if stream:
+            # The caller drains the token generator and records the response time
+            return {"stream": blog, "start_time": start_time}
+
+        end_time = time.time()
+        response_time = end_time - start_time
+
+        return {
+            "blog": blog,
+            "response_time": response_time,
+            "error": None
+        }
+
+    except ProviderError:
+        raise
+    except Exception as e:
+        return {
+            "blog": None,
+            "response_time": None,
+            "error": f"An error occurred: {str(e)}"
+        }
+
+
+async def ablog3(topic: str, stream: bool = False) -> dict:
+    """Async counterpart of `blog3`, run on the event loop by the asyncio engine."""
+    # Get SerpAPI key
+    serp_api_key = os.getenv("SERPER_API_KEY")
+
+    if not serp_api_key:
+        return {
+            "error": "SerpAPI key is not set. Please ensure the environment variables are configured.",
+            "blog": None,
+            "response_time": None
+        }
+
+    writer = get_assistants("blog3", _assistants)
 
     try:
         # Research phase
         start_time = time.time()
         
-        research_results = researcher.llm.run(f"Research blog topic: {topic}")
+        research_results = await aresearch_topic("blog", topic, serp_api_key)
 
         # Writing phase
-        blog = writer.llm.run(f"Write a blog on '{topic}' using the following research:\n\n{research_results}")
+        blog = await writer.llm.arun(f"Write a blog on '{topic}' using the following research:\n\n{research_results}", stream=stream)
+        if stream:
+            # The caller drains the token generator and records the response time
+            return {"stream": blog, "start_time": start_time}
 
         end_time = time.time()
         response_time = end_time - start_time
@@ -93,6 +129,8 @@ def blog3(topic: str) -> dict:
             "error": None
         }
 
+    except ProviderError:
+        raise
     except Exception as e:
         return {
             "blog": None,
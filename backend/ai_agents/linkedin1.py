@@ -1,7 +1,9 @@
 from textwrap import dedent
 from phi.assistant import Assistant
-from phi.tools.serpapi_tools import SerpApiTools
 from azure_openai_patch import AzureOpenAIChat as OpenAIChat
+from agent_registry import get_assistants
+from rate_limit import ProviderError
+from ai_agents.researchers import aresearch_topic, research_topic
 import os
 import time
 from dotenv import load_dotenv
@@ -9,44 +11,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
-def linkedin_post1(post_topic: str) -> dict:
-    """
-    Generates a LinkedIn post based on the given topic and style preferences using GPT-4o.
-
-    Args:
-        post_topic (str): The topic for the LinkedIn post.
-
-    Returns:
-        dict: Contains the generated post content and response time.
-    """
-    # Get SerpApi key
-    serp_api_key = os.getenv("SERPER_API_KEY")
-
-    if not serp_api_key:
-        return "Error: SerpApi key is not set. Please ensure the environment variables are configured."
-
-    # Set up assistants
-    researcher = Assistant(
-        name="Researcher",
-        role="Searches for relevant content, trends, and ideas for LinkedIn posts",
-        llm=OpenAIChat(),
-        description=dedent(
-            """\
-            You are a world-class content researcher. Given a LinkedIn post topic and style preferences,
-            generate a list of relevant content ideas, industry trends, and best practices for creating
-            effective LinkedIn posts.
-            """
-        ),
-        instructions=[
-            "Given a LinkedIn post topic and style preferences, first generate a list of 3 search terms related to that topic.",
-            "For each search term, `search_google` and analyze the results.",
-            "From the results of all searches, return the 10 most relevant insights, trends, and best practices for creating LinkedIn posts.",
-            "Remember: the quality of the results is important.",
-        ],
-        tools=[SerpApiTools(api_key=serp_api_key)],
-        add_datetime_to_instructions=True,
-    )
-
+def _assistants():
+    """Builds the writer assistant."""
     writer = Assistant(
         name="Writer",
         role="Generates a compelling LinkedIn post based on user preferences and research insights",
@@ -70,16 +36,78 @@ def linkedin_post1(post_topic: str) -> dict:
         add_chat_history_to_prompt=True,
         num_history_messages=3,
     )
+    return writer
+
+
+def linkedin_post1(post_topic: str, stream: bool = False) -> dict:
+    """
+    Generates a LinkedIn post based on the given topic and style preferences using GPT-4o.
+
+    Args:
+        post_topic (str): The topic for the LinkedIn post.
+        stream (bool): If True, the final stage's tokens are returned as a generator.
+
+    Returns:
+        dict: Contains the generated post content and response time.
+    """
+    # Get SerpApi key
+    serp_api_key = os.getenv("SERPER_API_KEY")
+
+    if not serp_api_key:
+        return "Error: SerpApi key is not set. Please ensure the environment variables are configured."
+
+    writer = get_assistants("linkedin1", _assistants)
 
     try:
         # Research phase
         start_time = time.time()
-        research_prompt = f"Topic: {post_topic}"
-        research_results = researcher.llm.run(research_prompt)
+        research_results = research_topic("linkedin", post_topic, serp_api_key)
 
         # Writing phase
         post_prompt = f"Topic: {post_topic}\n\nResearch: {research_results}"
-        post_content = writer.llm.run(post_prompt)
+        post_content = writer.llm.run(post_prompt, stream=stream)
+        if stream:
+            # The caller drains the token generator and records the response time
+            return {"stream": post_content, "start_time": start_time}
+
+        end_time = time.time()
+        response_time = end_time - start_time
+
+        return {
+            "response": (
+                post_content if isinstance(post_content, str) else str(post_content)
+            ),
+            "response_time": response_time,
+        }
+
+    except ProviderError:
+        raise
+    except Exception as e:
+        return {"content": f"An error occurred: {e}", "response_time": None}
+
+
+async def alinkedin_post1(post_topic: str, stream: bool = False) -> dict:
+    """Async counterpart of `linkedin_post1`, run on the event loop by the asyncio engine."""
+    # Get SerpApi key
+    serp_api_key = os.getenv("SERPER_API_KEY")
+
+    if not serp_api_key:
+        return "Error: SerpApi key is not set. Please ensure the environment variables are configured."
+
+    writer = get_assistants("linkedin1", _assistants)
+
+    try:
+        # Research phase
+        start_time = time.time()
+        research_results = await aresearch_topic("linkedin", post_topic, serp_api_key)
+
+        # Writing phase
+        post_prompt = f"Topic: {post_topic}\n\nResearch: {research_results}"
+        post_content = await writer.llm.arun(post_prompt, stream=stream)
+        if stream:
+            # The caller drains the token generator and records the response time
+            return {"stream": post_content, "start_time": start_time}
+
         end_time = time.time()
         response_time = end_time - start_time
 
@@ -90,5 +118,7 @@ def linkedin_post1(post_topic: str) -> dict:
             "response_time": response_time,
         }
 
+    except ProviderError:
+        raise
     except Exception as e:
         return {"content": f"An error occurred: {e}", "response_time": None}
@@ -1,51 +1,17 @@
 from textwrap import dedent
 from gemini_patch import GeminiChat as Gemini
 from phi.assistant import Assistant
-from phi.tools.serpapi_tools import SerpApiTools
+from agent_registry import get_assistants
+from rate_limit import ProviderError
+from ai_agents.researchers import aresearch_topic, research_topic
 import os
 import time
 from dotenv import load_dotenv
 load_dotenv()
 
-def linkedin_post3(post_topic: str) -> dict:
-    """
-    Generates a LinkedIn post based on the given topic using Gemini model.
-
-    Args:
-        post_topic (str): The topic for the LinkedIn post.
-
-    Returns:
-        dict: Contains the generated post content and response time.
-    """
-    # Get SerpAPI key
-    serp_api_key = os.getenv("SERPER_API_KEY")
-
-    if not serp_api_key:
-        return "Error: SerpAPI key is not set. Please ensure the environment variables are configured."
-
-    # Set up assistants
-    researcher = Assistant(
-        name="Researcher",
-        role="Searches for relevant content, trends, and ideas for LinkedIn posts",
-        llm=Gemini(model="gemini-2.5-flash"),
-        description=dedent(
-            """\
-            You are a world-class content researcher. Given a LinkedIn post topic and style preferences,
-            generate a list of relevant content ideas, industry trends, and best practices for creating
-            effective LinkedIn posts.
-            """
-        ),
-        instructions=[
-            "Given a LinkedIn post topic and style preferences, first generate a list of 3 search terms related to that topic.",
-            "For each search term, `search_google` and analyze the results.",
-            "From the results of all searches, return the 10 most relevant insights, trends, and best practices for creating LinkedIn posts.",
-            "Remember: the quality of the results is important.",
-        ],
-        tools=[SerpApiTools(api_key=serp_api_key)],
-        add_datetime_to_instructions=True,
-        markdown=True
-    )
 
+def _assistants():
+    """Builds the writer assistant."""
     writer = Assistant(
         name="Writer",
         role="Generates a compelling LinkedIn post based on user preferences and research insights",
@@ -70,14 +36,73 @@ def linkedin_post3(post_topic: str) -> dict:
         num_history_messages=3,
         markdown=True
     )
+    return writer
+
+
+def linkedin_post3(post_topic: str, stream: bool = False) -> dict:
+    """
+    Generates a LinkedIn post based on the given topic using Gemini model.
+
+    Args:
+        post_topic (str): The topic for the LinkedIn post.
+        stream (bool): If True, the final stage's tokens are returned as a generator.
+
+    Returns:
+        dict: Contains the generated post content and response time.
+    """
+    # Get SerpAPI key
+    serp_api_key = os.getenv("SERPER_API_KEY")
+
+    if not serp_api_key:
+        return "Error: SerpAPI key is not set. Please ensure the environment variables are configured."
+
+    writer = get_assistants("linkedin3", _assistants)
+
+    try:
+        # Research phase
+        start_time = time.time()
+        research_results = research_topic("linkedin", post_topic, serp_api_key)
+
+        # Writing phase
+        post_content = writer.llm.run(f"Create a LinkedIn post on the topic '{post_topic}' using the following research insights:\n\n{research_results}", stream=stream)
+        if stream:
+            # The caller drains the token generator and records the response time
+            return {"stream": post_content, "start_time": start_time}
+
+        end_time = time.time()
+        response_time = end_time - start_time
+        
+        return {
+            "response": post_content,
+            "response_time": response_time,
+        }
+
+    except ProviderError:
+        raise
+    except Exception as e:
+        return {"content": f"An error occurred: {str(e)}", "response_time": None}
+
+
+async def alinkedin_post3(post_topic: str, stream: bool = False) -> dict:
+    """Async counterpart of `linkedin_post3`, run on the event loop by the asyncio engine."""
+    # Get SerpAPI key
+    serp_api_key = os.getenv("SERPER_API_KEY")
+
+    if not serp_api_key:
+        return "Error: SerpAPI key is not set. Please ensure the environment variables are configured."
+
+    writer = get_assistants("linkedin3", _assistants)
 
     try:
         # Research phase
         start_time = time.time()
-        research_results = researcher.llm.run(f"Research LinkedIn post topic: {post_topic}")
+        research_results = await aresearch_topic("linkedin", post_topic, serp_api_key)
 
         # Writing phase
-        post_content = writer.llm.run(f"Create a LinkedIn post on the topic '{post_topic}' using the following research insights:\n\n{research_results}")
+        post_content = await writer.llm.arun(f"Create a LinkedIn post on the topic '{post_topic}' using the following research insights:\n\n{research_results}", stream=stream)
+        if stream:
+            # The caller drains the token generator and records the response time
+            return {"stream": post_content, "start_time": start_time}
 
         end_time = time.time()
         response_time = end_time - start_time
@@ -87,5 +112,7 @@ def linkedin_post3(post_topic: str) -> dict:
             "response_time": response_time,
         }
 
+    except ProviderError:
+        raise
     except Exception as e:
-        return {"content": f"An error occurred: {str(e)}", "response_time": None}
\ No newline at end of file
+        return {"content": f"An error occurred: {str(e)}", "response_time": None}
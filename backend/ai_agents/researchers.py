@@ -0,0 +1,109 @@
+from textwrap import dedent
+from phi.assistant import Assistant
+from tools_patch import SerpApiTools
+from groq_patch import Groq
+from agent_registry import get_assistants
+from research import ashared_research, shared_research
+
+# One researcher per category, used by every variant of it: variants in a
+# batch share one research run for the same input (research.py), and get the
+# same research whichever of them runs it.
+RESEARCH_MODEL = "llama-3.3-70b-versatile"
+
+
+def _blog_researcher(serp_api_key: str):
+    return Assistant(
+        name="Researcher",
+        role="Searches for blog topic-related information and generates relevant references",
+        llm=Groq(model=RESEARCH_MODEL),
+        description=dedent(
+            """\
+            You are a world-class blog researcher. Given a blog topic , generate a list of search terms for finding relevant articles, research papers, and other resources.
+            Then search the web for each term, analyze the results, and return the 10 most relevant insights.
+            """
+        ),
+        instructions=[
+            "Given a blog topic , first generate a list of 3 search terms related to that topic and the audience.",
+            "For each search term, `search_google` and analyze the results.",
+            "From the results of all searches, return the 10 most relevant insights or references to inform the blog post.",
+            "Remember: the quality of the results is important.",
+        ],
+        tools=[SerpApiTools(api_key=serp_api_key)],
+        add_datetime_to_instructions=True,
+    )
+
+
+def _linkedin_researcher(serp_api_key: str):
+    return Assistant(
+        name="Researcher",
+        role="Searches for relevant content, trends, and ideas for LinkedIn posts",
+        llm=Groq(model=RESEARCH_MODEL),
+        description=dedent(
+            """\
+            You are a world-class content researcher. Given a LinkedIn post topic and style preferences,
+            generate a list of relevant content ideas, industry trends, and best practices for creating
+            effective LinkedIn posts.
+            """
+        ),
+        instructions=[
+            "Given a LinkedIn post topic and style preferences, first generate a list of 3 search terms related to that topic.",
+            "For each search term, `search_google` and analyze the results.",
+            "From the results of all searches, return the 10 most relevant insights, trends, and best practices for creating LinkedIn posts.",
+            "Remember: the quality of the results is important.",
+        ],
+        tools=[SerpApiTools(api_key=serp_api_key)],
+        add_datetime_to_instructions=True,
+    )
+
+
+def _travel_researcher(serp_api_key: str):
+    return Assistant(
+        name="Researcher",
+        role="Searches for travel destinations, activities, and accommodations based on user preferences",
+        llm=Groq(model=RESEARCH_MODEL),
+        description=dedent(
+            """\
+            You are a world-class travel researcher. Given a travel destination and the number of days the user wants to travel for,
+            generate a list of search terms for finding relevant travel activities and accommodations.
+            Then search the web for each term, analyze the results, and return the 10 most relevant results.
+            """
+        ),
+        instructions=[
+            "Given a travel destination and the number of days the user wants to travel for, first generate a list of 3 search terms related to that destination and the number of days.",
+            "For each search term, `search_google` and analyze the results.",
+            "From the results of all searches, return the 10 most relevant results to the user's preferences.",
+            "Remember: the quality of the results is important.",
+        ],
+        tools=[SerpApiTools(api_key=serp_api_key)],
+        add_datetime_to_instructions=True,
+    )
+
+
+# Category -> (researcher builder, research prompt)
+RESEARCHERS = {
+    "blog": (_blog_researcher, "Research blog topic: {topic}"),
+    "linkedin": (_linkedin_researcher, "Topic: {topic}"),
+    "travel": (_travel_researcher, "Search for travel destinations, activities, and accommodations in '{topic}'"),
+}
+
+
+def research_topic(category: str, topic: str, serp_api_key: str) -> str:
+    """Researches `topic` with the category's researcher, once per batch (see research.shared_research)."""
+    build, prompt = RESEARCHERS[category]
+
+    def run():
+        researcher = get_assistants(f"{category}-researcher", build, serp_api_key)
+        return researcher.run(prompt.format(topic=topic), stream=False)
+
+    return shared_research(category, topic, run)
+
+
+async def aresearch_topic(category: str, topic: str, serp_api_key: str) -> str:
+    """Async counterpart of `research_topic`."""
+    build, prompt = RESEARCHERS[category]
+
+    def arun():
+        researcher = get_assistants(f"{category}-researcher", build, serp_api_key)
+        return researcher.arun(prompt.format(topic=topic), stream=False)
+
+    return await ashared_research(category, topic, arun)
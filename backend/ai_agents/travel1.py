@@ -1,7 +1,9 @@
 from textwrap import dedent
 from phi.assistant import Assistant
-from phi.tools.serpapi_tools import SerpApiTools
 from azure_openai_patch import AzureOpenAIChat as OpenAIChat
+from agent_registry import get_assistants
+from rate_limit import ProviderError
+from ai_agents.researchers import aresearch_topic, research_topic
 import os
 import time
 from dotenv import load_dotenv
@@ -9,42 +11,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
-def itinerary1(destination: str) -> dict:
-    """
-    Generates a travel itinerary based on the given destination.
-
-    Args:
-        destination (str): The travel destination.
-
-    Returns:
-        dict: Contains the generated itinerary and response time.
-    """
-    # Get SerpApi key
-    serp_api_key = os.getenv("SERPER_API_KEY")
-
-    if not serp_api_key:
-        return "Error: SerpApi key is not set. Please ensure the environment variables are configured."
-
-    # Set up assistants
-    researcher = Assistant(
-        name="Researcher",
-        role="Searches for travel information and activities",
-        llm=OpenAIChat(),
-        description=dedent(
-            """\
-            You are a world-class travel researcher. Given a travel destination, generate search terms,
-            research the location, and return 10 high-quality recommendations and insights.
-            """
-        ),
-        instructions=[
-            "Generate 3 search terms for the given destination.",
-            "Use `search_google` to gather data about attractions, accommodations, and activities.",
-            "Analyze the results and return the 10 most relevant insights or recommendations.",
-        ],
-        tools=[SerpApiTools(api_key=serp_api_key)],
-        markdown=True,
-    )
-
+def _assistants():
+    """Builds the planner assistant."""
     planner = Assistant(
         name="Planner",
         role="Creates detailed travel itineraries",
@@ -63,16 +31,76 @@ def itinerary1(destination: str) -> dict:
         ],
         markdown=True,
     )
+    return planner
+
+
+def itinerary1(destination: str, stream: bool = False) -> dict:
+    """
+    Generates a travel itinerary based on the given destination.
+
+    Args:
+        destination (str): The travel destination.
+        stream (bool): If True, the final stage's tokens are returned as a generator.
+
+    Returns:
+        dict: Contains the generated itinerary and response time.
+    """
+    # Get SerpApi key
+    serp_api_key = os.getenv("SERPER_API_KEY")
+
+    if not serp_api_key:
+        return "Error: SerpApi key is not set. Please ensure the environment variables are configured."
+
+    planner = get_assistants("travel1", _assistants)
+
+    try:
+        # Research phase
+        start_time = time.time()
+        research_results = research_topic("travel", destination, serp_api_key)
+
+        # Planning phase
+        planner_prompt = f"Plan a trip for {destination}, using the following research:\n\n{research_results}"
+        itinerary = planner.llm.run(planner_prompt, stream=stream)
+        if stream:
+            # The caller drains the token generator and records the response time
+            return {"stream": itinerary, "start_time": start_time}
+
+        end_time = time.time()
+        response_time = end_time - start_time
+
+        return {
+            "itinerary": itinerary if isinstance(itinerary, str) else str(itinerary),
+            "response_time": response_time,
+        }
+
+    except ProviderError:
+        raise
+    except Exception as e:
+        return {"content": f"An error occurred: {e}", "response_time": None}
+
+
+async def aitinerary1(destination: str, stream: bool = False) -> dict:
+    """Async counterpart of `itinerary1`, run on the event loop by the asyncio engine."""
+    # Get SerpApi key
+    serp_api_key = os.getenv("SERPER_API_KEY")
+
+    if not serp_api_key:
+        return "Error: SerpApi key is not set. Please ensure the environment variables are configured."
+
+    planner = get_assistants("travel1", _assistants)
 
     try:
         # Research phase
         start_time = time.time()
-        research_prompt = f"Search for travel destinations, activities, and accommodations in '{destination}'"
-        research_results = researcher.llm.run(research_prompt)
+        research_results = await aresearch_topic("travel", destination, serp_api_key)
 
         # Planning phase
         planner_prompt = f"Plan a trip for {destination}, using the following research:\n\n{research_results}"
-        itinerary = planner.llm.run(planner_prompt)
+        itinerary = await planner.llm.arun(planner_prompt, stream=stream)
+        if stream:
+            # The caller drains the token generator and records the response time
+            return {"stream": itinerary, "start_time": start_time}
+
         end_time = time.time()
         response_time = end_time - start_time
 
@@ -81,5 +109,7 @@ def itinerary1(destination: str) -> dict:
             "response_time": response_time,
         }
 
+    except ProviderError:
+        raise
     except Exception as e:
         return {"content": f"An error occurred: {e}", "response_time": None}
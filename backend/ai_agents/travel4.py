@@ -1,7 +1,9 @@
 from textwrap import dedent
 from phi.assistant import Assistant
-from phi.tools.serpapi_tools import SerpApiTools
-from phi.llm.groq import Groq
+from groq_patch import Groq
+from agent_registry import get_assistants
+from rate_limit import ProviderError
+from ai_agents.researchers import aresearch_topic, research_topic
 import os
 import time
 from dotenv import load_dotenv
@@ -9,45 +11,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
-def itinerary4(destination: str) -> dict:
-    """
-    Generates a travel itinerary based on the given destination using Groq's llama-3.1-8b-instant model.
-
-    Args:
-        destination (str): The travel destination.
-
-    Returns:
-        dict: Contains the generated itinerary and response time.
-    """
-    # Get API keys
-    groq_api_key = os.getenv("GROQ_API_KEY")
-    serp_api_key = os.getenv("SERPER_API_KEY")
-
-    if not groq_api_key or not serp_api_key:
-        return "Error: API keys are not set. Please ensure the environment variables are configured."
-
-    # Set up assistants
-    researcher = Assistant(
-        name="Researcher",
-        role="Searches for travel destinations, activities, and accommodations based on user preferences",
-        llm=Groq(model="llama-3.1-8b-instant"),
-        description=dedent(
-            """\
-            You are a world-class travel researcher. Given a travel destination and the number of days the user wants to travel for,
-            generate a list of search terms for finding relevant travel activities and accommodations.
-            Then search the web for each term, analyze the results, and return the 10 most relevant results.
-            """
-        ),
-        instructions=[
-            "Given a travel destination and the number of days the user wants to travel for, first generate 3 relevant search terms manually for the given destination and number of days without calling any tool.",
-            "For each search term, `search_google` and analyze the results.",
-            "From the results of all searches, return the 10 most relevant results to the user's preferences.",
-            "Remember: the quality of the results is important.",
-        ],
-        tools=[SerpApiTools(api_key=serp_api_key)],
-        add_datetime_to_instructions=True,
-    )
-
+def _assistants():
+    """Builds the planner assistant."""
     planner = Assistant(
         name="Planner",
         role="Generates a draft itinerary based on user preferences and research results",
@@ -70,19 +35,82 @@ def itinerary4(destination: str) -> dict:
         add_chat_history_to_prompt=True,
         num_history_messages=3,
     )
+    return planner
+
+
+def itinerary4(destination: str, stream: bool = False) -> dict:
+    """
+    Generates a travel itinerary based on the given destination using Groq's llama-3.1-8b-instant model.
+
+    Args:
+        destination (str): The travel destination.
+        stream (bool): If True, the final stage's tokens are returned as a generator.
+
+    Returns:
+        dict: Contains the generated itinerary and response time.
+    """
+    # Get API keys
+    groq_api_key = os.getenv("GROQ_API_KEY")
+    serp_api_key = os.getenv("SERPER_API_KEY")
+
+    if not groq_api_key or not serp_api_key:
+        return "Error: API keys are not set. Please ensure the environment variables are configured."
+
+    planner = get_assistants("travel4", _assistants)
 
     try:
         # Research phase
         start_time = time.time()
-        research_results = researcher.run(
-            f"Research travel destination: {destination}", stream=False
-        )
+        research_results = research_topic("travel", destination, serp_api_key)
 
         # Planning phase
         itinerary = planner.run(
             f"Create a travel itinerary for {destination} using the following research:\n\n{research_results}",
-            stream=False,
+            stream=stream,
         )
+        if stream:
+            # The caller drains the token generator and records the response time
+            return {"stream": itinerary, "start_time": start_time}
+
+        end_time = time.time()
+        response_time = end_time - start_time
+
+        return {
+            "itinerary": itinerary,
+            "response_time": response_time,
+        }
+
+    except ProviderError:
+        raise
+    except Exception as e:
+        return {"content": f"An error occurred: {str(e)}", "response_time": None}
+
+
+async def aitinerary4(destination: str, stream: bool = False) -> dict:
+    """Async counterpart of `itinerary4`, run on the event loop by the asyncio engine."""
+    # Get API keys
+    groq_api_key = os.getenv("GROQ_API_KEY")
+    serp_api_key = os.getenv("SERPER_API_KEY")
+
+    if not groq_api_key or not serp_api_key:
+        return "Error: API keys are not set. Please ensure the environment variables are configured."
+
+    planner = get_assistants("travel4", _assistants)
+
+    try:
+        # Research phase
+        start_time = time.time()
+        research_results = await aresearch_topic("travel", destination, serp_api_key)
+
+        # Planning phase
+        itinerary = await planner.arun(
+            f"Create a travel itinerary for {destination} using the following research:\n\n{research_results}",
+            stream=stream,
+        )
+        if stream:
+            # The caller drains the token generator and records the response time
+            return {"stream": itinerary, "start_time": start_time}
+
         end_time = time.time()
         response_time = end_time - start_time
 
@@ -91,5 +119,7 @@ def itinerary4(destination: str) -> dict:
             "response_time": response_time,
         }
 
+    except ProviderError:
+        raise
     except Exception as e:
         return {"content": f"An error occurred: {str(e)}", "response_time": None}
@@ -1,25 +1,22 @@
 from textwrap import dedent
 from phi.assistant import Assistant
-from phi.tools.youtube_tools import YouTubeTools
 from azure_openai_patch import AzureOpenAIChat as OpenAIChat
+from agent_registry import copy_llm, get_assistants
+from rate_limit import ProviderError
+from transcripts import (
+    acondense_transcript,
+    aget_transcript_text,
+    condense_transcript,
+    get_transcript_text,
+)
 import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
-def youtube_summarizer1(video_url: str) -> dict:
-    """
-    Summarizes a YouTube video based on its captions using OpenAI's GPT-4 model.
-
-    Args:
-        video_url (str): The URL of the YouTube video to summarize.
-
-    Returns:
-        dict: Contains the generated summary and response time.
-    """
-
-    # Set up summarizer assistant using Azure OpenAIChat
+def _assistants():
+    """Builds the summarizer assistant."""
     summarizer = Assistant(
         name="Summarizer",
         role="Summarizes YouTube video captions in detail",
@@ -42,14 +39,28 @@ def youtube_summarizer1(video_url: str) -> dict:
         ],
         add_datetime_to_instructions=True,
     )
+    return summarizer
+
+
+def youtube_summarizer1(video_url: str, stream: bool = False) -> dict:
+    """
+    Summarizes a YouTube video based on its captions using OpenAI's GPT-4 model.
+
+    Args:
+        video_url (str): The URL of the YouTube video to summarize.
+        stream (bool): If True, the final stage's tokens are returned as a generator.
+
+    Returns:
+        dict: Contains the generated summary and response time.
+    """
+    summarizer = get_assistants("youtube1", _assistants)
 
     try:
         # Timing start
         start_time = time.time()
 
-        # Fetch captions using YouTubeTools directly
-        captions = YouTubeTools().get_youtube_video_captions(url=video_url)
-        
+        # Fetch captions directly, cached by video ID and language
+        captions = get_transcript_text(video_url)
 
         if not captions:
             return {
@@ -57,9 +68,63 @@ def youtube_summarizer1(video_url: str) -> dict:
                 "response_time": 0,
             }
 
+        # Summarize long transcripts part by part in parallel first
+        captions = condense_transcript(
+            captions,
+            lambda part: copy_llm(summarizer.llm).run(f"Summarize this part of the youtube video : {video_url} in detail, keeping its key points, examples and conclusions. Caption data of the part : \n\n{part}"),
+        )
+
+        # Generate summary
+        summary_prompt = f"Summarize the youtube video : {video_url} using the following caption data of the video : \n\n{captions}"
+        summary = summarizer.llm.run(summary_prompt, stream=stream)
+        if stream:
+            # The caller drains the token generator and records the response time
+            return {"stream": summary, "start_time": start_time}
+
+        # Timing end
+        end_time = time.time()
+        response_time = end_time - start_time
+
+        return {
+            "summary": summary if isinstance(summary, str) else str(summary),
+            "response_time": response_time,
+        }
+
+    except ProviderError:
+        raise
+    except Exception as e:
+        return {"content": f"An error occurred: {e}", "response_time": None}
+
+
+async def ayoutube_summarizer1(video_url: str, stream: bool = False) -> dict:
+    """Async counterpart of `youtube_summarizer1`, run on the event loop by the asyncio engine."""
+    summarizer = get_assistants("youtube1", _assistants)
+
+    try:
+        # Timing start
+        start_time = time.time()
+
+        # Fetch captions directly, cached by video ID and language
+        captions = await aget_transcript_text(video_url)
+
+        if not captions:
+            return {
+                "summary": "No captions found for the provided video URL.",
+                "response_time": 0,
+            }
+
+        # Summarize long transcripts part by part in parallel first
+        captions = await acondense_transcript(
+            captions,
+            lambda part: copy_llm(summarizer.llm).arun(f"Summarize this part of the youtube video : {video_url} in detail, keeping its key points, examples and conclusions. Caption data of the part : \n\n{part}"),
+        )
+
         # Generate summary
         summary_prompt = f"Summarize the youtube video : {video_url} using the following caption data of the video : \n\n{captions}"
-        summary = summarizer.llm.run(summary_prompt)
+        summary = await summarizer.llm.arun(summary_prompt, stream=stream)
+        if stream:
+            # The caller drains the token generator and records the response time
+            return {"stream": summary, "start_time": start_time}
 
         # Timing end
         end_time = time.time()
@@ -70,5 +135,7 @@ def youtube_summarizer1(video_url: str) -> dict:
             "response_time": response_time,
         }
 
+    except ProviderError:
+        raise
     except Exception as e:
         return {"content": f"An error occurred: {e}", "response_time": None}
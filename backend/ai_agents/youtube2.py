@@ -1,8 +1,18 @@
 from textwrap import dedent
 from phi.assistant import Assistant
-from phi.llm.groq import Groq
-from phi.tools.youtube_tools import YouTubeTools
+from groq_patch import Groq
+from phi.llm.message import Message
+from tools_patch import YouTubeTools
 from phi.tools.duckduckgo import DuckDuckGo
+from agent_registry import copy_llm, get_assistants
+from rate_limit import ProviderError
+from research import ashared_research, shared_research
+from transcripts import (
+    acondense_transcript,
+    aget_transcript_text,
+    condense_transcript,
+    get_transcript_text,
+)
 import os
 import time
 from dotenv import load_dotenv
@@ -10,43 +20,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
-def youtube_summarizer2(video_url: str) -> dict:
-    """
-    Summarizes a YouTube video based on its captions using Groq's LLaMA model.
-
-    Args:
-        video_url (str): The URL of the YouTube video to summarize.
-
-    Returns:
-        dict: Contains the generated summary and response time.
-    """
-    # Get API key
-    groq_api_key = os.getenv("GROQ_API_KEY")
-
-    if not groq_api_key:
-        return "Error: API key is not set. Please ensure the environment variables are configured."
-
-    # Set up assistants
-    caption_fetcher = Assistant(
-        name="CaptionFetcher",
-        role="Fetches captions from YouTube videos",
-        llm=Groq(model="llama-3.3-70b-versatile"),
-        description=dedent(
-            """\
-            You are a Youtube Agent that fetches captions from YouTube videos. Given a YouTube video URL, 
-            fetch its captions for further analysis. The captions can be in any language. 
-            Don't ask for any confirmation, just give me the captions.
-            """
-        ),
-        instructions=[
-            "No matter what is the captions language, Fetch the captions from the given YouTube video URL.",
-        ],
-        tools=[YouTubeTools(), DuckDuckGo()],
-        add_datetime_to_instructions=True,
-        show_tool_calls=True,
-        get_video_captions=True,
-    )
-
+def _assistants():
+    """Builds the summarizer assistant."""
     summarizer = Assistant(
         name="Summarizer",
         role="Summarizes YouTube video captions in detail",
@@ -72,21 +47,116 @@ def youtube_summarizer2(video_url: str) -> dict:
         show_tool_calls=True,
         get_video_captions=True,
     )
+    return summarizer
+
+
+def youtube_summarizer2(video_url: str, stream: bool = False) -> dict:
+    """
+    Summarizes a YouTube video based on its captions using Groq's LLaMA model.
+
+    Args:
+        video_url (str): The URL of the YouTube video to summarize.
+        stream (bool): If True, the final stage's tokens are returned as a generator.
+
+    Returns:
+        dict: Contains the generated summary and response time.
+    """
+    # Get API key
+    groq_api_key = os.getenv("GROQ_API_KEY")
+
+    if not groq_api_key:
+        return "Error: API key is not set. Please ensure the environment variables are configured."
+
+    summarizer = get_assistants("youtube2", _assistants)
 
     try:
         # Timing start
         start_time = time.time()
 
-        # Fetch captions
-        caption_results = caption_fetcher.run(
-            f"Youtube Video Link : {video_url}", stream=False
+        # Fetch captions directly, cached by video ID and language
+        caption_results = shared_research(
+            "youtube", video_url, lambda: get_transcript_text(video_url)
+        )
+
+        if not caption_results:
+            return {
+                "summary": "No captions found for the provided video URL.",
+                "response_time": 0,
+            }
+
+        # Summarize long transcripts part by part in parallel first
+        caption_results = condense_transcript(
+            caption_results,
+            lambda part: copy_llm(summarizer.llm).response(
+                [Message(role="user", content=f"Summarize this part of the youtube video : {video_url} in detail, keeping its key points, examples and conclusions. Caption data of the part : \n\n{part}")]
+            ),
         )
 
         # Generate summary
         summary = summarizer.run(
             f"Summarize the youtube video : {video_url} using the following caption data of the video : \n\n{caption_results}",
-            stream=False,
+            stream=stream,
+        )
+        if stream:
+            # The caller drains the token generator and records the response time
+            return {"stream": summary, "start_time": start_time}
+
+        # Timing end
+        end_time = time.time()
+        response_time = end_time - start_time
+
+        return {
+            "summary": summary,
+            "response_time": response_time,
+        }
+
+    except ProviderError:
+        raise
+    except Exception as e:
+        return {"content": f"An error occurred: {e}", "response_time": None}
+
+
+async def ayoutube_summarizer2(video_url: str, stream: bool = False) -> dict:
+    """Async counterpart of `youtube_summarizer2`, run on the event loop by the asyncio engine."""
+    # Get API key
+    groq_api_key = os.getenv("GROQ_API_KEY")
+
+    if not groq_api_key:
+        return "Error: API key is not set. Please ensure the environment variables are configured."
+
+    summarizer = get_assistants("youtube2", _assistants)
+
+    try:
+        # Timing start
+        start_time = time.time()
+
+        # Fetch captions directly, cached by video ID and language
+        caption_results = await ashared_research(
+            "youtube", video_url, lambda: aget_transcript_text(video_url)
+        )
+
+        if not caption_results:
+            return {
+                "summary": "No captions found for the provided video URL.",
+                "response_time": 0,
+            }
+
+        # Summarize long transcripts part by part in parallel first
+        caption_results = await acondense_transcript(
+            caption_results,
+            lambda part: copy_llm(summarizer.llm).aresponse(
+                [Message(role="user", content=f"Summarize this part of the youtube video : {video_url} in detail, keeping its key points, examples and conclusions. Caption data of the part : \n\n{part}")]
+            ),
+        )
+
+        # Generate summary
+        summary = await summarizer.arun(
+            f"Summarize the youtube video : {video_url} using the following caption data of the video : \n\n{caption_results}",
+            stream=stream,
         )
+        if stream:
+            # The caller drains the token generator and records the response time
+            return {"stream": summary, "start_time": start_time}
 
         # Timing end
         end_time = time.time()
@@ -97,5 +167,7 @@ def youtube_summarizer2(video_url: str) -> dict:
             "response_time": response_time,
         }
 
+    except ProviderError:
+        raise
     except Exception as e:
         return {"content": f"An error occurred: {e}", "response_time": None}
@@ -1,76 +1,71 @@
-from flask import Flask, request, jsonify
+import time
+
+_boot_started = time.perf_counter()
+
+from flask import Flask, g, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
-from concurrent.futures import ThreadPoolExecutor
 import os
 import tempfile
 import json
 import logging
+import hashlib
+import queue
+import threading
 from typing import List, Dict
-import google.generativeai as genai
+from cachetools import TTLCache
+from dotenv import load_dotenv
 #from llama_parse import LlamaParse
 
-
-from resp import evaluate_content
+# Before any module below reads its settings: agents, which used to load
+# .env when imported here, are now only imported on first use
+load_dotenv()
+
+import agent_loader
+from agent_loader import AgentLoadError
+import agent_registry
+import cassette
+import evaluation
+import event_loop
+import executor
+import generation_cache
+import http_pool
+import metrics
+import tracing
+import rate_limit
+from rate_limit import ProviderError
+from research import ResearchBatch, use_research_batch
+from search_cache import get_search_cache
+from transcripts import transcript_cache_stats
 from prompt import gen_ai_prompt
-from ai_agents.blog1 import blog1
-from ai_agents.blog2 import blog2
-from ai_agents.blog3 import blog3
-from ai_agents.blog4 import blog4
-from ai_agents.linkedin1 import linkedin_post1
-from ai_agents.linkedin2 import linkedin_post2
-from ai_agents.linkedin3 import linkedin_post3
-from ai_agents.linkedin4 import linkedin_post4
-from ai_agents.travel1 import itinerary1
-from ai_agents.travel2 import itinerary2
-from ai_agents.travel3 import itinerary3
-from ai_agents.travel4 import itinerary4
-from ai_agents.youtube1 import youtube_summarizer1
-from ai_agents.youtube2 import youtube_summarizer2
-from ai_agents.youtube3 import youtube_summarizer3
-from ai_agents.youtube4 import youtube_summarizer4
 
 
 # Flask app setup
 
+CORS_ORIGINS = ["http://localhost:3000", os.environ.get("FRONTEND_URL1"), os.environ.get("FRONTEND_URL2")]
+
 app = Flask(__name__)
 CORS(
     app,
     resources={
         r"/*": {
-            "origins": ["http://localhost:3000", os.environ.get("FRONTEND_URL1"), os.environ.get("FRONTEND_URL2")],
+            "origins": CORS_ORIGINS,
             "methods": ["GET", "POST", "OPTIONS"],
             "allow_headers": ["Content-Type"],
         }
     },
 )
 
-# Mapping AI agent functions
-AI_FUNCTIONS = {
-    "blog": {
-        "1": blog1,
-        "2": blog2,
-        "3": blog3,
-        "4": blog4,
-    },
-    "linkedin": {
-        "1": linkedin_post1,
-        "2": linkedin_post2,
-        "3": linkedin_post3,
-        "4": linkedin_post4,
-    },
-    "travel": {
-        "1": itinerary1,
-        "2": itinerary2,
-        "3": itinerary3,
-        "4": itinerary4,
-    },
-    "youtube": {
-        "1": youtube_summarizer1,
-        "2": youtube_summarizer2,
-        "3": youtube_summarizer3,
-        "4": youtube_summarizer4,
-    },
-}
+# Mapping AI agent functions; each agent's module (and provider SDK) is only
+# imported the first time that agent is used, see AGENT_WARM_ON_BOOT
+AI_FUNCTIONS = agent_loader.lazy_functions()
+
+# Async counterparts, used by the asyncio engine
+ASYNC_AI_FUNCTIONS = agent_loader.lazy_functions(prefix="a")
+
+# "threads" runs each agent on the shared executor; "asyncio" runs them as
+# coroutines on the worker's event loop, so in-flight generations park on
+# sockets instead of OS threads
+AGENT_ENGINE = os.environ.get("AGENT_ENGINE", "threads")
 
 
 class GeminiResponse:
@@ -98,15 +93,78 @@ class GeminiResponse:
         }
 
 
+GEMINI_MODEL = "gemini-2.5-flash"
+# Set to send classification over REST to another endpoint, e.g. a local stub server
+GEMINI_API_BASE = os.environ.get("GEMINI_API_BASE")
+
+# Classification cache settings
+GEMINI_CACHE_SIZE = int(os.environ.get("GEMINI_CACHE_SIZE", "1024"))
+GEMINI_CACHE_TTL = int(os.environ.get("GEMINI_CACHE_TTL", "3600"))
+
+
 class GeminiService:
-    def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel("gemini-2.5-flash")
+    def __init__(self, api_key: str, cache_size: int = GEMINI_CACHE_SIZE, cache_ttl: int = GEMINI_CACHE_TTL):
+        # Imported here so workers that never classify skip loading the gRPC stack
+        import google.generativeai as genai
+
+        if GEMINI_API_BASE:
+            genai.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": GEMINI_API_BASE})
+        else:
+            genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(GEMINI_MODEL)
+        # LRU cache with per-entry TTL of parsed GeminiResponse dicts
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @staticmethod
+    def cache_key(prompt: str) -> str:
+        """Hashes the prompt after collapsing whitespace and case."""
+        normalized = " ".join(prompt.split()).casefold()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def cache_stats(self) -> Dict:
+        with self.cache_lock:
+            return {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "size": len(self.cache),
+                "maxsize": self.cache.maxsize,
+                "ttl": self.cache.ttl,
+            }
 
     def generate_response(self, prompt: str) -> Dict:
+        key = self.cache_key(prompt)
+        with self.cache_lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache_hits += 1
+                return dict(cached)
+            self.cache_misses += 1
+
+        response = self._classify(prompt)
+        if response is not None:
+            with self.cache_lock:
+                self.cache[key] = response
+            return dict(response)
+        return self._fallback_response()
+
+    def _classify(self, prompt: str):
+        """Calls Gemini and parses its answer; returns None when the call fails."""
         try:
-            result = self.model.generate_content(f"{gen_ai_prompt}{prompt}")
-            response_text = result.text
+            start = time.perf_counter()
+            try:
+                with tracing.span("llm gemini", tracing.CLIENT, provider="gemini", model=GEMINI_MODEL):
+                    response_text = cassette.call(
+                        "gemini",
+                        {"model": GEMINI_MODEL, "prompt": prompt},
+                        lambda: self.model.generate_content(f"{gen_ai_prompt}{prompt}").text,
+                    )
+            except Exception:
+                metrics.LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, "gemini", GEMINI_MODEL, "error")
+                raise
+            metrics.LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, "gemini", GEMINI_MODEL, "ok")
 
             # Clean up the response text by removing unwanted formatting
             cleaned_text = (
@@ -130,19 +188,65 @@ class GeminiService:
 
         except Exception as error:
             logging.error("Gemini AI error: %s", error)
-            return GeminiResponse(
-                content_type="unrelated",
-                recommended_agent="unrelated",
-                available_agents=[
-                    "blogging",
-                    "content_writing",
-                    "technical_writing",
-                    "data_analysis",
-                    "general",
-                ],
-                confidence_score=0,
-                is_relevant=False,
-            ).to_dict()
+            return None
+
+    @staticmethod
+    def _fallback_response() -> Dict:
+        return GeminiResponse(
+            content_type="unrelated",
+            recommended_agent="unrelated",
+            available_agents=[
+                "blogging",
+                "content_writing",
+                "technical_writing",
+                "data_analysis",
+                "general",
+            ],
+            confidence_score=0,
+            is_relevant=False,
+        ).to_dict()
+
+
+_gemini_service = None
+_gemini_service_lock = threading.Lock()
+
+
+def get_gemini_service() -> GeminiService:
+    """Returns the worker's long-lived GeminiService, creating it on first use."""
+    global _gemini_service
+    if _gemini_service is None:
+        with _gemini_service_lock:
+            if _gemini_service is None:
+                _gemini_service = GeminiService(os.environ.get("GEMINI_API_KEY"))
+    return _gemini_service
+
+
+def _reset_gemini_after_fork():
+    # The Gemini SDK's gRPC channel is not fork-safe; a forked worker builds
+    # its own service (and, via genai.configure, its own client) on first use
+    global _gemini_service
+    _gemini_service = None
+
+
+os.register_at_fork(after_in_child=_reset_gemini_after_fork)
+
+
+def runtime_stats() -> Dict:
+    return {
+        "executor": executor.executor_stats(),
+        "event_loop": event_loop.loop_stats(),
+        "http_pool": http_pool.pool_stats(),
+        "rate_limits": rate_limit.limiter_stats(),
+        "search_cache": get_search_cache().stats() if get_search_cache() is not None else None,
+        "transcript_cache": transcript_cache_stats(),
+        "gemini_cache": _gemini_service.cache_stats() if _gemini_service else None,
+        "agent_registry": agent_registry.registry_stats(),
+        "agent_loader": agent_loader.loader_stats(),
+        "tracing": tracing.tracing_stats(),
+        "cassette": cassette.cassette_stats(),
+        "evaluation": evaluation.evaluator_stats(),
+        "generation_cache": generation_cache.generation_cache_stats(),
+    }
 
 
 # API Endpoints
@@ -160,6 +264,61 @@ def favicon():
     return "", 204
 
 
+# Runtime stats route
+@app.route("/stats", methods=["GET"])
+def stats():
+    """Reports executor, event loop, bulkhead, rate limiter, HTTP pool and cache counters."""
+    return jsonify(runtime_stats())
+
+
+# Prometheus metrics route
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Per-stage, per-provider and per-route latency histograms in the Prometheus text format."""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+def _route() -> str:
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+
+@app.before_request
+def start_request():
+    g.request_start = time.perf_counter()
+    # The request span stays open until teardown, i.e. after a streamed body
+    g.request_trace = tracing.span(
+        f"{request.method} {_route()}",
+        tracing.SERVER,
+        parent=tracing.parse_traceparent(request.headers.get("traceparent")),
+        route=_route(),
+    )
+    g.request_span = g.request_trace.__enter__()
+
+
+@app.after_request
+def record_request_latency(response):
+    start = g.get("request_start")
+    if start is not None:
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start, _route(), request.method, str(response.status_code)
+        )
+    span = g.get("request_span")
+    if span is not None:
+        span.set_attribute("http.status_code", response.status_code)
+        response.headers["traceparent"] = span.traceparent
+    return response
+
+
+@app.teardown_request
+def end_request_span(error=None):
+    trace = g.pop("request_trace", None)
+    if trace is not None:
+        if error is None:
+            trace.__exit__(None, None, None)
+        else:
+            trace.__exit__(type(error), error, error.__traceback__)
+
+
 # Gemini AI route
 @app.route("/gemini", methods=["POST"])
 def gemini():
@@ -171,52 +330,297 @@ def gemini():
         return jsonify({"error": "Missing or empty 'prompt' in request body"}), 400
 
     try:
-        service = GeminiService(os.environ.get("GEMINI_API_KEY"))
+        service = get_gemini_service()
         response = service.generate_response(data["prompt"])
         return jsonify(response)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-def execute_function(category, entry_id, input_data):
-    """Executes the AI function based on the category and entry ID."""
-    function = AI_FUNCTIONS.get(category, {}).get(str(entry_id))
-    if not function:
-        return {
-            "id": entry_id,
-            "error": f"No function found for category '{category}' and ID {entry_id}",
-        }
-    try:
-        result = function(input_data)
-
-        # Fix: if the agent returned a string, wrap it in a dict
-        if isinstance(result, str):
-            result = {"content": result}
-
-        content = (
-            result.get("blog")
-            or result.get("response")
-            or result.get("itinerary")
-            or result.get("summary")
-            or result.get("content")
+def execute_function(category, entry_id, input_data, on_token=None, research=None):
+    """
+    Executes the AI function based on the category and entry ID.
+
+    When `on_token` is given the agent streams its final stage and every
+    chunk is passed to `on_token(entry_id, chunk)` as it arrives. Agents
+    given the same `research` batch share their research phase.
+
+    A recent output of the agent for a near-identical input is returned
+    instead of running it (see generation_cache.py).
+    """
+    agents = AI_FUNCTIONS.get(category, {})
+    if str(entry_id) not in agents:
+        return _missing_function(category, entry_id)
+    agent = f"{category}{entry_id}"
+    cached = _cached_output(agent, category, entry_id, input_data, on_token)
+    if cached is not None:
+        return cached
+    with metrics.agent_run(agent), tracing.span(f"agent {agent}", engine=AGENT_ENGINE) as span:
+        try:
+            # Imports the agent's module on first use
+            function = agents[str(entry_id)]
+            with use_research_batch(research):
+                if on_token is not None:
+                    result = function(input_data, stream=True)
+                else:
+                    result = function(input_data)
+
+            # Fix: if the agent returned a string, wrap it in a dict
+            if isinstance(result, str):
+                result = {"content": result}
+
+            # Drain a streaming agent, forwarding tokens as they are generated
+            if "stream" in result:
+                chunks = []
+                for chunk in result.pop("stream"):
+                    chunks.append(chunk)
+                    on_token(entry_id, chunk)
+                result["content"] = "".join(chunks)
+                result["response_time"] = time.time() - result.pop("start_time")
+
+            _record_outcome(agent, span, "ok")
+            output = _agent_output(entry_id, result)
+            generation_cache.store(category, entry_id, input_data, output)
+            return output
+        except ProviderError as e:
+            _record_outcome(agent, span, "provider_error", e)
+            return _provider_error(category, entry_id, e)
+        except AgentLoadError as e:
+            _record_outcome(agent, span, "load_error", e)
+            return {"id": entry_id, "error": f"Error loading agent: {str(e)}"}
+        except Exception as e:
+            _record_outcome(agent, span, "error", e)
+            return {"id": entry_id, "error": f"Error executing function: {str(e)}"}
+
+
+async def aexecute_function(category, entry_id, input_data, on_token=None, research=None):
+    """Async counterpart of `execute_function`, run on the worker's event loop."""
+    agents = ASYNC_AI_FUNCTIONS.get(category, {})
+    if str(entry_id) not in agents:
+        return _missing_function(category, entry_id)
+    agent = f"{category}{entry_id}"
+    cached = _cached_output(agent, category, entry_id, input_data, on_token)
+    if cached is not None:
+        return cached
+    with metrics.agent_run(agent), tracing.span(f"agent {agent}", engine=AGENT_ENGINE) as span:
+        try:
+            function = agents[str(entry_id)]
+            with use_research_batch(research):
+                if on_token is not None:
+                    result = await function(input_data, stream=True)
+                else:
+                    result = await function(input_data)
+
+            if isinstance(result, str):
+                result = {"content": result}
+
+            if "stream" in result:
+                chunks = []
+                async for chunk in result.pop("stream"):
+                    chunks.append(chunk)
+                    on_token(entry_id, chunk)
+                result["content"] = "".join(chunks)
+                result["response_time"] = time.time() - result.pop("start_time")
+
+            _record_outcome(agent, span, "ok")
+            output = _agent_output(entry_id, result)
+            generation_cache.store(category, entry_id, input_data, output)
+            return output
+        except ProviderError as e:
+            _record_outcome(agent, span, "provider_error", e)
+            return _provider_error(category, entry_id, e)
+        except AgentLoadError as e:
+            _record_outcome(agent, span, "load_error", e)
+            return {"id": entry_id, "error": f"Error loading agent: {str(e)}"}
+        except Exception as e:
+            _record_outcome(agent, span, "error", e)
+            return {"id": entry_id, "error": f"Error executing function: {str(e)}"}
+
+
+def submit_function(category, entry_id, input_data, on_token=None, research=None):
+    """
+    Starts one agent on the configured engine and returns a concurrent
+    Future for its result, whichever engine runs it.
+    """
+    if AGENT_ENGINE == "asyncio":
+        return event_loop.submit_coroutine(
+            aexecute_function(category, entry_id, input_data, on_token, research)
         )
+    return executor.submit(execute_function, category, entry_id, input_data, on_token, research)
+
+
+def _cached_output(agent, category, entry_id, input_data, on_token):
+    start = time.time()
+    cached = generation_cache.lookup(category, entry_id, input_data)
+    if cached is None:
+        return None
+    metrics.AGENT_RUNS.inc(agent, "cached")
+    cached["response_time"] = time.time() - start
+    if on_token is not None:
+        on_token(entry_id, cached["content"])
+    return cached
+
+
+def _record_outcome(agent, span, outcome, error=None):
+    metrics.AGENT_RUNS.inc(agent, outcome)
+    if span is not None and error is not None:
+        # Agent errors are returned as results, so the span would not see them
+        span.error = f"{type(error).__name__}: {error}"
+
+
+def _missing_function(category, entry_id):
+    return {
+        "id": entry_id,
+        "error": f"No function found for category '{category}' and ID {entry_id}",
+    }
+
+
+def _agent_output(entry_id, result):
+    content = (
+        result.get("blog")
+        or result.get("response")
+        or result.get("itinerary")
+        or result.get("summary")
+        or result.get("content")
+    )
+
+    print(f"[DEBUG] Result returned: {result}")
+    print(f"[DEBUG] Extracted content: {content}")
+
+    return {
+        "id": entry_id,
+        "content": content,
+        "response_time": result.get("response_time"),
+    }
+
+
+def _provider_error(category, entry_id, e):
+    logging.error("Provider error in %s/%s: %s", category, entry_id, e)
+    return {
+        "id": entry_id,
+        "error": str(e),
+        "error_type": type(e).__name__,
+        "provider": e.provider,
+    }
+
+
+# Streaming formats for /generate_content (opt-in via ?stream=ndjson|sse)
+STREAM_MIMETYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
 
-        print(f"[DEBUG] Result returned: {result}")
-        print(f"[DEBUG] Extracted content: {content}")
 
+def format_stream_frame(frame: Dict, stream_format: str) -> str:
+    """Serializes one frame as an NDJSON line or a Server-Sent Event."""
+    payload = json.dumps(frame)
+    if stream_format == "sse":
+        return f"event: {frame['type']}\ndata: {payload}\n\n"
+    return f"{payload}\n"
+
+
+def stream_generation(data: List[Dict], stream_format: str, tokens: bool = False, research: ResearchBatch = None):
+    """
+    Yields each agent result with its evaluation as soon as it completes,
+    followed by a summary frame with every result in request order.
+
+    With `tokens=True` the final stage of every agent is streamed as well and
+    its chunks are emitted as "token" frames while the agents are running.
+    """
+    results = [None] * len(data)
+    evaluations = [[] for _ in data]
+    # Worker threads push token chunks and completed futures onto one queue
+    events = queue.Queue()
+
+    def on_token(entry_id, chunk):
+        events.put(("token", entry_id, chunk))
+
+    for idx, entry in enumerate(data):
+        future = submit_function(
+            entry.get("category"),
+            entry.get("id"),
+            entry.get("input"),
+            on_token if tokens else None,
+            research,
+        )
+        # The result is scored as soon as the agent finishes, then reported
+        scored = evaluation.evaluate_when_done(future)
+        scored.add_done_callback(lambda e, idx=idx, f=future: events.put(("done", idx, (f, e))))
+
+    pending = len(data)
+    while pending:
+        kind, key, value = events.get()
+        if kind == "token":
+            yield format_stream_frame(
+                {"type": "token", "id": key, "text": value}, stream_format
+            )
+            continue
+
+        pending -= 1
+        idx = key
+        future, scored = value
+        result = future.result()
+        evaluation_result = evaluation.collect([scored], near_duplicates=False).get("evaluations", [])
+        results[idx] = result
+        evaluations[idx] = evaluation_result
+        yield format_stream_frame(
+            {
+                "type": "result",
+                "result": result,
+                "evaluation": evaluation_result[0] if evaluation_result else None,
+            },
+            stream_format,
+        )
+
+    all_evaluations = [item for evaluation in evaluations for item in evaluation]
+    yield format_stream_frame(
+        {
+            "type": "summary",
+            "status": "success",
+            "results": results,
+            "evaluations": all_evaluations,
+            "near_duplicates": evaluation.find_near_duplicates(all_evaluations),
+        },
+        stream_format,
+    )
+
+
+def validate_generation_request(data):
+    """Returns the error payload for an invalid /generate_content body, or None."""
+    if not isinstance(data, list):
         return {
-            "id": entry_id,
-            "content": content,
-            "response_time": result.get("response_time"),
+            "status": "error",
+            "error": "Input must be a list of requests",
+            "received": data,
         }
-    except Exception as e:
-        return {"id": entry_id, "error": f"Error executing function: {str(e)}"}
+
+    # Validate each request in the list
+    for idx, entry in enumerate(data):
+        required_fields = ["category", "id", "input"]
+        missing_fields = [field for field in required_fields if field not in entry]
+        if missing_fields:
+            return {
+                "status": "error",
+                "error": f"Request {idx} is missing required fields: {missing_fields}",
+                "received": entry,
+            }
+    return None
 
 
 # Content Generation route
 @app.route("/generate_content", methods=["POST"])
 def generate_content():
-    """Generate content for a list of requests in parallel."""
+    """
+    Generate content for a list of requests in parallel.
+
+    Pass `?stream=ndjson` or `?stream=sse` to receive each result as soon as
+    its agent finishes instead of one response after the whole batch, and add
+    `&tokens=1` to also receive the final stage's tokens as they are generated.
+    Agents of one category share a research run for the same input (every
+    variant uses its category's researcher). `?share_research=all` also pools
+    research across blog, LinkedIn and travel: fewer runs, but each writer
+    gets whichever category's research ran first.
+    """
     if not request.is_json:
         return (
             jsonify(
@@ -230,48 +634,55 @@ def generate_content():
         logging.info(f"Received request data: {request.data.decode('utf-8')}")
 
         data = request.json
-        if not isinstance(data, list):
-            return (
-                jsonify(
-                    {
-                        "status": "error",
-                        "error": "Input must be a list of requests",
-                        "received": data,
-                    }
-                ),
-                400,
-            )
-
-        # Validate each request in the list
-        for idx, entry in enumerate(data):
-            required_fields = ["category", "id", "input"]
-            missing_fields = [field for field in required_fields if field not in entry]
-            if missing_fields:
+        error = validate_generation_request(data)
+        if error is not None:
+            return jsonify(error), 400
+
+        # Agents of this batch with the same category and input share one research run
+        research = ResearchBatch()
+        if request.args.get("share_research") == "all":
+            research.share_across_categories = True
+
+        stream_format = request.args.get("stream")
+        if stream_format:
+            if stream_format not in STREAM_MIMETYPES:
                 return (
                     jsonify(
                         {
                             "status": "error",
-                            "error": f"Request {idx} is missing required fields: {missing_fields}",
-                            "received": entry,
+                            "error": f"Unsupported stream format '{stream_format}', expected one of {list(STREAM_MIMETYPES)}",
                         }
                     ),
                     400,
                 )
+            return Response(
+                stream_with_context(
+                    stream_generation(
+                        data,
+                        stream_format,
+                        tokens=request.args.get("tokens") == "1",
+                        research=research,
+                    )
+                ),
+                mimetype=STREAM_MIMETYPES[stream_format],
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
 
-        with ThreadPoolExecutor() as executor:
-            futures = [
-                executor.submit(
-                    execute_function,
-                    entry.get("category"),
-                    entry.get("id"),
-                    entry.get("input"),
-                )
-                for entry in data
-            ]
-            results = [future.result() for future in futures]
+        futures = [
+            submit_function(
+                entry.get("category"),
+                entry.get("id"),
+                entry.get("input"),
+                research=research,
+            )
+            for entry in data
+        ]
+        # Each result is evaluated as soon as its agent finishes, off this thread
+        scored = [evaluation.evaluate_when_done(future) for future in futures]
+        results = [future.result() for future in futures]
+        logging.info("Research sharing for batch: %s", research.stats())
 
-        # Evaluate the generated content
-        evaluation_result = evaluate_content(results)
+        evaluation_result = evaluation.collect(scored)
 
         # Combine results with evaluations
         return (
@@ -280,6 +691,7 @@ def generate_content():
                     "status": "success",
                     "results": results,
                     "evaluations": evaluation_result.get("evaluations", []),
+                    "near_duplicates": evaluation_result.get("near_duplicates", []),
                 }
             ),
             200,
@@ -360,3 +772,7 @@ def parse_with_llama():
 def handle_exception(e):
     """Handle uncaught exceptions."""
     return jsonify({"status": "error", "error": f"Unexpected error: {str(e)}"}), 500
+
+
+agent_loader.warm()
+agent_loader.record_boot(_boot_started)
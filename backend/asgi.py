@@ -0,0 +1,299 @@
+# backend/asgi.py
+"""
+ASGI deployment mode.
+
+Serves the same routes as the Flask app, but every /generate_content request
+runs its agents as coroutines on the server's event loop, so in-flight
+generations do not each pin a worker. Run it with e.g.:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 8000 --workers 4
+"""
+import json
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+import evaluation
+import http_pool
+import metrics
+import tracing
+from app import (
+    CORS_ORIGINS,
+    STREAM_MIMETYPES,
+    aexecute_function,
+    format_stream_frame,
+    get_gemini_service,
+    runtime_stats,
+    validate_generation_request,
+)
+from executor import to_executor
+from research import ResearchBatch
+
+
+async def index(request: Request):
+    return PlainTextResponse("Welcome to the AI Content Generation API!")
+
+
+async def favicon(request: Request):
+    return Response(status_code=204)
+
+
+async def stats(request: Request):
+    """Reports the same counters as the Flask /stats route."""
+    return JSONResponse(runtime_stats())
+
+
+async def prometheus_metrics(request: Request):
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+def _is_json(request: Request) -> bool:
+    return request.headers.get("content-type", "").split(";")[0].strip() == "application/json"
+
+
+async def _json_body(request: Request):
+    """Returns the parsed JSON body, or an error response when it does not parse."""
+    try:
+        return await request.json(), None
+    except json.JSONDecodeError as e:
+        body = await request.body()
+        return None, JSONResponse(
+            {
+                "status": "error",
+                "error": f"Invalid JSON format: {str(e)}",
+                "received_data": body.decode("utf-8", errors="replace"),
+            },
+            400,
+        )
+
+
+async def gemini(request: Request):
+    if not _is_json(request):
+        return JSONResponse({"error": "Content-Type must be application/json"}, 415)
+
+    data, error = await _json_body(request)
+    if error is not None:
+        return error
+    if "prompt" not in data or not data["prompt"]:
+        return JSONResponse({"error": "Missing or empty 'prompt' in request body"}, 400)
+
+    try:
+        # The Gemini SDK is blocking, so classification runs on the shared executor
+        response = await to_executor(get_gemini_service().generate_response, data["prompt"])
+        return JSONResponse(response)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, 500)
+
+
+def _start(entry, research: ResearchBatch, on_token=None) -> asyncio.Task:
+    return asyncio.create_task(
+        aexecute_function(entry.get("category"), entry.get("id"), entry.get("input"), on_token, research)
+    )
+
+
+async def stream_generation(data, stream_format: str, tokens: bool = False, research: ResearchBatch = None):
+    """Async counterpart of app.stream_generation: same frames, same order."""
+    results = [None] * len(data)
+    evaluations = [[] for _ in data]
+    events = asyncio.Queue()
+
+    def on_token(entry_id, chunk):
+        events.put_nowait(("token", entry_id, chunk))
+
+    agents = []
+
+    async def run(idx: int, entry):
+        # The result is scored as soon as the agent finishes, then reported
+        task = _start(entry, research, on_token if tokens else None)
+        agents.append(task)
+        try:
+            scored = await evaluation.aevaluate_when_done(task)
+        except Exception as e:
+            logging.error("Evaluation failed: %s", e)
+            scored = None
+        events.put_nowait(("done", idx, (task, scored)))
+
+    runs = [asyncio.create_task(run(idx, entry)) for idx, entry in enumerate(data)]
+
+    try:
+        pending = len(data)
+        while pending:
+            kind, key, value = await events.get()
+            if kind == "token":
+                yield format_stream_frame({"type": "token", "id": key, "text": value}, stream_format)
+                continue
+
+            pending -= 1
+            idx = key
+            task, scored = value
+            result = task.result()
+            results[idx] = result
+            evaluations[idx] = [scored] if scored is not None else []
+            yield format_stream_frame(
+                {
+                    "type": "result",
+                    "result": result,
+                    "evaluation": scored,
+                },
+                stream_format,
+            )
+    finally:
+        # The client went away (the server closes this generator) or a frame
+        # failed: stop the agents nobody will read instead of paying for them
+        for unfinished in runs + agents:
+            if not unfinished.done():
+                unfinished.cancel()
+
+    all_evaluations = [item for evaluation in evaluations for item in evaluation]
+    yield format_stream_frame(
+        {
+            "type": "summary",
+            "status": "success",
+            "results": results,
+            "evaluations": all_evaluations,
+            "near_duplicates": evaluation.find_near_duplicates(all_evaluations),
+        },
+        stream_format,
+    )
+
+
+async def generate_content(request: Request):
+    """Same contract as the Flask route, including ?stream=, &tokens=1 and ?share_research=all."""
+    if not _is_json(request):
+        return JSONResponse({"status": "error", "error": "Content-Type must be application/json"}, 415)
+
+    data, error = await _json_body(request)
+    if error is not None:
+        return error
+
+    try:
+        error = validate_generation_request(data)
+        if error is not None:
+            return JSONResponse(error, 400)
+
+        research = ResearchBatch()
+        if request.query_params.get("share_research") == "all":
+            research.share_across_categories = True
+
+        stream_format = request.query_params.get("stream")
+        if stream_format:
+            if stream_format not in STREAM_MIMETYPES:
+                return JSONResponse(
+                    {
+                        "status": "error",
+                        "error": f"Unsupported stream format '{stream_format}', expected one of {list(STREAM_MIMETYPES)}",
+                    },
+                    400,
+                )
+            return StreamingResponse(
+                stream_generation(
+                    data,
+                    stream_format,
+                    tokens=request.query_params.get("tokens") == "1",
+                    research=research,
+                ),
+                media_type=STREAM_MIMETYPES[stream_format],
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+
+        tasks = [_start(entry, research) for entry in data]
+        # Each result is evaluated on the executor as soon as its agent finishes
+        scored = [asyncio.create_task(evaluation.aevaluate_when_done(task)) for task in tasks]
+        results = await asyncio.gather(*tasks)
+        logging.info("Research sharing for batch: %s", research.stats())
+
+        evaluation_result = await evaluation.acollect(scored)
+        return JSONResponse(
+            {
+                "status": "success",
+                "results": list(results),
+                "evaluations": evaluation_result.get("evaluations", []),
+                "near_duplicates": evaluation_result.get("near_duplicates", []),
+            }
+        )
+    except Exception as e:
+        logging.error(f"Unexpected error in generate_content: {str(e)}")
+        return JSONResponse({"status": "error", "error": f"An unexpected error occurred: {str(e)}"}, 500)
+
+
+async def parse_with_llama(request: Request):
+    return JSONResponse({"error": "LlamaParse functionality is currently disabled."}, 503)
+
+
+async def handle_exception(request: Request, exc: Exception):
+    """Handle uncaught exceptions."""
+    return JSONResponse({"status": "error", "error": f"Unexpected error: {str(exc)}"}, 500)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await http_pool.aclose_client()
+
+
+routes = [
+    Route("/", index, methods=["GET"]),
+    Route("/favicon.ico", favicon),
+    Route("/stats", stats, methods=["GET"]),
+    Route("/metrics", prometheus_metrics, methods=["GET"]),
+    Route("/gemini", gemini, methods=["POST"]),
+    Route("/generate_content", generate_content, methods=["POST"]),
+    Route("/parse-with-llama", parse_with_llama, methods=["POST"]),
+]
+
+
+class RequestMetricsMiddleware:
+    """
+    Records per-route latency up to the response start and wraps the request
+    in a trace span, like the Flask app's request hooks.
+    """
+
+    paths = {route.path for route in routes}
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        route = scope["path"] if scope["path"] in self.paths else "unmatched"
+        headers = dict(scope["headers"])
+        parent = tracing.parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+
+        with tracing.span(f"{scope['method']} {route}", tracing.SERVER, parent=parent, route=route) as span:
+
+            async def timed_send(message):
+                if message["type"] == "http.response.start":
+                    metrics.HTTP_REQUEST_SECONDS.observe(
+                        time.perf_counter() - start, route, scope["method"], str(message["status"])
+                    )
+                    if span is not None:
+                        span.set_attribute("http.status_code", message["status"])
+                        message.setdefault("headers", []).append((b"traceparent", span.traceparent.encode()))
+                await send(message)
+
+            await self.app(scope, receive, timed_send)
+
+
+app = Starlette(
+    routes=routes,
+    middleware=[
+        Middleware(RequestMetricsMiddleware),
+        Middleware(
+            CORSMiddleware,
+            allow_origins=[origin for origin in CORS_ORIGINS if origin],
+            allow_methods=["GET", "POST", "OPTIONS"],
+            allow_headers=["Content-Type"],
+        )
+    ],
+    exception_handlers={Exception: handle_exception},
+    lifespan=lifespan,
+)
@@ -1,7 +1,20 @@
 import os
+from contextlib import AsyncExitStack, ExitStack, contextmanager
+from typing import AsyncIterator, Iterator, Union
 import openai
+from openai.util import convert_to_openai_object
 from phi.llm.base import LLM
 from pydantic import BaseModel, Field
+import cassette
+import http_pool
+from executor import abulkhead, aopen_in_slot, bulkhead, open_in_slot
+from rate_limit import (
+    ProviderError,
+    RateLimitError,
+    acall_with_retries,
+    call_with_retries,
+    parse_retry_after,
+)
 
 # Azure OpenAI global config
 openai.api_type = "azure"
@@ -10,6 +23,34 @@ openai.api_base = os.getenv("OPENAI_API_BASE")
 openai.api_version = os.getenv("OPENAI_API_VERSION")
 AZURE_DEPLOYMENT = os.getenv("OPENAI_DEPLOYMENT_NAME")
 
+# openai 0.28 errors worth retrying besides 429s
+RETRYABLE_ERRORS = (
+    openai.error.ServiceUnavailableError,
+    openai.error.Timeout,
+    openai.error.APIConnectionError,
+    openai.error.TryAgain,
+)
+
+
+@contextmanager
+def openai_errors():
+    """Translates openai errors into typed provider errors."""
+    try:
+        yield
+    except openai.error.RateLimitError as e:
+        headers = e.headers or {}
+        retry_after = headers.get("retry-after") or headers.get("Retry-After")
+        raise RateLimitError("azure", str(e), retry_after=parse_retry_after(retry_after)) from e
+    except RETRYABLE_ERRORS as e:
+        raise ProviderError("azure", str(e), status=e.http_status, retryable=True) from e
+    except openai.error.OpenAIError as e:
+        status = e.http_status or 0
+        raise ProviderError("azure", str(e), status=e.http_status, retryable=status >= 500) from e
+
+
+def _to_dict(response) -> dict:
+    return response.to_dict_recursive()
+
 
 class AzureOpenAIChat(LLM, BaseModel):
     """
@@ -24,13 +65,110 @@ class AzureOpenAIChat(LLM, BaseModel):
     class Config:
         arbitrary_types_allowed = True  # Let non-pydantic objects (like openai) pass
 
-    def run(self, prompt: str, stream: bool = False, **kwargs) -> str:
-        try:
-            response = openai.ChatCompletion.create(
-                engine=self.engine,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=self.temperature,
+    def _request(self, prompt: str, **params) -> dict:
+        return dict(
+            engine=self.engine,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=self.temperature,
+            **params,
+        )
+
+    def _create(self, prompt: str, **params):
+        """Calls ChatCompletion.create, translating openai errors into typed provider errors."""
+        request = self._request(prompt, **params)
+
+        def create():
+            with openai_errors():
+                return openai.ChatCompletion.create(**request)
+
+        return cassette.call(
+            "azure", request, create, _to_dict, convert_to_openai_object, stream=params.get("stream", False)
+        )
+
+    async def _acreate(self, prompt: str, **params):
+        """Async `_create` over the event loop's pooled aiohttp session."""
+        request = self._request(prompt, **params)
+
+        async def acreate():
+            openai.aiosession.set(http_pool.get_aiohttp_session())
+            with openai_errors():
+                return await openai.ChatCompletion.acreate(**request)
+
+        return await cassette.acall(
+            "azure", request, acreate, _to_dict, convert_to_openai_object, stream=params.get("stream", False)
+        )
+
+    def run(self, prompt: str, stream: bool = False, **kwargs) -> Union[str, Iterator[str]]:
+        """
+        Raises:
+            ProviderError: The call failed or its retry budget ran out.
+        """
+        if stream:
+            return self.run_stream(prompt)
+
+        def call():
+            with bulkhead("azure"):
+                return self._create(prompt)
+
+        response = call_with_retries("azure", self.engine or "azure", prompt, call)
+        return response["choices"][0]["message"]["content"]
+
+    def run_stream(self, prompt: str) -> Iterator[str]:
+        """Yields content deltas from a streaming ChatCompletion as they arrive."""
+        # The slot is taken per attempt, after the rate limiter, and held for the
+        # whole stream, since the connection stays busy (see open_in_slot)
+        with ExitStack() as slot:
+            response = call_with_retries(
+                "azure",
+                self.engine or "azure",
+                prompt,
+                lambda: open_in_slot("azure", slot, lambda: self._create(prompt, stream=True)),
+            )
+            try:
+                for chunk in response:
+                    content = self._delta(chunk)
+                    if content:
+                        yield content
+            except openai.error.OpenAIError as e:
+                raise ProviderError("azure", f"stream interrupted: {e}", status=e.http_status) from e
+
+    @staticmethod
+    def _delta(chunk) -> str:
+        # Azure sends an initial chunk with no choices (content filter results)
+        if not chunk["choices"]:
+            return None
+        return chunk["choices"][0].get("delta", {}).get("content")
+
+    async def arun(self, prompt: str, stream: bool = False, **kwargs) -> Union[str, AsyncIterator[str]]:
+        """
+        Async counterpart of `run`.
+
+        Raises:
+            ProviderError: The call failed or its retry budget ran out.
+        """
+        if stream:
+            return self.arun_stream(prompt)
+
+        async def call():
+            async with abulkhead("azure"):
+                return await self._acreate(prompt)
+
+        response = await acall_with_retries("azure", self.engine or "azure", prompt, call)
+        return response["choices"][0]["message"]["content"]
+
+    async def arun_stream(self, prompt: str) -> AsyncIterator[str]:
+        """Async counterpart of `run_stream`."""
+        async with AsyncExitStack() as slot:
+            response = await acall_with_retries(
+                "azure",
+                self.engine or "azure",
+                prompt,
+                lambda: aopen_in_slot("azure", slot, lambda: self._acreate(prompt, stream=True)),
             )
-            return response["choices"][0]["message"]["content"]
-        except Exception as e:
-            return f"An error occurred: {str(e)}"
+            try:
+                async for chunk in response:
+                    content = self._delta(chunk)
+                    if content:
+                        yield content
+            except openai.error.OpenAIError as e:
+                raise ProviderError("azure", f"stream interrupted: {e}", status=e.http_status) from e
@@ -0,0 +1,92 @@
+# backend/benchmarks/agent_overhead.py
+"""
+Measures per-request framework overhead of the agents (Assistant, LLM and
+tool construction, pydantic validation, prompt assembly) with a stub LLM
+that answers instantly, with and without the agent registry.
+
+    python benchmarks/agent_overhead.py --calls 200
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for name in ("GEMINI_API_KEY", "GROQ_API_KEY", "SERPER_API_KEY"):
+    os.environ.setdefault(name, "stub")
+os.environ.setdefault("RATE_LIMITS", '{"llama-3.3-70b-versatile": [10000000, 10000000000], "llama-3.1-8b-instant": [10000000, 10000000000], "gemini-2.5-flash": [10000000, 10000000000]}')
+os.environ.setdefault("RATE_LIMIT_DEFAULT_RPM", "10000000")
+os.environ.setdefault("RATE_LIMIT_DEFAULT_TPM", "10000000000")
+
+import httpx  # noqa: E402
+import http_pool  # noqa: E402
+import agent_registry  # noqa: E402
+from azure_openai_patch import AzureOpenAIChat  # noqa: E402
+from groq_patch import Groq  # noqa: E402
+
+STUB_TEXT = "Stub research and writing output."
+
+
+def _gemini_post(url, **kwargs):
+    body = {"candidates": [{"content": {"parts": [{"text": STUB_TEXT}]}}]}
+    return httpx.Response(200, json=body, request=httpx.Request("POST", url))
+
+
+def _groq_invoke(self, messages):
+    message = SimpleNamespace(role="assistant", content=STUB_TEXT, tool_calls=None)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def _azure_create(self, prompt, **params):
+    return {"choices": [{"message": {"content": STUB_TEXT}}]}
+
+
+http_pool.post = _gemini_post
+Groq.invoke = _groq_invoke
+AzureOpenAIChat._create = _azure_create
+
+from ai_agents.blog1 import blog1  # noqa: E402
+from ai_agents.blog2 import blog2  # noqa: E402
+from ai_agents.blog3 import blog3  # noqa: E402
+from ai_agents.linkedin3 import linkedin_post3  # noqa: E402
+from ai_agents.travel3 import itinerary3  # noqa: E402
+
+AGENTS = {
+    "blog1 (azure)": blog1,
+    "blog2 (groq)": blog2,
+    "blog3 (gemini)": blog3,
+    "linkedin3 (gemini)": linkedin_post3,
+    "travel3 (groq)": itinerary3,
+}
+
+
+def measure(function, calls: int) -> float:
+    """Returns the median wall time of one call, in milliseconds."""
+    function("warm-up topic")
+    timings = []
+    for idx in range(calls):
+        start = time.perf_counter()
+        function(f"benchmark topic {idx}")
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'agent':<20} {'rebuilt (ms)':>13} {'registry (ms)':>14} {'speedup':>8}")
+    for name, function in AGENTS.items():
+        agent_registry.REGISTRY_ENABLED = False
+        before = measure(function, args.calls)
+        agent_registry.REGISTRY_ENABLED = True
+        after = measure(function, args.calls)
+        print(f"{name:<20} {before:>13.2f} {after:>14.2f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# backend/benchmarks/bench_generation_cache.py
+"""
+Checks and times generation_cache.py's near-match lookups.
+
+Prints the similarity of paraphrased topic pairs and whether each would
+be served from the cache at GENERATION_CACHE_THRESHOLD, then fills one
+agent's index with random topics and reports lookup and store latency,
+how many stored topics a small rewording still finds, and that the index
+stays at GENERATION_CACHE_SIZE entries.
+
+    python benchmarks/bench_generation_cache.py --topics 5000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generation_cache  # noqa: E402
+
+PAIRS = [
+    ("Trip to Paris", "paris trip itinerary"),
+    ("Trip to Paris", "Trip to Rome"),
+    ("Write a blog about remote work productivity", "remote work productivity blog"),
+    ("Write a blog about remote work productivity", "Write a blog about remote work burnout"),
+    ("5 day itinerary for Lisbon in spring", "Lisbon itinerary, 5 days, spring"),
+    ("5 day itinerary for Lisbon in spring", "7 day itinerary for Lisbon in spring"),
+    ("Summarize https://youtu.be/abc123", "summarize https://youtu.be/xyz789"),
+    ("why you should learn Python", "why you should not learn Python"),
+    ("tips for junior engineers", "tips for senior engineers"),
+    ({"destination": "Tokyo", "days": 4}, {"days": 4, "destination": "tokyo"}),
+]
+
+WORDS = (
+    "paris rome lisbon tokyo budget luxury family food museum hiking beach winter summer weekend "
+    "startup marketing growth hiring remote productivity burnout leadership product launch data "
+    "python cloud security privacy climate energy health fitness nutrition finance investing"
+).split()
+
+
+def paraphrase(rng: random.Random, topic: str) -> str:
+    words = topic.split()
+    rng.shuffle(words)
+    return "Write about " + " ".join(word.upper() if rng.random() < 0.3 else word for word in words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=5000, help="topics stored in one agent's index")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    generation_cache.GENERATION_CACHE_ENABLED = True
+    print(f"threshold {generation_cache.GENERATION_CACHE_THRESHOLD}:")
+    for index, (first, second) in enumerate(PAIRS):
+        generation_cache.store("pairs", index, first, {"id": index, "content": "output"})
+        hit = generation_cache.lookup("pairs", index, second)
+        a, b = generation_cache.normalize(first), generation_cache.normalize(second)
+        print(f"  {len(a & b) / len(a | b):.2f} {'hit ' if hit else 'miss'}  {first!r} / {second!r}")
+
+    rng = random.Random(args.seed)
+    topics = [" ".join(rng.sample(WORDS, rng.randint(3, 6))) for _ in range(args.topics)]
+    start = time.perf_counter()
+    for topic in topics:
+        generation_cache.store("bench", 1, topic, {"id": 1, "content": topic})
+    stored = (time.perf_counter() - start) / len(topics)
+
+    recent = topics[-generation_cache.GENERATION_CACHE_SIZE:]
+    start = time.perf_counter()
+    found = sum(
+        generation_cache.lookup("bench", 1, paraphrase(rng, topic)) is not None for topic in recent
+    )
+    lookup = (time.perf_counter() - start) / len(recent)
+    print(f"store {stored * 1e6:.0f} us, lookup {lookup * 1e6:.0f} us; "
+          f"{found}/{len(recent)} reworded recent topics served from the cache")
+    print(generation_cache.generation_cache_stats())
+
+
+if __name__ == "__main__":
+    main()
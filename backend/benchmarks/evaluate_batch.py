@@ -0,0 +1,65 @@
+# backend/benchmarks/evaluate_batch.py
+"""
+Compares resp.evaluate_batch (feature columns scored with NumPy) with the
+per-document resp.evaluate_content at 1k and 100k documents.
+tests/test_resp.py checks that both return exactly the same evaluations.
+
+Also reports the split of the batch time between extracting the feature
+columns (string work, still one document at a time) and scoring them.
+Documents are 20 to 1500 words; the 100k batch cycles through the
+distinct ones to keep memory down.
+
+    python benchmarks/evaluate_batch.py --sizes 1000 100000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import resp  # noqa: E402
+from evaluate_features import random_document  # noqa: E402
+
+
+def make_results(size: int, distinct: list) -> list:
+    return [{"id": str(index), "content": distinct[index % len(distinct)]} for index in range(size)]
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--distinct", type=int, default=2000, help="distinct documents to cycle through")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    distinct = [random_document(rng, rng.choice([20, 80, 150, 300, 600, 1000, 1500])) for _ in range(args.distinct)]
+
+    resp.score_batch(distinct[:10])  # imports NumPy outside the timings
+    for size in args.sizes:
+        results = make_results(size, distinct)
+        contents = [item["content"] for item in results]
+        # Near-duplicate grouping is the same code in both; time the scoring
+        scalar = timed(resp.evaluate_content, results, False)
+        batch = timed(resp.evaluate_batch, results, False)
+        start = time.perf_counter()
+        columns = resp.extract_columns(contents)
+        extract = time.perf_counter() - start
+        score = timed(resp.score_columns, columns)
+        print(
+            f"{size:>7} docs: evaluate_content {scalar * 1000:9.1f} ms, evaluate_batch {batch * 1000:9.1f} ms "
+            f"({scalar / batch:.2f}x); columns: extract {extract * 1000:.1f} ms + score {score * 1000:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# backend/benchmarks/evaluate_features.py
+"""
+Times resp.py's single-pass scorers against the original per-scorer
+implementation (kept below as the reference) on 10k-word documents.
+tests/test_resp.py checks that both give exactly the same feature counts
+and scores.
+
+    python benchmarks/evaluate_features.py --words 10000
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import resp  # noqa: E402
+
+
+# The scorers as they were before the single-pass extractor, verbatim
+def reference_clarity(content: str) -> int:
+    avg_sentence_length = len(content.split()) / (len(re.split('[.!?]+', content)) + 1)
+    score = 5
+    if avg_sentence_length > 25: score -= 1
+    if avg_sentence_length > 35: score -= 1
+    if '###' not in content: score -= 1
+    if len(content.split()) < 100: score -= 1
+    return max(1, score)
+
+
+def reference_structure(content: str) -> int:
+    score = 5
+    if not content.startswith('*'): score -= 1
+    if '###' not in content: score -= 2
+    if '\n\n' not in content: score -= 1
+    if len(content.split('\n\n')) < 3: score -= 1
+    return max(1, score)
+
+
+def reference_engagement(content: str) -> int:
+    engagement_indicators = [
+        '?', '!', 'imagine', 'consider', 'you', 'we', 'discover',
+        'explore', 'learn', 'understand', 'revolutionize'
+    ]
+    score = 1
+    for indicator in engagement_indicators:
+        if indicator.lower() in content.lower():
+            score += 0.5
+    return min(5, round(score))
+
+
+def reference_depth(content: str) -> int:
+    word_count = len(content.split())
+    score = 1
+    if word_count > 300: score += 1
+    if word_count > 600: score += 1
+    if word_count > 1000: score += 1
+    if len(re.findall(r'\d+', content)) > 5: score += 1
+    return min(5, score)
+
+
+def reference_formatting(content: str) -> int:
+    score = 5
+    if '*' not in content: score -= 1
+    if '###' not in content: score -= 1
+    if '\n\n' not in content: score -= 1
+    if len(content.split('\n')) < 10: score -= 1
+    if not re.search(r'\n\s*\n', content): score -= 1
+    return max(1, score)
+
+
+REFERENCE = {
+    'clarity': reference_clarity,
+    'structure': reference_structure,
+    'engagement': reference_engagement,
+    'depth': reference_depth,
+    'formatting': reference_formatting,
+}
+SINGLE_PASS = {
+    'clarity': resp.score_clarity,
+    'structure': resp.score_structure,
+    'engagement': resp.score_engagement,
+    'depth': resp.score_depth,
+    'formatting': resp.score_formatting,
+}
+
+VOCABULARY = (
+    "the a of and to in for with travel itinerary budget guide data results growth team product launch "
+    "imagine consider you we discover explore learn understand revolutionize Paris Lisbon 2025 42 3.5%"
+).split()
+SEPARATORS = [" "] * 30 + [". ", "! ", "? ", "... ", "?! ", "\n", "\n\n", "\n \n", ", ", " ** ", "\t"]
+def random_document(rng: random.Random, words: int) -> str:
+    parts = []
+    if rng.random() < 0.5:
+        parts.append("**Title**\n\n")
+    for _ in range(words):
+        if rng.random() < 0.01:
+            parts.append("\n\n### Section\n\n")
+        parts.append(rng.choice(VOCABULARY))
+        parts.append(rng.choice(SEPARATORS))
+    return "".join(parts)
+
+
+def reference_evaluate(content: str) -> dict:
+    return {name: scorer(content) for name, scorer in REFERENCE.items()}
+
+
+def single_pass_evaluate(content: str) -> dict:
+    features = resp.extract_features(content)
+    return {name: scorer(features) for name, scorer in SINGLE_PASS.items()}
+
+
+def timed(fn, documents: list, repeat: int) -> float:
+    """Median milliseconds to score one document."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in documents:
+            fn(content)
+        runs.append((time.perf_counter() - start) / len(documents) * 1000)
+    return statistics.median(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=10000, help="words per benchmark document")
+    parser.add_argument("--samples", type=int, default=20, help="benchmark documents")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    documents = [random_document(rng, args.words) for _ in range(args.samples)]
+    before = timed(reference_evaluate, documents, args.repeat)
+    after = timed(single_pass_evaluate, documents, args.repeat)
+    print(f"{args.words}-word documents, all five scores: "
+          f"reference {before:.3f} ms, single pass {after:.3f} ms ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# backend/benchmarks/evaluation_pool.py
+"""
+Measures what scoring long results costs the other requests of a worker.
+
+Request threads repeatedly do ~1 ms of Python work and then wait 5 ms (a
+stand-in for request handling around provider I/O) while batches of
+10k-word results are scored back to back for a fixed time, first inline
+(EVAL_PROCESSES=0) and then through the evaluation process pool, whatever
+their length. Reports the request threads' latency and the time to score
+a batch, which is where EVAL_INLINE_MAX_CHARS comes from.
+
+    python benchmarks/evaluation_pool.py --duration 10 --batch-size 4 --words 50000
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import evaluation  # noqa: E402
+from evaluate_features import random_document  # noqa: E402
+
+
+def request_work():
+    payload = {"results": [{"id": str(index), "content": "x" * 50} for index in range(40)]}
+    for _ in range(10):
+        json.loads(json.dumps(payload))
+
+
+def run(processes: int, batches: list, request_threads: int, duration: float) -> dict:
+    evaluation.EVAL_PROCESSES = processes
+    evaluation.EVAL_INLINE_MAX_CHARS = 0
+    evaluation._memo.clear()
+    # Start the pool outside the measurement
+    evaluation.evaluate({"id": "warm", "content": "warm " * 2000}).result()
+    evaluation._memo.clear()
+
+    latencies = []
+    stop = threading.Event()
+
+    def requester():
+        while not stop.is_set():
+            start = time.perf_counter()
+            request_work()
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.005)
+
+    threads = [threading.Thread(target=requester) for _ in range(request_threads)]
+    for thread in threads:
+        thread.start()
+    batch_seconds = []
+    stop_at = time.perf_counter() + duration
+    while time.perf_counter() < stop_at:
+        # The memo would answer repeated batches without scoring them
+        evaluation._memo.clear()
+        start = time.perf_counter()
+        evaluation.collect([evaluation.evaluate(result) for result in batches[len(batch_seconds) % len(batches)]])
+        batch_seconds.append(time.perf_counter() - start)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    return {
+        "request_p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "request_p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2),
+        "requests": len(latencies),
+        "batches": len(batch_seconds),
+        "batch_ms": round(statistics.median(batch_seconds) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per mode")
+    parser.add_argument("--batches", type=int, default=5, help="distinct batches to cycle through")
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--words", type=int, default=10000)
+    parser.add_argument("--request-threads", type=int, default=4)
+    parser.add_argument("--processes", type=int, default=2)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    batches = [
+        [{"id": str(index), "content": random_document(rng, args.words)} for index in range(args.batch_size)]
+        for _ in range(args.batches)
+    ]
+    for label, processes in (("inline", 0), (f"pool of {args.processes}", args.processes)):
+        print(f"{label:<10} {run(processes, batches, args.request_threads, args.duration)}")
+
+
+if __name__ == "__main__":
+    main()
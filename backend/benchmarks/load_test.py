@@ -0,0 +1,303 @@
+# backend/benchmarks/load_test.py
+"""
+End-to-end load test of /generate_content and /gemini against local stub
+providers (stub_servers.py), so no API quota is spent.
+
+Starts the stub servers and the backend (gunicorn wsgi:app or uvicorn
+asgi:app) pointed at them, then runs a closed loop of clients at each
+concurrency level and reports RPS, p50/p95/p99 latency and error rate per
+route. Results are written as JSON; pass a previous run as --baseline to
+print the change and fail when p95 or throughput regress beyond
+--max-regression.
+
+    python benchmarks/load_test.py --concurrency 10 50 --duration 30 --output results.json
+    python benchmarks/load_test.py --server asgi --stub-set groq.errors.429=0.05
+    python benchmarks/load_test.py --baseline results.json --output new.json
+
+With --cassette, provider traffic is recorded to or replayed from a cassette
+(see cassette.py). Recording first sends every agent and input once, so the
+cassette covers the whole request mix; replaying it benchmarks the backend's
+own overhead with identical provider responses on every run:
+
+    python benchmarks/load_test.py --cassette-mode record --cassette run.jsonl.gz
+    python benchmarks/load_test.py --cassette-mode replay --cassette run.jsonl.gz --cassette-timing 1
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+import httpx
+
+from serving import BACKEND, _free_port
+
+INPUTS = {
+    "blog": ["python performance tips", "remote work culture", "electric vehicles in 2025", "home composting"],
+    "linkedin": ["hiring junior engineers", "lessons from a product launch", "mentoring in tech"],
+    "travel": ["Trip to Paris", "paris trip itinerary", "weekend in Lisbon", "two weeks in Japan"],
+    "youtube": [f"https://www.youtube.com/watch?v=stubVideo{idx:02d}" for idx in range(20)],
+}
+AGENTS = [f"{category}:{entry_id}" for category in INPUTS for entry_id in "1234"]
+
+
+def start_stubs(overrides: list, profile: str = None):
+    command = [sys.executable, os.path.join(BACKEND, "benchmarks", "stub_servers.py")]
+    if profile:
+        command += ["--profile", profile]
+    for assignment in overrides:
+        command += ["--set", assignment]
+    stubs = subprocess.Popen(command, cwd=os.path.join(BACKEND, "benchmarks"), stdout=subprocess.PIPE, text=True)
+    line = stubs.stdout.readline()
+    if not line:
+        stubs.kill()
+        raise RuntimeError("stub servers did not start")
+    return stubs, json.loads(line)
+
+
+def start_backend(server: str, workers: int, port: int, stub_env: dict, cache_dir: str, cassette_env: dict = None):
+    env = dict(
+        os.environ,
+        **stub_env,
+        **(cassette_env or {}),
+        FRONTEND_URL1=os.getenv("FRONTEND_URL1", "http://localhost:3001"),
+        FRONTEND_URL2=os.getenv("FRONTEND_URL2", "http://localhost:3002"),
+        # Measure the serving path, not the caches or quota pacing
+        SEARCH_CACHE_ENABLED="0",
+        GENERATION_CACHE_ENABLED="0",
+        TRANSCRIPT_CACHE_PATH=os.path.join(cache_dir, "transcripts.sqlite3"),
+        RATE_LIMITS=json.dumps(
+            {model: [10**7, 10**10] for model in ("llama-3.3-70b-versatile", "llama-3.1-8b-instant", "gemini-2.5-flash", "gemini-1.5-flash")}
+        ),
+        RATE_LIMIT_DEFAULT_RPM=str(10**7),
+        RATE_LIMIT_DEFAULT_TPM=str(10**10),
+    )
+    if server == "wsgi":
+        command = [
+            sys.executable, "-m", "gunicorn", "wsgi:app", "--workers", str(workers), "--threads", "8",
+            "--bind", f"127.0.0.1:{port}", "--timeout", "600", "--backlog", "4096", "--log-level", "warning",
+        ]
+    else:
+        command = [
+            sys.executable, "-m", "uvicorn", "asgi:app", "--workers", str(workers), "--host", "127.0.0.1",
+            "--port", str(port), "--backlog", "4096", "--log-level", "warning", "--no-access-log",
+        ]
+    backend = subprocess.Popen(command, cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return backend
+        except httpx.HTTPError:
+            time.sleep(0.25)
+    backend.kill()
+    raise RuntimeError(f"{server} backend did not start")
+
+
+def make_request(agents: list, batch: int, gemini_share: float):
+    """Picks the next request of the mix: (route, JSON body)."""
+    if random.random() < gemini_share:
+        category = random.choice(list(INPUTS))
+        return "/gemini", {"prompt": f"Write about {random.choice(INPUTS[category])}"}
+    entries = []
+    for _ in range(batch):
+        category, entry_id = random.choice(agents).split(":")
+        entries.append({"category": category, "id": entry_id, "input": random.choice(INPUTS[category])})
+    return "/generate_content", entries
+
+
+def _failed(route: str, response: httpx.Response) -> bool:
+    if response.status_code != 200:
+        return True
+    if route == "/generate_content":
+        return any(result.get("error") for result in response.json().get("results", []))
+    return False
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 2),
+        "p50": round(percentile(latencies, 0.50), 4) if latencies else None,
+        "p95": round(percentile(latencies, 0.95), 4) if latencies else None,
+        "p99": round(percentile(latencies, 0.99), 4) if latencies else None,
+        "errors": errors,
+        "error_rate": round(errors / len(latencies), 4) if latencies else 0.0,
+    }
+
+
+async def run_level(base_url: str, concurrency: int, duration: float, args) -> dict:
+    """Runs `concurrency` closed-loop clients for `duration` seconds."""
+    samples = {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        stop_at = time.perf_counter() + duration
+
+        async def client_loop():
+            while time.perf_counter() < stop_at:
+                route, body = make_request(args.agents, args.batch, args.gemini_share)
+                start = time.perf_counter()
+                try:
+                    response = await client.post(route, json=body)
+                    failed = _failed(route, response)
+                except (httpx.HTTPError, ValueError):
+                    failed = True
+                latencies, errors = samples.setdefault(route, ([], [0]))
+                latencies.append(time.perf_counter() - start)
+                errors[0] += failed
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    routes = {route: summarize(latencies, errors[0], elapsed) for route, (latencies, errors) in samples.items()}
+    all_latencies = [value for latencies, _ in samples.values() for value in latencies]
+    total = summarize(all_latencies, sum(errors[0] for _, errors in samples.values()), elapsed)
+    return {"concurrency": concurrency, "seconds": round(elapsed, 2), "total": total, "routes": routes}
+
+
+async def record_sweep(base_url: str, args, concurrency: int = 8):
+    """Sends every agent and input (and every input to /gemini) once."""
+    requests = [("/gemini", {"prompt": f"Write about {text}"}) for texts in INPUTS.values() for text in texts]
+    for agent in args.agents:
+        category, entry_id = agent.split(":")
+        requests += [("/generate_content", [{"category": category, "id": entry_id, "input": text}]) for text in INPUTS[category]]
+    pending = iter(requests)
+    failures = [0]
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout) as client:
+
+        async def sender():
+            for route, body in pending:
+                try:
+                    failures[0] += _failed(route, await client.post(route, json=body))
+                except (httpx.HTTPError, ValueError):
+                    failures[0] += 1
+
+        await asyncio.gather(*(sender() for _ in range(concurrency)))
+    print(f"recorded {len(requests)} requests ({failures[0]} failed)", flush=True)
+
+
+def compare(baseline: dict, current: dict, max_regression: float) -> bool:
+    """Prints p95 and RPS changes per level and route; returns False on a regression."""
+    ok = True
+    previous = {level["concurrency"]: level for level in baseline["levels"]}
+    for level in current["levels"]:
+        before = previous.get(level["concurrency"])
+        if before is None:
+            continue
+        for route, now in level["routes"].items():
+            then = before["routes"].get(route)
+            if not then or not then["p95"] or not then["rps"]:
+                continue
+            p95_change = now["p95"] / then["p95"] - 1
+            rps_change = now["rps"] / then["rps"] - 1
+            regressed = p95_change > max_regression or rps_change < -max_regression
+            ok = ok and not regressed
+            print(
+                f"c={level['concurrency']:<5} {route:<18} p95 {then['p95']:.3f}s -> {now['p95']:.3f}s ({p95_change:+.1%})"
+                f"  rps {then['rps']:.1f} -> {now['rps']:.1f} ({rps_change:+.1%}){'  REGRESSION' if regressed else ''}"
+            )
+    return ok
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=BACKEND, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=["wsgi", "asgi"], default="wsgi")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--duration", type=float, default=30, help="seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds of unrecorded load first")
+    parser.add_argument("--agents", nargs="+", default=AGENTS, help="category:id agents to mix, e.g. blog:2")
+    parser.add_argument("--batch", type=int, default=1, help="agents per /generate_content request")
+    parser.add_argument("--gemini-share", type=float, default=0.2, help="fraction of requests sent to /gemini")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--stub-profile", help="JSON latency/error profile for stub_servers.py")
+    parser.add_argument("--stub-set", action="append", default=[], metavar="PROVIDER.KEY=VALUE")
+    parser.add_argument("--cassette", help="cassette file to record provider traffic to or replay it from")
+    parser.add_argument("--cassette-mode", choices=["record", "replay"], default="replay")
+    parser.add_argument("--cassette-timing", type=float, default=0, help="replay speed: 0 instant, 1 as recorded")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="previous --output file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.10)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    cassette_env = {}
+    if args.cassette:
+        cassette_env = {
+            "CASSETTE_MODE": args.cassette_mode,
+            "CASSETTE_PATH": os.path.abspath(args.cassette),
+            "CASSETTE_TIMING": str(args.cassette_timing),
+        }
+
+    # Replays never reach the stubs, but the backend still gets their endpoints and keys
+    stubs, stub_info = start_stubs(args.stub_set, args.stub_profile)
+    port = _free_port()
+    with tempfile.TemporaryDirectory(prefix="load-test-") as cache_dir:
+        backend = start_backend(args.server, args.workers, port, stub_info["env"], cache_dir, cassette_env)
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            if args.cassette and args.cassette_mode == "record":
+                asyncio.run(record_sweep(base_url, args))
+            if args.warmup:
+                asyncio.run(run_level(base_url, max(args.concurrency), args.warmup, args))
+            levels = []
+            for concurrency in args.concurrency:
+                level = asyncio.run(run_level(base_url, concurrency, args.duration, args))
+                levels.append(level)
+                print(json.dumps(level), flush=True)
+        finally:
+            backend.terminate()
+            backend.wait()
+            stubs.terminate()
+            stubs.wait()
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "server": args.server,
+            "workers": args.workers,
+            "duration": args.duration,
+            "batch": args.batch,
+            "gemini_share": args.gemini_share,
+            "agents": args.agents,
+            "stub_profile": args.stub_profile,
+            "stub_overrides": args.stub_set,
+            "cassette": args.cassette and {"path": args.cassette, "mode": args.cassette_mode, "timing": args.cassette_timing},
+            "seed": args.seed,
+        },
+        "levels": levels,
+    }
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+    if args.baseline:
+        with open(args.baseline) as handle:
+            if not compare(json.load(handle), results, args.max_regression):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
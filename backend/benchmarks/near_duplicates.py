@@ -0,0 +1,96 @@
+# backend/benchmarks/near_duplicates.py
+"""
+Checks and times resp.py's MinHash near-duplicate detection.
+
+Builds batches of unrelated documents plus edited copies of some of them
+(a fraction of words replaced), then reports:
+  - how often a copy is grouped with its original, per edit rate, and
+    whether any unrelated documents were grouped;
+  - the time to sign a document, and to group batches of growing size
+    (the banding makes this linear, so time per document stays flat);
+  - the time of a MinHashIndex lookup among EVAL_RECENT_OUTPUTS-sized
+    indexes, and whether it finds the original of each edited copy.
+
+    python benchmarks/near_duplicates.py --words 800 --sizes 1000 4000 16000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import resp  # noqa: E402
+from evaluate_features import random_document  # noqa: E402
+
+EDIT_RATES = (0.0, 0.01, 0.02, 0.05, 0.1, 0.2)
+
+
+def edited(rng: random.Random, content: str, rate: float) -> str:
+    return " ".join(word if rng.random() >= rate else "edited" for word in content.split(" "))
+
+
+def accuracy(rng: random.Random, originals: list, copies_per_rate: int):
+    print(f"grouped with their original, {len(originals)}-document batches:")
+    signatures = [resp.minhash_signature(content) for content in originals]
+    for rate in EDIT_RATES:
+        found = 0
+        for index in range(copies_per_rate):
+            copy = resp.minhash_signature(edited(rng, originals[index], rate))
+            groups = resp.near_duplicate_groups(signatures + [copy])
+            found += any(index in group and len(signatures) in group for group in groups)
+        print(f"  {rate:>4.0%} of words edited: {found}/{copies_per_rate}")
+    false_groups = resp.near_duplicate_groups(signatures)
+    print(f"  unrelated documents grouped: {sum(len(group) for group in false_groups)}")
+
+
+def timing(rng: random.Random, words: int, sizes: list, distinct: list):
+    start = time.perf_counter()
+    signatures = [resp.minhash_signature(content) for content in distinct]
+    print(f"signature: {(time.perf_counter() - start) / len(distinct) * 1000:.2f} ms per {words}-word document")
+
+    for size in sizes:
+        # A tenth of each batch duplicates another document of the batch
+        batch = [signatures[index % len(signatures)] for index in range(size - size // 10)]
+        batch += [rng.choice(batch) for _ in range(size // 10)]
+        start = time.perf_counter()
+        groups = resp.near_duplicate_groups(batch)
+        elapsed = time.perf_counter() - start
+        print(f"grouping {size:>6} signatures: {elapsed * 1000:8.1f} ms "
+              f"({elapsed / size * 1e6:.1f} us each), {len(groups)} groups")
+
+
+def lookups(rng: random.Random, distinct: list, maxsize: int):
+    index = resp.MinHashIndex(maxsize=maxsize)
+    stored = distinct[:maxsize]
+    for key, content in enumerate(stored):
+        index.add(key, resp.minhash_signature(content))
+    queries = [(key, resp.minhash_signature(edited(rng, stored[key], 0.02))) for key in range(0, len(stored), 10)]
+    start = time.perf_counter()
+    found = sum(any(match[0] == key for match in index.query(signature)) for key, signature in queries)
+    elapsed = time.perf_counter() - start
+    print(f"index of {len(index)}: {elapsed / len(queries) * 1e6:.0f} us per lookup, "
+          f"{found}/{len(queries)} copies with 2% of words edited found")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=800)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 4000, 16000])
+    parser.add_argument("--distinct", type=int, default=2000, help="distinct documents to build batches from")
+    parser.add_argument("--copies", type=int, default=200, help="edited copies per edit rate")
+    parser.add_argument("--recent", type=int, default=1024, help="entries in the lookup index")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    distinct = [random_document(rng, args.words) for _ in range(args.distinct)]
+    accuracy(rng, distinct[:args.copies], args.copies)
+    timing(rng, args.words, args.sizes, distinct)
+    lookups(rng, distinct, args.recent)
+
+
+if __name__ == "__main__":
+    main()
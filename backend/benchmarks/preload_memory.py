@@ -0,0 +1,103 @@
+# backend/benchmarks/preload_memory.py
+"""
+Measures per-worker memory of gunicorn with and without GUNICORN_PRELOAD
+(see gunicorn.conf.py), with every agent warmed and stubbed providers.
+
+After the workers have served a few requests, it reads each worker's
+/proc/<pid>/smaps_rollup and reports RSS, PSS and USS (private pages, the
+memory each extra worker really costs) in MB. Linux only.
+
+    python benchmarks/preload_memory.py
+    python benchmarks/preload_memory.py --workers 8 --requests 200
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+import httpx
+
+from serving import BACKEND, PAYLOAD, _free_port
+
+
+def _rollup(pid: int) -> dict:
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as rollup:
+        for line in rollup:
+            name, _, value = line.partition(":")
+            if value.strip().endswith("kB"):
+                fields[name] = int(value.split()[0])
+    return {
+        "rss": fields["Rss"] / 1024,
+        "pss": fields["Pss"] / 1024,
+        "uss": (fields["Private_Clean"] + fields["Private_Dirty"]) / 1024,
+    }
+
+
+def _workers(master: int) -> list:
+    with open(f"/proc/{master}/task/{master}/children") as children:
+        return [int(pid) for pid in children.read().split()]
+
+
+def measure(preload: bool, workers: int, requests: int) -> dict:
+    port = _free_port()
+    env = dict(
+        os.environ,
+        GUNICORN_PRELOAD="1" if preload else "0",
+        AGENT_WARM_ON_BOOT="all",
+        STUB_LATENCY="0.01",
+        PYTHONPATH=os.pathsep.join([BACKEND, os.path.join(BACKEND, "benchmarks")]),
+    )
+    command = [
+        sys.executable, "-m", "gunicorn", "stub_providers:wsgi_app",
+        "--config", os.path.join(BACKEND, "gunicorn.conf.py"),
+        "--workers", str(workers), "--bind", f"127.0.0.1:{port}", "--log-level", "warning",
+    ]
+    start = time.perf_counter()
+    server = subprocess.Popen(command, cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 120
+        while True:
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+                if len(_workers(server.pid)) == workers:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.time() > deadline:
+                raise RuntimeError("gunicorn did not start")
+            time.sleep(0.25)
+        ready = time.perf_counter() - start
+
+        with httpx.Client(timeout=60) as client:
+            for _ in range(requests):
+                client.post(f"http://127.0.0.1:{port}/generate_content", json=PAYLOAD)
+        time.sleep(1)
+
+        per_worker = [_rollup(pid) for pid in _workers(server.pid)]
+        return {
+            "preload": preload,
+            "workers": workers,
+            "ready_seconds": round(ready, 2),
+            "master_rss": round(_rollup(server.pid)["rss"], 1),
+            **{f"worker_{key}": round(statistics.mean(m[key] for m in per_worker), 1) for key in ("rss", "pss", "uss")},
+            "total_pss": round(sum(m["pss"] for m in per_worker) + _rollup(server.pid)["pss"], 1),
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=50, help="requests served before measuring")
+    args = parser.parse_args()
+
+    for preload in (False, True):
+        print(measure(preload, args.workers, args.requests), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# backend/benchmarks/serving.py
+"""
+Benchmarks /generate_content under sync gunicorn workers (wsgi.py today)
+against the ASGI mode (uvicorn asgi:app), with stubbed providers.
+
+Each client sends one Gemini blog request (two stubbed LLM calls) and the
+run reports throughput and latency percentiles per concurrency level.
+
+    python benchmarks/serving.py                # 50, 200 and 1000 clients
+    python benchmarks/serving.py --clients 50 200 --workers 4 --latency 0.2
+"""
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+import statistics
+import httpx
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAYLOAD = [{"category": "blog", "id": "3", "input": "benchmarking python web servers"}]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode: str, port: int, workers: int, latency: float) -> subprocess.Popen:
+    env = dict(os.environ, STUB_LATENCY=str(latency), PYTHONPATH=os.pathsep.join([BACKEND, os.path.join(BACKEND, "benchmarks")]))
+    if mode == "wsgi":
+        command = [
+            sys.executable, "-m", "gunicorn", "stub_providers:wsgi_app",
+            "--workers", str(workers), "--bind", f"127.0.0.1:{port}",
+            "--timeout", "600", "--backlog", "4096", "--log-level", "warning",
+        ]
+    else:
+        command = [
+            sys.executable, "-m", "uvicorn", "stub_providers:asgi_app",
+            "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port),
+            "--backlog", "4096", "--log-level", "warning", "--no-access-log",
+        ]
+    server = subprocess.Popen(command, cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.25)
+    server.kill()
+    raise RuntimeError(f"{mode} server did not start")
+
+
+async def run_level(port: int, clients: int) -> dict:
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(limits=limits, timeout=600) as client:
+
+        async def one():
+            nonlocal errors
+            start = time.perf_counter()
+            try:
+                response = await client.post(f"http://127.0.0.1:{port}/generate_content", json=PAYLOAD)
+                if response.status_code != 200 or response.json()["results"][0].get("error"):
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "clients": clients,
+        "seconds": round(elapsed, 2),
+        "req_per_s": round(clients / elapsed, 1),
+        "p50": round(statistics.median(latencies), 3),
+        "p95": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        "p99": round(latencies[int(len(latencies) * 0.99) - 1], 3),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per stubbed LLM call")
+    parser.add_argument("--modes", nargs="+", default=["wsgi", "asgi"], choices=["wsgi", "asgi"])
+    args = parser.parse_args()
+
+    for mode in args.modes:
+        port = _free_port()
+        server = start_server(mode, port, args.workers, args.latency)
+        try:
+            for clients in args.clients:
+                print(mode, asyncio.run(run_level(port, clients)), flush=True)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
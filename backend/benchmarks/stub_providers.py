@@ -0,0 +1,89 @@
+# backend/benchmarks/stub_providers.py
+"""
+Serves the real app with the Gemini HTTP calls replaced by fixed-latency
+stubs, so serving-layer benchmarks measure the server, not the provider.
+
+    gunicorn --pythonpath .,benchmarks stub_providers:wsgi_app
+    uvicorn --app-dir benchmarks stub_providers:asgi_app
+
+STUB_LATENCY sets the seconds each stubbed LLM call takes (default 0.2).
+"""
+import os
+import json
+import time
+import asyncio
+import httpx
+
+STUB_LATENCY = float(os.getenv("STUB_LATENCY", "0.2"))
+
+# Keys only need to be present; nothing reaches the real providers
+os.environ.setdefault("GEMINI_API_KEY", "stub")
+os.environ.setdefault("SERPER_API_KEY", "stub")
+os.environ.setdefault("FRONTEND_URL1", "http://localhost:3001")
+os.environ.setdefault("FRONTEND_URL2", "http://localhost:3002")
+# Lift provider-side limits so they do not mask serving throughput
+os.environ.setdefault("RATE_LIMITS", json.dumps({"gemini-2.5-flash": [10**7, 10**10], "gemini-1.5-flash": [10**7, 10**10]}))
+os.environ.setdefault("BULKHEAD_GEMINI", "10000")
+
+import http_pool  # noqa: E402
+
+STUB_TEXT = "Stub generation. " * 40
+
+
+def _response(url: str) -> httpx.Response:
+    body = {"candidates": [{"content": {"parts": [{"text": STUB_TEXT}]}}]}
+    return httpx.Response(200, json=body, request=httpx.Request("POST", url))
+
+
+class _StubStream:
+    status_code = 200
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def _lines(self):
+        for chunk in self.chunks:
+            yield "data: " + json.dumps({"candidates": [{"content": {"parts": [{"text": chunk}]}}]})
+
+    def iter_lines(self):
+        for line in self._lines():
+            time.sleep(STUB_LATENCY / len(self.chunks))
+            yield line
+
+    async def aiter_lines(self):
+        for line in self._lines():
+            await asyncio.sleep(STUB_LATENCY / len(self.chunks))
+            yield line
+
+    def close(self):
+        pass
+
+    async def aclose(self):
+        pass
+
+
+def post(url, **kwargs):
+    time.sleep(STUB_LATENCY)
+    return _response(url)
+
+
+async def apost(url, **kwargs):
+    await asyncio.sleep(STUB_LATENCY)
+    return _response(url)
+
+
+def send_stream(method, url, **kwargs):
+    return _StubStream(STUB_TEXT.split(" ")[:10])
+
+
+async def asend_stream(method, url, **kwargs):
+    return _StubStream(STUB_TEXT.split(" ")[:10])
+
+
+http_pool.post = post
+http_pool.apost = apost
+http_pool.send_stream = send_stream
+http_pool.asend_stream = asend_stream
+
+from app import app as wsgi_app  # noqa: E402
+from asgi import app as asgi_app  # noqa: E402
@@ -0,0 +1,359 @@
+# backend/benchmarks/stub_servers.py
+"""
+Local HTTP servers emulating the providers the agents call, one port each:
+
+    gemini   Gemini REST generateContent / streamGenerateContent (SSE)
+    azure    Azure OpenAI chat completions (openai 0.28 wire format)
+    groq     Groq's OpenAI-compatible chat completions, with tool calls
+    serpapi  SerpAPI /search
+    youtube  YouTube watch pages and timedtext caption tracks
+
+Every response waits for a delay drawn from the provider's latency
+distribution and fails with the configured probabilities, so the app's
+bulkheads, rate limiters and retries run exactly as in production.
+
+    python benchmarks/stub_servers.py                      # default profile
+    python benchmarks/stub_servers.py --set groq.latency=fixed:0.05 --set gemini.errors.429=0.02
+
+Latency specs: fixed:S, uniform:LO:HI, lognormal:MEDIAN:SIGMA, exp:MEAN (seconds).
+Once listening it prints one JSON line with the ports and the environment
+variables that point the app at them (see `app_env`).
+"""
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+import uvicorn
+
+DEFAULT_PROFILE = {
+    "gemini": {"latency": "lognormal:0.8:0.4", "errors": {"429": 0.0, "500": 0.0}},
+    "azure": {"latency": "lognormal:1.0:0.4", "errors": {"429": 0.0, "500": 0.0}},
+    "groq": {"latency": "lognormal:0.4:0.4", "errors": {"429": 0.0, "500": 0.0}},
+    "serpapi": {"latency": "lognormal:0.3:0.3", "errors": {"429": 0.0, "500": 0.0}},
+    "youtube": {"latency": "lognormal:0.15:0.3", "errors": {"429": 0.0, "500": 0.0}, "words": 1500},
+}
+
+WORDS = (
+    "the model plans a detailed answer with research insights examples and a clear structure "
+    "covering costs timelines risks trends tools audience goals and next steps for readers"
+).split()
+
+
+def parse_latency(spec: str):
+    """Returns a function drawing one delay in seconds from `spec`."""
+    kind, *args = spec.split(":")
+    args = [float(arg) for arg in args]
+    if kind == "fixed":
+        return lambda: args[0]
+    if kind == "uniform":
+        return lambda: random.uniform(args[0], args[1])
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(math.log(args[0]), args[1])
+    if kind == "exp":
+        return lambda: random.expovariate(1 / args[0])
+    raise ValueError(f"Unknown latency distribution '{spec}'")
+
+
+def apply_override(profile: dict, assignment: str):
+    """Applies one `provider.key[.subkey]=value` override to `profile`."""
+    path, _, value = assignment.partition("=")
+    *parents, leaf = path.split(".")
+    target = profile
+    for key in parents:
+        target = target.setdefault(key, {})
+    try:
+        target[leaf] = json.loads(value)
+    except ValueError:
+        target[leaf] = value
+
+
+def _text(words: int) -> str:
+    return " ".join(random.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+class Provider:
+    """Latency and error injection for one stubbed provider."""
+
+    def __init__(self, name: str, config: dict):
+        self.name = name
+        self.config = config
+        self.latency = parse_latency(config["latency"])
+        self.errors = {int(status): rate for status, rate in config.get("errors", {}).items()}
+        self.requests = 0
+
+    def failure(self):
+        """Returns an error response to send instead of a real one, or None."""
+        self.requests += 1
+        roll = random.random()
+        for status, rate in self.errors.items():
+            if roll < rate:
+                headers = {"retry-after": "1"} if status == 429 else {}
+                return JSONResponse({"error": {"code": status, "message": "injected by stub"}}, status, headers)
+            roll -= rate
+        return None
+
+    async def wait(self, fraction: float = 1.0):
+        await asyncio.sleep(self.latency() * fraction)
+
+
+async def _sse(provider: Provider, frames, done: str = None):
+    """Streams `frames` as Server-Sent Events spread over one latency draw."""
+    total = provider.latency()
+    # Time to first token dominates, like a real provider
+    await asyncio.sleep(total * 0.3)
+    for frame in frames:
+        yield f"data: {json.dumps(frame)}\n\n"
+        await asyncio.sleep(total * 0.7 / len(frames))
+    if done:
+        yield f"data: {done}\n\n"
+
+
+def _chunks(text: str, count: int = 8):
+    words = text.split(" ")
+    size = max(1, len(words) // count)
+    return [" ".join(words[i:i + size]) + " " for i in range(0, len(words), size)]
+
+
+def gemini_app(provider: Provider) -> Starlette:
+    async def generate(request: Request):
+        model, _, method = request.path_params["target"].partition(":")
+        body = await request.json()
+        error = provider.failure()
+        if error is not None:
+            await provider.wait(0.2)
+            return error
+        prompt = " ".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+        if "recommended_agent" in prompt:
+            # The /gemini classifier expects a JSON verdict
+            text = json.dumps(
+                {
+                    "content_type": "blog",
+                    "recommended_agent": "blogging",
+                    "available_agents": ["blogging", "content_writing"],
+                    "confidence_score": 0.9,
+                    "is_relevant": True,
+                }
+            )
+        else:
+            text = _text(300)
+
+        def candidate(part: str) -> dict:
+            return {"candidates": [{"content": {"parts": [{"text": part}], "role": "model"}, "finishReason": "STOP"}]}
+
+        if method == "streamGenerateContent":
+            return StreamingResponse(_sse(provider, [candidate(c) for c in _chunks(text)]), media_type="text/event-stream")
+        await provider.wait()
+        return JSONResponse(candidate(text))
+
+    return Starlette(routes=[Route("/v1beta/models/{target}", generate, methods=["POST"])])
+
+
+def _completion(model: str, message: dict, finish_reason: str) -> dict:
+    return {
+        "id": f"chatcmpl-{random.getrandbits(48):x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {"prompt_tokens": 200, "completion_tokens": 300, "total_tokens": 500},
+    }
+
+
+def _completion_chunks(model: str, text: str) -> list:
+    frames = [
+        {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {"role": "assistant", "content": chunk}, "finish_reason": None}],
+        }
+        for chunk in _chunks(text)
+    ]
+    frames[-1]["choices"][0]["finish_reason"] = "stop"
+    return frames
+
+
+# Tools the Groq stub asks for, with how to fill their arguments from the prompt
+STUB_TOOLS = {
+    "search_google": lambda prompt: {"query": prompt[:60]},
+    "get_youtube_video_captions": lambda prompt: {"url": "https://www.youtube.com/watch?v=stubVideo01"},
+}
+
+
+def _tool_call(body: dict):
+    """A tool call for the first known tool offered, unless a tool already answered."""
+    messages = body.get("messages", [])
+    if any(message.get("role") == "tool" for message in messages):
+        return None
+    prompt = " ".join(str(message.get("content") or "") for message in messages if message.get("role") == "user")
+    for tool in body.get("tools") or []:
+        name = tool.get("function", {}).get("name")
+        if name in STUB_TOOLS:
+            return {
+                "id": f"call_{random.getrandbits(32):x}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(STUB_TOOLS[name](prompt))},
+            }
+    return None
+
+
+def chat_app(provider: Provider, path: str) -> Starlette:
+    """OpenAI-style chat completions, shared by the Azure and Groq stubs."""
+
+    async def complete(request: Request):
+        body = await request.json()
+        model = body.get("model") or request.path_params.get("deployment", "stub")
+        error = provider.failure()
+        if error is not None:
+            await provider.wait(0.2)
+            return error
+        tool_call = _tool_call(body)
+        if tool_call is not None:
+            await provider.wait(0.5)
+            return JSONResponse(
+                _completion(model, {"role": "assistant", "content": None, "tool_calls": [tool_call]}, "tool_calls")
+            )
+        text = _text(300)
+        if body.get("stream"):
+            return StreamingResponse(
+                _sse(provider, _completion_chunks(model, text), done="[DONE]"), media_type="text/event-stream"
+            )
+        await provider.wait()
+        return JSONResponse(_completion(model, {"role": "assistant", "content": text}, "stop"))
+
+    return Starlette(routes=[Route(path, complete, methods=["POST"])])
+
+
+def serpapi_app(provider: Provider) -> Starlette:
+    async def search(request: Request):
+        error = provider.failure()
+        await provider.wait()
+        if error is not None:
+            return error
+        query = request.query_params.get("q", "")
+        results = [
+            {
+                "position": idx,
+                "title": f"{query} - result {idx}",
+                "link": f"https://example.com/{idx}",
+                "snippet": _text(30),
+            }
+            for idx in range(1, int(request.query_params.get("num", "10")) + 1)
+        ]
+        return JSONResponse({"search_metadata": {"status": "Success"}, "organic_results": results})
+
+    return Starlette(routes=[Route("/search", search), Route("/search.json", search)])
+
+
+def youtube_app(provider: Provider, port_holder: dict) -> Starlette:
+    async def watch(request: Request):
+        error = provider.failure()
+        await provider.wait(0.5)
+        if error is not None:
+            return error
+        video_id = request.query_params.get("v", "")
+        captions = {
+            "playerCaptionsTracklistRenderer": {
+                "captionTracks": [
+                    {
+                        "baseUrl": f"http://127.0.0.1:{port_holder['port']}/api/timedtext?v={video_id}&lang=en",
+                        "name": {"simpleText": "English"},
+                        "languageCode": "en",
+                        "isTranslatable": False,
+                    }
+                ],
+                "translationLanguages": [],
+            }
+        }
+        return HTMLResponse(
+            f'<html><script>var ytInitialPlayerResponse = {{"playabilityStatus":{{"status":"OK"}},'
+            f'"captions":{json.dumps(captions)},"videoDetails":{{"videoId":"{video_id}"}}}};</script></html>'
+        )
+
+    async def timedtext(request: Request):
+        await provider.wait(0.5)
+        words = int(provider.config.get("words", 1500))
+        lines = [
+            f'<text start="{idx * 2.0}" dur="2.0">{_text(10)}</text>' for idx in range(max(1, words // 10))
+        ]
+        return Response(
+            '<?xml version="1.0" encoding="utf-8" ?><transcript>' + "".join(lines) + "</transcript>",
+            media_type="text/xml",
+        )
+
+    return Starlette(routes=[Route("/watch", watch), Route("/api/timedtext", timedtext)])
+
+
+def app_env(ports: dict) -> dict:
+    """Environment variables pointing the backend at the stub servers."""
+    return {
+        "GEMINI_API_BASE": f"http://127.0.0.1:{ports['gemini']}",
+        "GEMINI_API_KEY": "stub",
+        "OPENAI_API_BASE": f"http://127.0.0.1:{ports['azure']}",
+        "OPENAI_API_KEY": "stub",
+        "OPENAI_API_VERSION": "2024-02-01",
+        "OPENAI_DEPLOYMENT_NAME": "stub-gpt",
+        "GROQ_BASE_URL": f"http://127.0.0.1:{ports['groq']}",
+        "GROQ_API_KEY": "stub",
+        "SERPAPI_BASE_URL": f"http://127.0.0.1:{ports['serpapi']}",
+        "SERPER_API_KEY": "stub",
+        "YOUTUBE_WATCH_URL": f"http://127.0.0.1:{ports['youtube']}/watch?v={{video_id}}",
+    }
+
+
+def build_apps(profile: dict, ports: dict) -> dict:
+    providers = {name: Provider(name, config) for name, config in profile.items()}
+    return {
+        "gemini": gemini_app(providers["gemini"]),
+        "azure": chat_app(providers["azure"], "/openai/deployments/{deployment}/chat/completions"),
+        "groq": chat_app(providers["groq"], "/openai/v1/chat/completions"),
+        "serpapi": serpapi_app(providers["serpapi"]),
+        "youtube": youtube_app(providers["youtube"], {"port": ports["youtube"]}),
+    }
+
+
+async def serve(profile: dict, ports: dict):
+    servers = [
+        uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=ports[name], log_level="warning", access_log=False, backlog=4096))
+        for name, app in build_apps(profile, ports).items()
+    ]
+    tasks = [asyncio.create_task(server.serve()) for server in servers]
+    while not all(server.started for server in servers):
+        await asyncio.sleep(0.05)
+    print(json.dumps({"ports": ports, "env": app_env(ports)}), flush=True)
+    await asyncio.gather(*tasks)
+
+
+def main():
+    from serving import _free_port
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", help="JSON file merged over the default profile")
+    parser.add_argument("--set", action="append", default=[], metavar="PROVIDER.KEY=VALUE")
+    args = parser.parse_args()
+
+    profile = json.loads(json.dumps(DEFAULT_PROFILE))
+    if args.profile:
+        with open(args.profile) as handle:
+            for name, config in json.load(handle).items():
+                profile.setdefault(name, {}).update(config)
+    for assignment in args.set:
+        apply_override(profile, assignment)
+
+    ports = {name: _free_port() for name in profile}
+    try:
+        asyncio.run(serve(profile, ports))
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
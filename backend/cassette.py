@@ -0,0 +1,476 @@
+# backend/cassette.py
+"""
+Record/replay of provider traffic, for repeatable benchmarks.
+
+CASSETTE_MODE=record passes every provider call through and appends the
+request's key, the response and its timing to CASSETTE_PATH; replay serves
+those responses back without touching the network. Calls are captured
+where each provider's traffic is easiest to rebuild:
+
+- GeminiChat and Groq: at the pooled httpx clients' transport (http_pool),
+  so status codes, headers and streamed chunks replay byte for byte;
+- AzureOpenAIChat: around `ChatCompletion.create`/`acreate` (openai 0.28
+  speaks requests/aiohttp, not httpx);
+- tool calls run by the Groq wrapper, YouTube caption fetches and the
+  Gemini classifier: around the call, as their JSON-serializable result.
+
+Requests are keyed by a hash of their normalized content (timestamps, such
+as the current time phi adds to instructions, are masked out). A key
+recorded several times replays its responses in recorded order and then
+starts over, so a short recording can feed a long run. A request missing
+from the cassette fails like a non-retryable provider error.
+
+CASSETTE_TIMING scales the recorded latencies on replay: 0 (the default)
+answers immediately, 1 reproduces the recorded time to first byte and
+chunk pacing, 0.5 plays it back twice as fast. A path ending in .gz writes
+each entry as its own gzip member.
+"""
+import os
+import re
+import gzip
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+import httpx
+from rate_limit import ProviderError
+
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "")  # "", "record" or "replay"
+CASSETTE_PATH = os.getenv("CASSETTE_PATH", "cassette.jsonl")
+CASSETTE_TIMING = float(os.getenv("CASSETTE_TIMING", "0"))
+
+if CASSETTE_MODE not in ("", "record", "replay"):
+    raise ValueError(f"CASSETTE_MODE must be 'record' or 'replay', not {CASSETTE_MODE!r}")
+
+# Parts of a request that change from run to run without changing its meaning
+_VOLATILE = re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?")
+
+_lock = threading.Lock()
+_entries = None  # key -> [entry, ...], loaded on first replay
+_cursors = {}
+_stats = {"recorded": 0, "replayed": 0, "misses": 0}
+
+
+def request_key(scope: str, request) -> str:
+    """Hashes `request` (any JSON-serializable value) with volatile parts masked."""
+    canonical = json.dumps([scope, request], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(_VOLATILE.sub("<time>", canonical).encode("utf-8")).hexdigest()[:32]
+
+
+def _count(key: str):
+    with _lock:
+        _stats[key] += 1
+
+
+def _write(entry: dict):
+    data = (json.dumps(entry, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+    if CASSETTE_PATH.endswith(".gz"):
+        data = gzip.compress(data)
+    # One O_APPEND write per entry, so workers recording together do not interleave
+    fd = os.open(CASSETTE_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+    _count("recorded")
+
+
+def _load() -> dict:
+    entries = {}
+    opener = gzip.open if CASSETTE_PATH.endswith(".gz") else open
+    try:
+        with opener(CASSETTE_PATH, "rt", encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries.setdefault(entry["k"], []).append(entry)
+    except FileNotFoundError:
+        logging.warning("Cassette %s does not exist; every provider call will miss", CASSETTE_PATH)
+    return entries
+
+
+def _next(key: str, description: str):
+    """Returns the next recorded entry for `key`, or None (counted as a miss)."""
+    global _entries
+    with _lock:
+        if _entries is None:
+            _entries = _load()
+        recorded = _entries.get(key)
+        if not recorded:
+            _stats["misses"] += 1
+            logging.warning("Cassette miss for %s (key %s)", description, key)
+            return None
+        index = _cursors.get(key, 0)
+        _cursors[key] = index + 1
+        _stats["replayed"] += 1
+        return recorded[index % len(recorded)]
+
+
+def _miss(scope: str, description: str) -> ProviderError:
+    return ProviderError(scope, f"cassette {CASSETTE_PATH} has no recording for {description}")
+
+
+def _pause(seconds: float):
+    if CASSETTE_TIMING and seconds > 0:
+        time.sleep(seconds * CASSETTE_TIMING)
+
+
+async def _apause(seconds: float):
+    if CASSETTE_TIMING and seconds > 0:
+        await asyncio.sleep(seconds * CASSETTE_TIMING)
+
+
+def _error_entry(key: str, scope: str, description: str, latency: float, error: ProviderError) -> dict:
+    return {
+        "k": key,
+        "s": scope,
+        "d": description,
+        "t": round(latency, 4),
+        "p": error.provider,
+        "e": str(error).split(": ", 1)[-1],
+        "status": error.status,
+        "retryable": error.retryable,
+    }
+
+
+def _raise_recorded(entry: dict):
+    raise ProviderError(entry["p"], entry["e"], status=entry.get("status"), retryable=entry.get("retryable", False))
+
+
+def call(scope: str, request, fn, encode=None, decode=None, stream: bool = False):
+    """
+    Runs `fn()` through the cassette: in record mode calls it and records
+    its result (or ProviderError), in replay mode returns the recorded one.
+    `encode`/`decode` convert results (or, with `stream`, each item of the
+    iterator `fn` returns) to and from JSON-serializable values.
+    """
+    if not CASSETTE_MODE:
+        return fn()
+    encode = encode or (lambda value: value)
+    decode = decode or (lambda value: value)
+    key = request_key(scope, request)
+    description = f"{scope} {str(request)[:120]}"
+
+    if CASSETTE_MODE == "replay":
+        entry = _next(key, description)
+        if entry is None:
+            raise _miss(scope, description)
+        _pause(entry["t"])
+        if "e" in entry:
+            _raise_recorded(entry)
+        if stream:
+            return _replay_items(entry["c"], decode)
+        return decode(entry["r"])
+
+    start = time.perf_counter()
+    try:
+        result = fn()
+    except ProviderError as error:
+        _write(_error_entry(key, scope, description, time.perf_counter() - start, error))
+        raise
+    latency = time.perf_counter() - start
+    entry = {"k": key, "s": scope, "d": description, "t": round(latency, 4)}
+    if stream:
+        return _record_items(entry, result, encode)
+    entry["r"] = encode(result)
+    _write(entry)
+    return result
+
+
+async def acall(scope: str, request, fn, encode=None, decode=None, stream: bool = False):
+    """Async `call`: `fn()` returns an awaitable (of an async iterator, with `stream`)."""
+    if not CASSETTE_MODE:
+        return await fn()
+    encode = encode or (lambda value: value)
+    decode = decode or (lambda value: value)
+    key = request_key(scope, request)
+    description = f"{scope} {str(request)[:120]}"
+
+    if CASSETTE_MODE == "replay":
+        entry = _next(key, description)
+        if entry is None:
+            raise _miss(scope, description)
+        await _apause(entry["t"])
+        if "e" in entry:
+            _raise_recorded(entry)
+        if stream:
+            return _areplay_items(entry["c"], decode)
+        return decode(entry["r"])
+
+    start = time.perf_counter()
+    try:
+        result = await fn()
+    except ProviderError as error:
+        _write(_error_entry(key, scope, description, time.perf_counter() - start, error))
+        raise
+    latency = time.perf_counter() - start
+    entry = {"k": key, "s": scope, "d": description, "t": round(latency, 4)}
+    if stream:
+        return _arecord_items(entry, result, encode)
+    entry["r"] = encode(result)
+    _write(entry)
+    return result
+
+
+# Streamed items are recorded as [seconds since the previous item, item]
+def _record_items(entry: dict, items, encode):
+    entry["c"] = []
+    last = time.perf_counter()
+    try:
+        for item in items:
+            now = time.perf_counter()
+            entry["c"].append([round(now - last, 4), encode(item)])
+            last = now
+            yield item
+    finally:
+        _write(entry)
+
+
+async def _arecord_items(entry: dict, items, encode):
+    entry["c"] = []
+    last = time.perf_counter()
+    try:
+        async for item in items:
+            now = time.perf_counter()
+            entry["c"].append([round(now - last, 4), encode(item)])
+            last = now
+            yield item
+    finally:
+        _write(entry)
+
+
+def _replay_items(chunks: list, decode):
+    for delay, item in chunks:
+        _pause(delay)
+        yield decode(item)
+
+
+async def _areplay_items(chunks: list, decode):
+    for delay, item in chunks:
+        await _apause(delay)
+        yield decode(item)
+
+
+def tool_call(function_call):
+    """
+    Routes a phi FunctionCall's entrypoint through the cassette. Returns the
+    call to execute.
+
+    The key includes the tool call id from the model's response, so the
+    result replayed is the one the model's next (recorded) request was sent
+    with, even when the same search ran several times with other results.
+    """
+    if not CASSETTE_MODE or function_call.function.entrypoint is None:
+        return function_call
+    request = {"name": function_call.function.name, "call_id": function_call.call_id}
+    entrypoint = function_call.function.entrypoint
+
+    def recorded(**arguments):
+        return call("tool", dict(request, arguments=arguments), lambda: entrypoint(**arguments), encode=_jsonable)
+
+    # A copy, since the Function is shared by every call of the assistant
+    function_call.function = function_call.function.model_copy(update={"entrypoint": recorded})
+    return function_call
+
+
+def _jsonable(value):
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return str(value)
+
+
+# httpx transports, installed on the pooled clients by http_pool
+
+_KEPT_HEADERS = ("content-type", "retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+
+
+def _http_request(request: httpx.Request) -> dict:
+    # Host and API key are left out, so a recording replays against any
+    # endpoint; the body is compared as parsed JSON
+    params = [(name, value) for name, value in request.url.params.multi_items() if name != "key"]
+    body = request.content.decode("utf-8", "replace")
+    try:
+        body = json.loads(body) if body else None
+    except ValueError:
+        pass
+    return {
+        "method": request.method,
+        "path": request.url.path,
+        "params": params,
+        "body": body,
+    }
+
+
+def _http_entry(request: httpx.Request, response: httpx.Response, latency: float) -> dict:
+    described = _http_request(request)
+    return {
+        "k": request_key("http", described),
+        "s": "http",
+        "d": f"{request.method} {request.url.host}{request.url.path}",
+        "t": round(latency, 4),
+        "status": response.status_code,
+        "h": {name: value for name, value in response.headers.items() if name.lower() in _KEPT_HEADERS},
+        "c": [],
+    }
+
+
+def _chunk_text(chunk: bytes) -> str:
+    # surrogateescape keeps multi-byte characters split across chunks intact
+    return chunk.decode("utf-8", "surrogateescape")
+
+
+def _chunk_bytes(text: str) -> bytes:
+    return text.encode("utf-8", "surrogateescape")
+
+
+def _replay_response(request: httpx.Request, entry: dict, stream) -> httpx.Response:
+    return httpx.Response(entry["status"], headers=entry["h"], stream=stream, request=request)
+
+
+def _missing_response(request: httpx.Request) -> httpx.Response:
+    message = f"cassette {CASSETTE_PATH} has no recording for {request.method} {request.url.path}"
+    return httpx.Response(404, json={"error": {"message": message}}, request=request)
+
+
+class _RecordingStream(httpx.SyncByteStream):
+    def __init__(self, stream, entry: dict):
+        self._stream = stream
+        self._entry = entry
+        self._last = time.perf_counter()
+
+    def __iter__(self):
+        for chunk in self._stream:
+            now = time.perf_counter()
+            self._entry["c"].append([round(now - self._last, 4), _chunk_text(chunk)])
+            self._last = now
+            yield chunk
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            if self._entry is not None:
+                _write(self._entry)
+                self._entry = None
+
+
+class _AsyncRecordingStream(httpx.AsyncByteStream):
+    def __init__(self, stream, entry: dict):
+        self._stream = stream
+        self._entry = entry
+        self._last = time.perf_counter()
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            now = time.perf_counter()
+            self._entry["c"].append([round(now - self._last, 4), _chunk_text(chunk)])
+            self._last = now
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._entry is not None:
+                _write(self._entry)
+                self._entry = None
+
+
+class _ReplayStream(httpx.SyncByteStream):
+    def __init__(self, chunks: list):
+        self._chunks = chunks
+
+    def __iter__(self):
+        for delay, text in self._chunks:
+            _pause(delay)
+            yield _chunk_bytes(text)
+
+
+class _AsyncReplayStream(httpx.AsyncByteStream):
+    def __init__(self, chunks: list):
+        self._chunks = chunks
+
+    async def __aiter__(self):
+        for delay, text in self._chunks:
+            await _apause(delay)
+            yield _chunk_bytes(text)
+
+
+class CassetteTransport(httpx.BaseTransport):
+    """Records the wrapped transport's responses, or replays them without it."""
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if CASSETTE_MODE == "replay":
+            entry = _next(request_key("http", _http_request(request)), f"{request.method} {request.url.path}")
+            if entry is None:
+                return _missing_response(request)
+            _pause(entry["t"])
+            return _replay_response(request, entry, _ReplayStream(entry["c"]))
+        # Uncompressed bodies, so the recorded chunks replay without their encoding
+        request.headers["Accept-Encoding"] = "identity"
+        start = time.perf_counter()
+        response = self._transport.handle_request(request)
+        entry = _http_entry(request, response, time.perf_counter() - start)
+        response.stream = _RecordingStream(response.stream, entry)
+        return response
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncCassetteTransport(httpx.AsyncBaseTransport):
+    """Async `CassetteTransport`."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if CASSETTE_MODE == "replay":
+            entry = _next(request_key("http", _http_request(request)), f"{request.method} {request.url.path}")
+            if entry is None:
+                return _missing_response(request)
+            await _apause(entry["t"])
+            return _replay_response(request, entry, _AsyncReplayStream(entry["c"]))
+        request.headers["Accept-Encoding"] = "identity"
+        start = time.perf_counter()
+        response = await self._transport.handle_async_request(request)
+        entry = _http_entry(request, response, time.perf_counter() - start)
+        response.stream = _AsyncRecordingStream(response.stream, entry)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def transport(asynchronous: bool = False, **kwargs):
+    """The pooled clients' transport: httpx's own, wrapped by the cassette when active."""
+    if asynchronous:
+        return AsyncCassetteTransport(httpx.AsyncHTTPTransport(**kwargs))
+    return CassetteTransport(httpx.HTTPTransport(**kwargs))
+
+
+def _reset_after_fork():
+    global _lock
+    _lock = threading.Lock()
+    _cursors.clear()
+    for key in _stats:
+        _stats[key] = 0
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def cassette_stats() -> dict:
+    with _lock:
+        stats = dict(_stats)
+    stats["mode"] = CASSETTE_MODE or None
+    stats["path"] = CASSETTE_PATH if CASSETTE_MODE else None
+    stats["timing"] = CASSETTE_TIMING
+    return stats
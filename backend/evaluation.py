@@ -0,0 +1,296 @@
+# backend/evaluation.py
+"""
+Scores agent results off the request threads.
+
+Each result is scored as soon as its agent finishes (`evaluate_when_done`),
+while the batch's other agents are still generating: in the executor
+thread that ran the agent, or, for agents that ran on an event loop (ASGI,
+AGENT_ENGINE=asyncio), on the shared executor, never on the loop itself.
+Results longer than EVAL_INLINE_MAX_CHARS go to a small process pool
+instead, so scoring them does not hold the GIL that the worker's request
+threads need. Scores are memoized by a hash of the
+content, so identical outputs, such as repeated cached generations, are
+scored once per worker.
+
+Each evaluation also carries its content's MinHash signature (not
+serialized). `collect` uses them to report the batch's near-duplicate
+results as groups of ids, and flags results that nearly duplicate one of
+the worker's last EVAL_RECENT_OUTPUTS outputs with their similarity.
+
+Shorter results stay inline because shipping them to a process costs
+more, in GIL hand-offs to the pool's helper threads, than the ~1.6 ms
+it takes to score 10k words (see benchmarks/evaluation_pool.py).
+EVAL_PROCESSES=0 disables the pool.
+"""
+import os
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+from cachetools import LRUCache
+import executor
+import metrics
+from resp import MinHashIndex, near_duplicate_groups, score_with_signature
+
+EVAL_PROCESSES = int(os.getenv("EVAL_PROCESSES", "2"))
+EVAL_MEMO_SIZE = int(os.getenv("EVAL_MEMO_SIZE", "4096"))
+# Results up to this many characters (~15k words) are scored inline
+EVAL_INLINE_MAX_CHARS = int(os.getenv("EVAL_INLINE_MAX_CHARS", "100000"))
+# Estimated Jaccard similarity of word shingles from which results count as near duplicates
+EVAL_DUPLICATE_THRESHOLD = float(os.getenv("EVAL_DUPLICATE_THRESHOLD", "0.6"))
+EVAL_RECENT_OUTPUTS = int(os.getenv("EVAL_RECENT_OUTPUTS", "1024"))
+
+_pool = None
+_pool_lock = threading.Lock()
+_memo = LRUCache(maxsize=EVAL_MEMO_SIZE)
+_memo_lock = threading.Lock()
+_recent = MinHashIndex(maxsize=EVAL_RECENT_OUTPUTS)
+_stats = {
+    "memo_hits": 0,
+    "scored_inline": 0,
+    "scored_in_pool": 0,
+    "pool_failures": 0,
+    "near_duplicate_groups": 0,
+    "recent_duplicates": 0,
+}
+
+
+def _count(key: str):
+    with _memo_lock:
+        _stats[key] += 1
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if EVAL_PROCESSES <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # forkserver children start from a clean process that only
+                # imports resp, not from a copy of this threaded worker
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload(["resp"])
+                _pool = ProcessPoolExecutor(max_workers=EVAL_PROCESSES, mp_context=context)
+    return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _reset_after_fork():
+    # The pool's processes and management thread belong to the parent
+    global _pool, _pool_lock, _memo_lock, _recent
+    _pool = None
+    _pool_lock = threading.Lock()
+    _memo_lock = threading.Lock()
+    _recent = MinHashIndex(maxsize=EVAL_RECENT_OUTPUTS)
+    _memo.clear()
+    for key in _stats:
+        _stats[key] = 0
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _content_key(content: str) -> str:
+    return hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+class Evaluation(dict):
+    """A result's evaluation; `signature` is its content's MinHash signature, kept out of the JSON."""
+
+    __slots__ = ("signature",)
+
+
+def _evaluation(entry_id, scored: Dict, signature) -> Evaluation:
+    evaluation = Evaluation(id=entry_id, **scored)
+    evaluation.signature = signature
+    return evaluation
+
+
+def evaluate(result: Dict) -> Future:
+    """
+    Scores one agent result. Returns a Future of its evaluation (id, scores
+    and average score, as in `resp.evaluate_content`), or of None for
+    results `evaluate_content` skips: errors and empty content.
+    """
+    future = Future()
+    content = result.get("content", "") if "error" not in result else ""
+    if not content:
+        future.set_result(None)
+        return future
+
+    key = _content_key(content)
+    with _memo_lock:
+        memoized = _memo.get(key)
+        if memoized is not None:
+            _stats["memo_hits"] += 1
+    if memoized is not None:
+        future.set_result(_evaluation(result["id"], *memoized))
+        return future
+
+    start = time.perf_counter()
+
+    def done(scored_and_signature: tuple):
+        with _memo_lock:
+            _memo[key] = scored_and_signature
+        metrics.EVALUATE_SECONDS.observe(time.perf_counter() - start)
+        future.set_result(_evaluation(result["id"], *scored_and_signature))
+
+    def score_inline():
+        _count("scored_inline")
+        try:
+            done(score_with_signature(content))
+        except Exception as e:
+            future.set_exception(e)
+
+    pool = _get_pool() if len(content) > EVAL_INLINE_MAX_CHARS else None
+    if pool is None:
+        score_inline()
+        return future
+
+    def on_scored(scoring: Future):
+        try:
+            done(scoring.result())
+        except BrokenProcessPool:
+            # A pool process died; score this one here and start a new pool next time
+            _count("pool_failures")
+            _discard_pool(pool)
+            score_inline()
+        except Exception as e:
+            future.set_exception(e)
+
+    _count("scored_in_pool")
+    try:
+        pool.submit(score_with_signature, content).add_done_callback(on_scored)
+    except (BrokenProcessPool, RuntimeError):
+        _count("pool_failures")
+        _discard_pool(pool)
+        score_inline()
+    return future
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def evaluate_when_done(agent_future: Future) -> Future:
+    """Starts scoring an agent's result the moment its future completes."""
+    chained = Future()
+
+    def score(result: Dict):
+        try:
+            evaluate(result).add_done_callback(lambda scored: _copy_outcome(scored, chained))
+        except Exception as e:
+            chained.set_exception(e)
+
+    def on_result(done: Future):
+        try:
+            result = done.result()
+        except Exception as e:
+            chained.set_exception(e)
+            return
+        # Futures of agents run on the event loop complete on the loop's thread
+        if _on_event_loop():
+            executor.submit(score, result)
+        else:
+            score(result)
+
+    agent_future.add_done_callback(on_result)
+    return chained
+
+
+def _copy_outcome(source: Future, target: Future):
+    error = source.exception()
+    if error is not None:
+        target.set_exception(error)
+    else:
+        target.set_result(source.result())
+
+
+def find_near_duplicates(evaluations: List[Evaluation]) -> List[List]:
+    """
+    Groups of ids of a batch's near-duplicate results. Also adds
+    "recent_duplicate_similarity" to the evaluations of results that nearly
+    duplicate a recent output of this worker, then remembers the batch's.
+    """
+    try:
+        signatures = [getattr(item, "signature", None) for item in evaluations]
+        groups = near_duplicate_groups(signatures, EVAL_DUPLICATE_THRESHOLD)
+        for item, signature in zip(evaluations, signatures):
+            if signature is None:
+                continue
+            matches = _recent.query(signature, EVAL_DUPLICATE_THRESHOLD, limit=1)
+            if matches:
+                item["recent_duplicate_similarity"] = round(matches[0][2], 3)
+                _count("recent_duplicates")
+        # Queried before adding, so results are not flagged for their own batch
+        for signature in signatures:
+            if signature is not None:
+                _recent.add(signature.tobytes(), signature)
+        with _memo_lock:
+            _stats["near_duplicate_groups"] += len(groups)
+        return [[evaluations[index]["id"] for index in group] for group in groups]
+    except Exception as e:
+        logging.error("Near-duplicate detection failed: %s", e)
+        return []
+
+
+def _summary(evaluations: List[Optional[Dict]], near_duplicates: bool) -> Dict:
+    summary = {"status": "success", "evaluations": [item for item in evaluations if item is not None]}
+    if near_duplicates:
+        summary["near_duplicates"] = find_near_duplicates(summary["evaluations"])
+    return summary
+
+
+def collect(evaluation_futures: List[Future], near_duplicates: bool = True) -> Dict:
+    """
+    Waits for the evaluations and returns them in the shape of
+    `resp.evaluate_content`, skipping results it would skip. With
+    `near_duplicates=False` the batch is neither grouped nor remembered.
+    """
+    try:
+        return _summary([future.result() for future in evaluation_futures], near_duplicates)
+    except Exception as e:
+        logging.error("Evaluation failed: %s", e)
+        return {"status": "error", "message": str(e)}
+
+
+async def aevaluate_when_done(agent_task) -> Optional[Dict]:
+    """Async `evaluate_when_done`: awaits the agent's task, then its evaluation, scored off the loop."""
+    result = await agent_task
+    return await asyncio.wrap_future(await executor.to_executor(evaluate, result))
+
+
+async def acollect(evaluations: list, near_duplicates: bool = True) -> Dict:
+    """Async `collect` over `aevaluate_when_done` tasks."""
+    try:
+        return _summary(await asyncio.gather(*evaluations), near_duplicates)
+    except Exception as e:
+        logging.error("Evaluation failed: %s", e)
+        return {"status": "error", "message": str(e)}
+
+
+def evaluator_stats() -> Dict:
+    with _memo_lock:
+        stats = dict(_stats)
+        stats["memo_size"] = len(_memo)
+    stats["recent_outputs"] = len(_recent)
+    stats["processes"] = EVAL_PROCESSES
+    stats["pool_started"] = _pool is not None
+    return stats
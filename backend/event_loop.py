@@ -0,0 +1,65 @@
+# backend/event_loop.py
+import os
+import asyncio
+import threading
+from concurrent.futures import Future
+import tracing
+
+_loop = None
+_loop_pid = None
+_loop_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {
+    "submitted": 0,
+    "in_flight": 0,
+    "completed": 0,
+}
+
+
+def _run(loop: asyncio.AbstractEventLoop, ready: threading.Event):
+    asyncio.set_event_loop(loop)
+    loop.call_soon(ready.set)
+    loop.run_forever()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the worker's event loop, started on a daemon thread on first use
+    (and again in a forked child, where the parent's loop thread is gone).
+    """
+    global _loop, _loop_pid
+    if _loop is None or _loop_pid != os.getpid():
+        with _loop_lock:
+            if _loop is None or _loop_pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                threading.Thread(target=_run, args=(loop, ready), name="agent-loop", daemon=True).start()
+                ready.wait()
+                _loop, _loop_pid = loop, os.getpid()
+    return _loop
+
+
+def submit_coroutine(coro) -> Future:
+    """
+    Schedules `coro` on the worker's event loop from any thread. Returns a
+    concurrent Future, so callers handle it exactly like `executor.submit`.
+    """
+    with _stats_lock:
+        _stats["submitted"] += 1
+        _stats["in_flight"] += 1
+
+    def on_done(future: Future):
+        with _stats_lock:
+            _stats["in_flight"] -= 1
+            _stats["completed"] += 1
+
+    future = asyncio.run_coroutine_threadsafe(tracing.propagate(coro), get_loop())
+    future.add_done_callback(on_done)
+    return future
+
+
+def loop_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["running"] = _loop is not None and _loop_pid == os.getpid()
+    return stats
@@ -0,0 +1,327 @@
+# backend/executor.py
+import os
+import time
+import asyncio
+import threading
+import contextvars
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager, contextmanager
+from concurrent.futures import ThreadPoolExecutor, Future
+import metrics
+
+# Size of the worker-wide pool that runs agent functions
+EXECUTOR_MAX_WORKERS = int(os.getenv("AGENT_EXECUTOR_WORKERS", "32"))
+
+# Maximum concurrent in-flight calls per provider (bulkheads)
+PROVIDER_LIMITS = {
+    "azure": int(os.getenv("BULKHEAD_AZURE", "8")),
+    "groq": int(os.getenv("BULKHEAD_GROQ", "8")),
+    "gemini": int(os.getenv("BULKHEAD_GEMINI", "8")),
+    "serpapi": int(os.getenv("BULKHEAD_SERPAPI", "4")),
+    "youtube": int(os.getenv("BULKHEAD_YOUTUBE", "4")),
+}
+
+# How long a call may wait for a provider slot before giving up (seconds)
+BULKHEAD_TIMEOUT = float(os.getenv("BULKHEAD_TIMEOUT", "60"))
+
+# How often coroutines waiting on a full bulkhead check for a free slot (seconds)
+BULKHEAD_POLL_INTERVAL = float(os.getenv("BULKHEAD_POLL_INTERVAL", "0.02"))
+
+
+class BulkheadTimeout(RuntimeError):
+    """Raised when a provider slot does not free up within the timeout."""
+
+
+class Bulkhead:
+    """Caps the number of concurrent calls to one provider and tracks waiting."""
+
+    def __init__(self, name: str, limit: int, timeout: float = BULKHEAD_TIMEOUT):
+        self.name = name
+        self.limit = limit
+        self.timeout = timeout
+        self._semaphore = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _acquired(self, acquired: bool, waited: float):
+        with self._lock:
+            self.waiting -= 1
+            if not acquired:
+                self.rejected += 1
+            else:
+                self.in_flight += 1
+                self.acquired += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        if not acquired:
+            raise BulkheadTimeout(
+                f"No free '{self.name}' slot after {self.timeout}s ({self.limit} in flight)"
+            )
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._semaphore.release()
+
+    @contextmanager
+    def slot(self):
+        with self._lock:
+            self.waiting += 1
+        start = time.perf_counter()
+        acquired = self._semaphore.acquire(timeout=self.timeout)
+        self._acquired(acquired, time.perf_counter() - start)
+        try:
+            yield
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def aslot(self):
+        """
+        Async counterpart of `slot`, drawing on the same semaphore so threads
+        and coroutines share one limit. Polls instead of blocking the loop.
+        """
+        with self._lock:
+            self.waiting += 1
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        acquired = self._semaphore.acquire(blocking=False)
+        try:
+            while not acquired and time.perf_counter() < deadline:
+                await asyncio.sleep(BULKHEAD_POLL_INTERVAL)
+                acquired = self._semaphore.acquire(blocking=False)
+        except asyncio.CancelledError:
+            with self._lock:
+                self.waiting -= 1
+            raise
+        self._acquired(acquired, time.perf_counter() - start)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "acquired": self.acquired,
+                "rejected": self.rejected,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+BULKHEADS = {name: Bulkhead(name, limit) for name, limit in PROVIDER_LIMITS.items()}
+
+
+def bulkhead(provider: str):
+    """
+    Returns a context manager holding one of the provider's slots.
+
+    Usage:
+        with bulkhead("gemini"):
+            response = http_pool.post(...)
+    """
+    return BULKHEADS[provider].slot()
+
+
+def abulkhead(provider: str):
+    """
+    Async context manager holding one of the provider's slots.
+
+    Usage:
+        async with abulkhead("gemini"):
+            response = await http_pool.apost(...)
+    """
+    return BULKHEADS[provider].aslot()
+
+
+def open_in_slot(provider: str, slot: ExitStack, open_stream):
+    """
+    Runs `open_stream()` holding one of the provider's slots, which is left
+    in `slot` for a stream to keep until it is consumed.
+
+    Meant as the attempt passed to `rate_limit.call_with_retries`, so the slot
+    is only taken once the rate limiter has let the attempt through, and a
+    failed attempt gives it back before the retry backs off.
+
+    Usage:
+        with ExitStack() as slot:
+            response = call_with_retries(..., lambda: open_in_slot("gemini", slot, open_stream))
+            ...read the stream...
+    """
+    slot.enter_context(bulkhead(provider))
+    try:
+        return open_stream()
+    except BaseException:
+        slot.close()
+        raise
+
+
+async def aopen_in_slot(provider: str, slot: AsyncExitStack, open_stream):
+    """Async counterpart of `open_in_slot`; `open_stream` is a coroutine function."""
+    await slot.enter_async_context(abulkhead(provider))
+    try:
+        return await open_stream()
+    except BaseException:
+        await slot.aclose()
+        raise
+
+
+class _ExecutorStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.queue_wait_seconds_total = 0.0
+        self.queue_wait_seconds_max = 0.0
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_stats = _ExecutorStats()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Returns the worker's long-lived, bounded agent executor."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=EXECUTOR_MAX_WORKERS, thread_name_prefix="agent"
+                )
+    return _executor
+
+
+def _reset_after_fork():
+    # The parent's pool threads do not exist in a forked child
+    global _executor, _executor_lock, _stats
+    _executor = None
+    _executor_lock = threading.Lock()
+    _stats = _ExecutorStats()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def submit(fn, *args, **kwargs) -> Future:
+    """
+    Submits `fn` to the shared executor, recording queue depth and wait time.
+    It runs in a copy of the caller's context, so the trace follows it.
+    """
+    enqueued_at = time.perf_counter()
+    context = contextvars.copy_context()
+    with _stats.lock:
+        _stats.submitted += 1
+        _stats.queued += 1
+
+    def run():
+        waited = time.perf_counter() - enqueued_at
+        with _stats.lock:
+            _stats.queued -= 1
+            _stats.running += 1
+            _stats.queue_wait_seconds_total += waited
+            _stats.queue_wait_seconds_max = max(_stats.queue_wait_seconds_max, waited)
+        metrics.EXECUTOR_QUEUE_WAIT_SECONDS.observe(waited)
+        try:
+            return context.run(fn, *args, **kwargs)
+        finally:
+            with _stats.lock:
+                _stats.running -= 1
+                _stats.completed += 1
+
+    def on_done(future: Future):
+        # Cancelled tasks never ran, so they leave the queue here instead
+        if future.cancelled():
+            with _stats.lock:
+                _stats.queued -= 1
+
+    future = get_executor().submit(run)
+    future.add_done_callback(on_done)
+    return future
+
+
+async def to_executor(fn, *args, **kwargs):
+    """Awaits `fn(*args, **kwargs)` run on the shared executor, for blocking work inside coroutines."""
+    return await asyncio.wrap_future(submit(fn, *args, **kwargs))
+
+
+def executor_stats() -> dict:
+    """Returns executor queue metrics and the state of every provider bulkhead."""
+    with _stats.lock:
+        stats = {
+            "max_workers": EXECUTOR_MAX_WORKERS,
+            "submitted": _stats.submitted,
+            "queued": _stats.queued,
+            "running": _stats.running,
+            "completed": _stats.completed,
+            "queue_wait_seconds_total": round(_stats.queue_wait_seconds_total, 6),
+            "queue_wait_seconds_max": round(_stats.queue_wait_seconds_max, 6),
+        }
+    stats["bulkheads"] = {name: b.stats() for name, b in BULKHEADS.items()}
+    return stats
+
+
+def _bulkhead_calls() -> dict:
+    calls = {}
+    for name, b in BULKHEADS.items():
+        calls[(name, "in_flight")] = b.in_flight
+        calls[(name, "waiting")] = b.waiting
+    return calls
+
+
+metrics.gauge(
+    "executor_tasks",
+    "Tasks of the shared executor by state",
+    ("state",),
+    lambda: {("queued",): _stats.queued, ("running",): _stats.running},
+)
+metrics.gauge(
+    "bulkhead_calls", "Provider calls holding or waiting for a bulkhead slot", ("provider", "state"), _bulkhead_calls
+)
+
+
+def map_parallel(fn, items: list, parallelism: int) -> list:
+    """
+    Applies `fn` to every item using up to `parallelism` threads of the shared
+    executor and returns the results in order.
+
+    The calling thread works through the items too, so this cannot deadlock
+    when called from a task that is itself running on a saturated executor;
+    helpers that only start after the work is done simply exit.
+    """
+    results = [None] * len(items)
+    errors = []
+    pending = list(enumerate(items))
+    lock = threading.Lock()
+
+    def work():
+        while True:
+            with lock:
+                if not pending or errors:
+                    return
+                idx, item = pending.pop(0)
+            try:
+                results[idx] = fn(item)
+            except BaseException as error:
+                with lock:
+                    errors.append(error)
+
+    helpers = [submit(work) for _ in range(min(parallelism, len(items)) - 1)]
+    work()
+    for helper in helpers:
+        # Helpers still queued behind other tasks find nothing left to do
+        if not helper.cancel():
+            helper.result()
+    if errors:
+        raise errors[0]
+    return results
@@ -1,9 +1,25 @@
 # backend/gemini_patch.py
 import os
-import requests
+import json
+from contextlib import AsyncExitStack, ExitStack
+from typing import AsyncIterator, Iterator, Union
+import httpx
+import http_pool
+from executor import abulkhead, aopen_in_slot, bulkhead, open_in_slot
+from rate_limit import (
+    ProviderError,
+    RateLimitError,
+    acall_with_retries,
+    call_with_retries,
+    parse_retry_after,
+)
 from phi.llm.base import LLM
 from pydantic import BaseModel, Field
 
+# Overridable to point at a local stub server (benchmarks/stub_servers.py)
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com")
+
+
 class GeminiChat(LLM, BaseModel):
     """
     Custom Gemini API wrapper that mimics phi.llm.openai.OpenAIChat style.
@@ -17,30 +33,164 @@ class GeminiChat(LLM, BaseModel):
     class Config:
         arbitrary_types_allowed = True
 
-    def run(self, prompt: str, stream: bool = False, **kwargs) -> str:
+    def _url(self, method: str) -> str:
+        return (
+            f"{GEMINI_API_BASE}/v1beta/models/"
+            f"{self.model}:{method}?key={self.api_key}"
+        )
+
+    def _payload(self, prompt: str) -> dict:
+        return {
+            "contents": [
+                {"parts": [{"text": prompt}]}
+            ],
+            "generationConfig": {"temperature": self.temperature}
+        }
+
+    @staticmethod
+    def _check(response: httpx.Response):
+        """Turns HTTP error statuses into typed provider errors."""
+        if response.status_code == 429:
+            raise RateLimitError(
+                "gemini",
+                "rate limited (HTTP 429)",
+                retry_after=parse_retry_after(response.headers.get("retry-after")),
+            )
+        if response.status_code >= 400:
+            raise ProviderError(
+                "gemini",
+                f"HTTP {response.status_code}",
+                status=response.status_code,
+                retryable=response.status_code >= 500,
+            )
+
+    def run(self, prompt: str, stream: bool = False, **kwargs) -> Union[str, Iterator[str]]:
         """
-        Calls the Google Gemini REST API to generate text.
+        Calls the Google Gemini REST API to generate text through the shared
+        keep-alive connection pool, paced by the model's rate limiter.
+
+        With `stream=True` a generator of text chunks is returned instead.
+
+        Raises:
+            ProviderError: The call failed or its retry budget ran out.
         """
+        if stream:
+            return self.run_stream(prompt)
+
+        url = self._url("generateContent")
+        payload = self._payload(prompt)
+
+        def call():
+            try:
+                with bulkhead("gemini"):
+                    response = http_pool.post(url, json=payload)
+            except httpx.TransportError as e:
+                raise ProviderError("gemini", f"transport error: {e}", retryable=True) from e
+            self._check(response)
+            return response.json()
+
+        return self._text(call_with_retries("gemini", self.model, prompt, call))
+
+    @staticmethod
+    def _text(data: dict) -> str:
         try:
-            url = (
-                f"https://generativelanguage.googleapis.com/v1beta/models/"
-                f"{self.model}:generateContent?key={self.api_key}"
+            return data["candidates"][0]["content"]["parts"][0]["text"]
+        except (KeyError, IndexError) as e:
+            raise ProviderError("gemini", f"unexpected response: {str(data)[:200]}") from e
+
+    @staticmethod
+    def _chunks(line: str) -> Iterator[str]:
+        """Returns the text parts carried by one server-sent event line."""
+        if not line.startswith("data:"):
+            return
+        data = json.loads(line[len("data:"):])
+        for candidate in data.get("candidates", [])[:1]:
+            for part in candidate.get("content", {}).get("parts", []):
+                if part.get("text"):
+                    yield part["text"]
+
+    def run_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Yields text chunks from Gemini's `streamGenerateContent` endpoint as
+        they are generated (server-sent events).
+        """
+        url = self._url("streamGenerateContent") + "&alt=sse"
+        payload = self._payload(prompt)
+
+        def open_stream():
+            try:
+                response = http_pool.send_stream("POST", url, json=payload)
+            except httpx.TransportError as e:
+                raise ProviderError("gemini", f"transport error: {e}", retryable=True) from e
+            if response.status_code >= 400:
+                response.close()
+                self._check(response)
+            return response
+
+        # A slot is taken per attempt, after the rate limiter, and given back
+        # before a retry backs off; the stream then holds it until it ends,
+        # since the connection stays busy. Only opening the stream is
+        # retried; once tokens flow, errors surface as-is.
+        with ExitStack() as slot:
+            response = call_with_retries(
+                "gemini", self.model, prompt, lambda: open_in_slot("gemini", slot, open_stream)
             )
+            try:
+                for line in response.iter_lines():
+                    yield from self._chunks(line)
+            except httpx.HTTPError as e:
+                raise ProviderError("gemini", f"stream interrupted: {e}") from e
+            finally:
+                response.close()
+
+    async def arun(self, prompt: str, stream: bool = False, **kwargs) -> Union[str, AsyncIterator[str]]:
+        """
+        Async counterpart of `run` on the event loop's pooled client.
+
+        Raises:
+            ProviderError: The call failed or its retry budget ran out.
+        """
+        if stream:
+            return self.arun_stream(prompt)
 
-            payload = {
-                "contents": [
-                    {"parts": [{"text": prompt}]}
-                ],
-                "generationConfig": {"temperature": self.temperature}
-            }
+        url = self._url("generateContent")
+        payload = self._payload(prompt)
 
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
+        async def call():
+            try:
+                async with abulkhead("gemini"):
+                    response = await http_pool.apost(url, json=payload)
+            except httpx.TransportError as e:
+                raise ProviderError("gemini", f"transport error: {e}", retryable=True) from e
+            self._check(response)
+            return response.json()
 
-            data = response.json()
-            return data["candidates"][0]["content"]["parts"][0]["text"]
+        return self._text(await acall_with_retries("gemini", self.model, prompt, call))
 
-        except requests.exceptions.RequestException as e:
-            return f"An error occurred during Gemini API call: {e}"
-        except Exception as e:
-            return f"An error occurred: {str(e)}"
+    async def arun_stream(self, prompt: str) -> AsyncIterator[str]:
+        """Async counterpart of `run_stream`."""
+        url = self._url("streamGenerateContent") + "&alt=sse"
+        payload = self._payload(prompt)
+
+        async def open_stream():
+            try:
+                response = await http_pool.asend_stream("POST", url, json=payload)
+            except httpx.TransportError as e:
+                raise ProviderError("gemini", f"transport error: {e}", retryable=True) from e
+            if response.status_code >= 400:
+                await response.aclose()
+                self._check(response)
+            return response
+
+        async with AsyncExitStack() as slot:
+            response = await acall_with_retries(
+                "gemini", self.model, prompt, lambda: aopen_in_slot("gemini", slot, open_stream)
+            )
+            try:
+                async for line in response.aiter_lines():
+                    for chunk in self._chunks(line):
+                        yield chunk
+            except httpx.HTTPError as e:
+                raise ProviderError("gemini", f"stream interrupted: {e}") from e
+            finally:
+                await response.aclose()
@@ -0,0 +1,177 @@
+# backend/generation_cache.py
+"""
+Near-match cache of agent outputs, kept per agent (category and id).
+
+A request that repeats a recent input with trivial variations ("Trip to
+Paris", "paris trip itinerary") gets that input's output back instead of
+a new research and writing run. The result says so under "cache", with
+the similarity of the two inputs. Outputs are shared across users, so
+the cache is off unless GENERATION_CACHE_ENABLED=1.
+
+Inputs are normalized to a set of words: casefolded, stopwords dropped
+and a plural "s" stripped, with links kept whole. Each agent keeps an
+LSH index of the MinHash signatures of its recent inputs
+(resp.MinHashIndex), so a lookup only compares inputs that share a band
+with it. A candidate is served only when one input's words contain the
+other's, so inputs differing by a substituted word ("junior" and
+"senior" engineers) never match. Its word set must also be at least
+GENERATION_CACHE_THRESHOLD similar (Jaccard). Negations (not, no,
+never, ...), words with digits (day counts, years, ids) and links must
+match exactly. So "5 days in Lisbon" never gets the output for "7 days
+in Lisbon", nor "why not learn Python" the one for "why learn Python".
+
+Each agent keeps its GENERATION_CACHE_SIZE latest entries, for up to
+GENERATION_CACHE_TTL seconds. The cache is per worker and in memory.
+"""
+import os
+import re
+import json
+import time
+import threading
+from typing import Dict, Optional, Tuple
+from resp import MinHashIndex, minhash_signature
+
+GENERATION_CACHE_ENABLED = os.getenv("GENERATION_CACHE_ENABLED", "0") == "1"
+# Jaccard similarity of the normalized word sets from which an output is reused
+GENERATION_CACHE_THRESHOLD = float(os.getenv("GENERATION_CACHE_THRESHOLD", "0.65"))
+# Entries per agent
+GENERATION_CACHE_SIZE = int(os.getenv("GENERATION_CACHE_SIZE", "256"))
+GENERATION_CACHE_TTL = float(os.getenv("GENERATION_CACHE_TTL", "3600"))
+
+_WORD = re.compile(r"https?://\S+|\w+")
+_CONTRACTED_NOT = re.compile(r"n['’]t\b")
+NEGATIONS = frozenset("not no never nor none nothing nobody neither without cannot against".split())
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how i in into is it me my of on or our please the to "
+    "what with write about create make give can you your".split()
+)
+
+_indexes: Dict[Tuple[str, str], MinHashIndex] = {}
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0, "expired": 0}
+
+
+def _reset_after_fork():
+    global _lock
+    _lock = threading.Lock()
+    _indexes.clear()
+    for key in _stats:
+        _stats[key] = 0
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _count(key: str):
+    with _lock:
+        _stats[key] += 1
+
+
+def normalize(input_data) -> frozenset:
+    """The set of words an input is compared by."""
+    if not isinstance(input_data, str):
+        input_data = json.dumps(input_data, sort_keys=True, default=str)
+    words = set()
+    # "don't" and "isn't" keep their negation as the word "not"
+    for word in _WORD.findall(_CONTRACTED_NOT.sub(" not", input_data.casefold())):
+        if word in STOPWORDS:
+            continue
+        if word.isalpha() and len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+            word = word[:-1]
+        words.add(word)
+    return frozenset(words)
+
+
+def _exact(words: frozenset) -> frozenset:
+    return frozenset(
+        word for word in words if word in NEGATIONS or "://" in word or any(char.isdigit() for char in word)
+    )
+
+
+def _scope(category, entry_id) -> Tuple[str, str]:
+    return str(category), str(entry_id)
+
+
+def _signature(words: frozenset):
+    return minhash_signature(" ".join(sorted(words)), shingle_words=1)
+
+
+def lookup(category, entry_id, input_data) -> Optional[Dict]:
+    """
+    The agent's cached result for the most similar recent input, with a
+    "cache" entry describing the match, or None.
+    """
+    if not GENERATION_CACHE_ENABLED:
+        return None
+    words = normalize(input_data)
+    index = _indexes.get(_scope(category, entry_id))
+    if not words or index is None:
+        _count("misses")
+        return None
+
+    now = time.time()
+    exact = _exact(words)
+    best = None
+    # Candidates share a band with the input; their exact similarity decides
+    for key, entry, _ in index.query(_signature(words), threshold=0):
+        if now - entry["stored_at"] > GENERATION_CACHE_TTL:
+            index.discard(key)
+            _count("expired")
+            continue
+        if entry["exact"] != exact:
+            continue
+        # Only added words, never a substituted one
+        if not (words <= entry["words"] or entry["words"] <= words):
+            continue
+        similarity = len(words & entry["words"]) / len(words | entry["words"])
+        if similarity >= GENERATION_CACHE_THRESHOLD and (best is None or similarity > best[0]):
+            best = (similarity, entry)
+    if best is None:
+        _count("misses")
+        return None
+
+    _count("hits")
+    similarity, entry = best
+    return {
+        **entry["result"],
+        "cache": {
+            "similarity": round(similarity, 3),
+            "age_seconds": round(now - entry["stored_at"], 1),
+        },
+    }
+
+
+def store(category, entry_id, input_data, result: Dict):
+    """Remembers a successful agent result for inputs similar to `input_data`."""
+    if not GENERATION_CACHE_ENABLED or "error" in result or not result.get("content"):
+        return
+    words = normalize(input_data)
+    if not words:
+        return
+    scope = _scope(category, entry_id)
+    index = _indexes.get(scope)
+    if index is None:
+        with _lock:
+            index = _indexes.setdefault(scope, MinHashIndex(maxsize=GENERATION_CACHE_SIZE))
+    entry = {
+        "words": words,
+        "exact": _exact(words),
+        "result": dict(result),
+        "stored_at": time.time(),
+    }
+    # Keyed by the word set, so a repeated input replaces its older entry
+    index.add(tuple(sorted(words)), _signature(words), entry)
+    _count("stores")
+
+
+def generation_cache_stats() -> Dict:
+    with _lock:
+        stats = dict(_stats)
+        indexes = list(_indexes.values())
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    stats["agents"] = len(indexes)
+    stats["entries"] = sum(len(index) for index in indexes)
+    stats["enabled"] = GENERATION_CACHE_ENABLED
+    stats["threshold"] = GENERATION_CACHE_THRESHOLD
+    return stats
@@ -0,0 +1,222 @@
+# backend/groq_patch.py
+import os
+import threading
+from contextlib import AsyncExitStack, ExitStack, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+import groq
+from phi.llm.groq import Groq as PhiGroq
+from phi.llm.message import Message
+from phi.tools.function import FunctionCall
+from phi.utils.tools import get_function_call_for_tool_call
+import cassette
+import http_pool
+import tracing
+from executor import abulkhead, aopen_in_slot, bulkhead, open_in_slot, to_executor
+from rate_limit import (
+    ProviderError,
+    RateLimitError,
+    acall_with_retries,
+    call_with_retries,
+    parse_retry_after,
+)
+
+
+# SDK clients by (class, API key, base URL), each bound to one pooled HTTP client
+_sdk_clients = {}
+_sdk_clients_lock = threading.Lock()
+# Their HTTP clients are dropped in forked children (see http_pool), so are they
+os.register_at_fork(after_in_child=_sdk_clients.clear)
+
+
+@contextmanager
+def groq_errors():
+    """Translates groq SDK exceptions into typed provider errors."""
+    try:
+        yield
+    except groq.RateLimitError as e:
+        raise RateLimitError(
+            "groq", str(e), retry_after=parse_retry_after(e.response.headers.get("retry-after"))
+        ) from e
+    except groq.APIConnectionError as e:
+        raise ProviderError("groq", str(e), retryable=True) from e
+    except groq.APIStatusError as e:
+        raise ProviderError("groq", str(e), status=e.status_code, retryable=e.status_code >= 500) from e
+
+
+class Groq(PhiGroq):
+    """
+    phi's Groq LLM with every API call held inside the shared "groq" bulkhead
+    and paced by the model's rate limiter, like the Gemini and Azure wrappers.
+
+    phi leaves the async API unimplemented for Groq; `aresponse` and
+    `aresponse_stream` fill it in so `Assistant.arun` works on the event loop.
+    """
+
+    # Retries are owned by rate_limit.call_with_retries, not the SDK
+    client_params: Optional[Dict[str, Any]] = {"max_retries": 0}
+
+    @staticmethod
+    def _prompt_text(messages: List[Message]) -> str:
+        return "\n".join(str(m.content or "") for m in messages)
+
+    def invoke(self, messages: List[Message]) -> Any:
+        def call():
+            with bulkhead("groq"), groq_errors():
+                return PhiGroq.invoke(self, messages)
+
+        return call_with_retries("groq", self.model, self._prompt_text(messages), call)
+
+    def invoke_stream(self, messages: List[Message]) -> Iterator[Any]:
+        def open_stream():
+            with groq_errors():
+                return self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[m.to_dict() for m in messages],  # type: ignore
+                    stream=True,
+                    **self.api_kwargs,
+                )
+
+        # The slot is taken per attempt, after the rate limiter, and held for the
+        # whole stream, since the connection stays busy (see open_in_slot)
+        with ExitStack() as slot:
+            stream = call_with_retries(
+                "groq", self.model, self._prompt_text(messages), lambda: open_in_slot("groq", slot, open_stream)
+            )
+            with groq_errors():
+                yield from stream
+
+    def _sdk_client(self, cls, http_client):
+        """
+        Returns the shared `cls` SDK client for this key on `http_client`,
+        instead of phi's fresh client (and connection pool) per call.
+        """
+        key = (cls, self.api_key, str(self.base_url))
+        with _sdk_clients_lock:
+            cached = _sdk_clients.get(key)
+            if cached is None or cached[0] is not http_client:
+                params: Dict[str, Any] = {"http_client": http_client}
+                if self.api_key:
+                    params["api_key"] = self.api_key
+                if self.base_url:
+                    params["base_url"] = self.base_url
+                params.update(self.client_params or {})
+                cached = _sdk_clients[key] = (http_client, cls(**params))
+        return cached[1]
+
+    @property
+    def client(self) -> groq.Groq:
+        if self.groq_client:
+            return self.groq_client
+        return self._sdk_client(groq.Groq, http_pool.get_client())
+
+    @property
+    def async_client(self) -> groq.AsyncGroq:
+        """An AsyncGroq client on the running loop's pooled HTTP client."""
+        return self._sdk_client(groq.AsyncGroq, http_pool.get_async_client())
+
+    async def ainvoke(self, messages: List[Message]) -> Any:
+        async def call():
+            async with abulkhead("groq"):
+                with groq_errors():
+                    return await self.async_client.chat.completions.create(
+                        model=self.model,
+                        messages=[m.to_dict() for m in messages],  # type: ignore
+                        **self.api_kwargs,
+                    )
+
+        return await acall_with_retries("groq", self.model, self._prompt_text(messages), call)
+
+    async def ainvoke_stream(self, messages: List[Message]) -> AsyncIterator[Any]:
+        async def open_stream():
+            with groq_errors():
+                return await self.async_client.chat.completions.create(
+                    model=self.model,
+                    messages=[m.to_dict() for m in messages],  # type: ignore
+                    stream=True,
+                    **self.api_kwargs,
+                )
+
+        async with AsyncExitStack() as slot:
+            stream = await acall_with_retries(
+                "groq", self.model, self._prompt_text(messages), lambda: aopen_in_slot("groq", slot, open_stream)
+            )
+            with groq_errors():
+                async for chunk in stream:
+                    yield chunk
+
+    def run_function_calls(self, function_calls: List[FunctionCall], role: str = "tool") -> List[Message]:
+        """phi's tool loop, one call at a time so each tool call gets its own span."""
+        results = []
+        for function_call in function_calls:
+            with tracing.span(f"tool {function_call.function.name}", tool=function_call.function.name):
+                results.extend(super().run_function_calls([cassette.tool_call(function_call)], role))
+            if self.tool_call_limit and len(self.function_call_stack) >= self.tool_call_limit:
+                break
+        return results
+
+    def _function_calls(self, tool_calls: List[Dict[str, Any]], messages: List[Message]) -> List[FunctionCall]:
+        """Resolves tool calls to functions, answering unresolvable ones in `messages`."""
+        function_calls = []
+        for tool_call in tool_calls:
+            function_call = get_function_call_for_tool_call(tool_call, self.functions)
+            if function_call is None or function_call.error is not None:
+                content = function_call.error if function_call else "Could not find function to call."
+                messages.append(Message(role="tool", tool_call_id=tool_call.get("id"), content=content))
+                continue
+            function_calls.append(function_call)
+        return function_calls
+
+    async def _arun_function_calls(self, function_calls: List[FunctionCall]) -> List[Message]:
+        # Tools (SerpApi, YouTube) are blocking, so they run on the shared executor
+        return await to_executor(self.run_function_calls, function_calls)
+
+    async def aresponse(self, messages: List[Message]) -> str:
+        """Async `response`: one completion, running requested tool calls and recursing."""
+        response = await self.ainvoke(messages=messages)
+        response_message = response.choices[0].message
+        assistant_message = Message(
+            role=response_message.role or "assistant",
+            content=response_message.content,
+        )
+        if response_message.tool_calls:
+            assistant_message.tool_calls = [t.model_dump() for t in response_message.tool_calls]
+        if response.usage is not None:
+            self.metrics.update(response.usage.model_dump())
+        messages.append(assistant_message)
+
+        if assistant_message.tool_calls:
+            function_calls = self._function_calls(assistant_message.tool_calls, messages)
+            final_response = ""
+            if self.show_tool_calls:
+                final_response += "".join(f"\n - Running: {f.get_call_str()}\n\n" for f in function_calls)
+            messages.extend(await self._arun_function_calls(function_calls))
+            return final_response + await self.aresponse(messages=messages)
+        if assistant_message.content is not None:
+            return assistant_message.get_content_string()
+        return "Something went wrong, please try again."
+
+    async def aresponse_stream(self, messages: List[Message]) -> AsyncIterator[str]:
+        """Async `response_stream`: yields content deltas, running tool calls in between."""
+        role, content, tool_calls = None, "", []
+        async for response in self.ainvoke_stream(messages=messages):
+            delta = response.choices[0].delta
+            role = role or delta.role
+            if delta.content is not None:
+                content += delta.content
+                yield delta.content
+            if delta.tool_calls:
+                tool_calls.extend(delta.tool_calls)
+
+        assistant_message = Message(role=role or "assistant", content=content or None)
+        if tool_calls:
+            assistant_message.tool_calls = [t.model_dump() for t in tool_calls]
+        messages.append(assistant_message)
+
+        if assistant_message.tool_calls:
+            function_calls = self._function_calls(assistant_message.tool_calls, messages)
+            if self.show_tool_calls:
+                for function_call in function_calls:
+                    yield f"\n - Running: {function_call.get_call_str()}\n\n"
+            messages.extend(await self._arun_function_calls(function_calls))
+            async for chunk in self.aresponse_stream(messages=messages):
+                yield chunk
@@ -0,0 +1,58 @@
+# backend/gunicorn.conf.py
+"""
+Gunicorn settings, picked up automatically when gunicorn runs from backend/.
+
+GUNICORN_PRELOAD=1 selects the copy-on-write friendly profile: the master
+imports the app and warms every agent and provider SDK once, freezes the
+garbage collector's view of those objects, then forks the workers, which
+share the imported modules instead of each loading their own copy.
+
+    GUNICORN_PRELOAD=1 gunicorn wsgi:app --workers 8
+
+Fork-unsafe state (pooled HTTP clients, SDK clients bound to them, the
+executor, the event loop thread and the Gemini gRPC client) is rebuilt by
+each module's own `os.register_at_fork` hook.
+"""
+import gc
+import os
+import logging
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "0") == "1"
+
+if preload_app:
+    # Everything is imported in the master, so workers start with it shared
+    os.environ.setdefault("AGENT_WARM_ON_BOOT", "all")
+    import google.generativeai  # noqa: F401,E402  (loaded by GeminiService on first use otherwise)
+
+    # No collections while the master builds the shared heap: each one frees
+    # objects and leaves holes in pages that would otherwise stay shared
+    gc.disable()
+
+
+def on_starting(server):
+    # Per-worker metric snapshots from a previous run would be summed in again
+    metrics_dir = os.getenv("METRICS_DIR")
+    if metrics_dir and os.path.isdir(metrics_dir):
+        for filename in os.listdir(metrics_dir):
+            if filename.endswith(".json"):
+                os.remove(os.path.join(metrics_dir, filename))
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        # Moves every object the master holds to the permanent generation, so
+        # the workers' collections never write to (and thereby copy) their pages
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
+
+
+def post_worker_init(worker):
+    import agent_loader
+
+    logging.getLogger("gunicorn.error").info(
+        "Worker %s ready (preload=%s), memory %s", worker.pid, preload_app, agent_loader.memory_mb()
+    )
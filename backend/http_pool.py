@@ -0,0 +1,220 @@
+# backend/http_pool.py
+import os
+import asyncio
+import logging
+import threading
+import weakref
+import aiohttp
+import httpx
+import cassette
+
+# Pool configuration (overridable through the environment)
+POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "20"))
+POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "10"))
+POOL_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", "60"))
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "120"))
+HTTP2_ENABLED = os.getenv("HTTP_POOL_HTTP2", "1") == "1"
+
+_client = None
+_client_http2 = False
+_client_lock = threading.Lock()
+# httpx.AsyncClient is bound to the event loop it was created on
+_async_clients = weakref.WeakKeyDictionary()
+_aiohttp_sessions = weakref.WeakKeyDictionary()
+_stats_lock = threading.Lock()
+_stats = {
+    "requests": 0,
+    "errors": 0,
+    "connections_opened": 0,
+}
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package; fall back to HTTP/1.1 without it."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _count(key: str, amount: int = 1):
+    with _stats_lock:
+        _stats[key] += amount
+
+
+def _trace(event_name: str, info: dict):
+    # httpcore reports every new TCP connection through the "trace" extension,
+    # which lets us tell fresh handshakes apart from keep-alive reuse.
+    if event_name == "connection.connect_tcp.complete":
+        _count("connections_opened")
+
+
+async def _atrace(event_name: str, info: dict):
+    _trace(event_name, info)
+
+
+def _client_kwargs(asynchronous: bool = False) -> dict:
+    global _client_http2
+    http2 = HTTP2_ENABLED and _http2_available()
+    if HTTP2_ENABLED and not http2:
+        logging.info("h2 is not installed, HTTP pool falls back to HTTP/1.1")
+    _client_http2 = http2
+    kwargs = {
+        "http2": http2,
+        "limits": httpx.Limits(
+            max_connections=POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=POOL_MAX_KEEPALIVE,
+            keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+    }
+    if cassette.CASSETTE_MODE:
+        # Record or replay provider traffic (see cassette.py)
+        kwargs["transport"] = cassette.transport(asynchronous, http2=http2, limits=kwargs["limits"])
+    return kwargs
+
+
+def get_client() -> httpx.Client:
+    """
+    Returns the process-wide pooled HTTP client, creating it on first use.
+
+    The client is thread-safe, so every LLM wrapper in the worker shares the
+    same keep-alive connections instead of handshaking on each call.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(**_client_kwargs())
+    return _client
+
+
+def post(url: str, **kwargs) -> httpx.Response:
+    """Sends a POST through the shared pool and updates the pool counters."""
+    extensions = kwargs.pop("extensions", {})
+    extensions.setdefault("trace", _trace)
+    _count("requests")
+    try:
+        return get_client().post(url, extensions=extensions, **kwargs)
+    except httpx.HTTPError:
+        _count("errors")
+        raise
+
+
+def send_stream(method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    Sends a request through the shared pool without reading the body, for
+    token streaming. The caller must close the returned response.
+    """
+    extensions = kwargs.pop("extensions", {})
+    extensions.setdefault("trace", _trace)
+    _count("requests")
+    client = get_client()
+    try:
+        request = client.build_request(method, url, extensions=extensions, **kwargs)
+        return client.send(request, stream=True)
+    except httpx.HTTPError:
+        _count("errors")
+        raise
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Returns the pooled async HTTP client of the running event loop, with the
+    same limits as the threaded client. Must be called from inside the loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = httpx.AsyncClient(**_client_kwargs(asynchronous=True))
+    return client
+
+
+async def apost(url: str, **kwargs) -> httpx.Response:
+    """Async counterpart of `post`, sharing the same counters."""
+    extensions = kwargs.pop("extensions", {})
+    extensions.setdefault("trace", _atrace)
+    _count("requests")
+    try:
+        return await get_async_client().post(url, extensions=extensions, **kwargs)
+    except httpx.HTTPError:
+        _count("errors")
+        raise
+
+
+async def asend_stream(method: str, url: str, **kwargs) -> httpx.Response:
+    """Async counterpart of `send_stream`; the caller must `aclose()` the response."""
+    extensions = kwargs.pop("extensions", {})
+    extensions.setdefault("trace", _atrace)
+    _count("requests")
+    client = get_async_client()
+    try:
+        request = client.build_request(method, url, extensions=extensions, **kwargs)
+        return await client.send(request, stream=True)
+    except httpx.HTTPError:
+        _count("errors")
+        raise
+
+
+def get_aiohttp_session() -> aiohttp.ClientSession:
+    """
+    Returns the running loop's pooled aiohttp session, for SDKs that speak
+    aiohttp (openai 0.28's `acreate`) rather than httpx.
+    """
+    loop = asyncio.get_running_loop()
+    session = _aiohttp_sessions.get(loop)
+    if session is None or session.closed:
+        session = _aiohttp_sessions[loop] = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=POOL_MAX_CONNECTIONS, keepalive_timeout=POOL_KEEPALIVE_EXPIRY
+            ),
+            timeout=aiohttp.ClientTimeout(total=READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        )
+    return session
+
+
+def pool_stats() -> dict:
+    """Returns a snapshot of the pool counters."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["connections_reused"] = max(0, stats["requests"] - stats["errors"] - stats["connections_opened"])
+    stats["http2"] = _client_http2
+    return stats
+
+
+def close_client():
+    """Closes the shared client; the next call to `get_client` builds a new one."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+def _reset_after_fork():
+    # A forked child must not share the parent's sockets or TLS sessions, so
+    # it drops the inherited clients (without closing them) and builds its own
+    global _client, _client_lock, _stats_lock
+    _client = None
+    _client_lock = threading.Lock()
+    _async_clients.clear()
+    _aiohttp_sessions.clear()
+    _stats_lock = threading.Lock()
+    for key in _stats:
+        _stats[key] = 0
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+async def aclose_client():
+    """Closes the running loop's async client and aiohttp session, if any."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+    session = _aiohttp_sessions.pop(loop, None)
+    if session is not None:
+        await session.close()
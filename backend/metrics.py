@@ -0,0 +1,301 @@
+# backend/metrics.py
+"""
+Counters and histograms rendered in the Prometheus text format on /metrics.
+
+Observations are a bisect and a few additions under a per-metric lock, so
+instrumentation stays on in production. Metrics are per process; with
+several gunicorn workers set METRICS_DIR to a directory shared by the
+workers and each one snapshots its metrics there every
+METRICS_FLUSH_INTERVAL seconds, so any worker's /metrics reports the sum
+over all of them (gauges always describe the worker that answers).
+"""
+import os
+import json
+import time
+import atexit
+import bisect
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cache hits through long agent runs
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *labels, amount: float = 1):
+        if not METRICS_ENABLED:
+            return
+        if METRICS_DIR and _flusher_pid != os.getpid():
+            start_flusher()
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {json.dumps(key): value for key, value in self._values.items()}
+
+    @staticmethod
+    def merge(total, value):
+        return (total or 0) + value
+
+    def lines(self, values: dict):
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labels, json.loads(key))} {value}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # labels -> [count per bucket (non-cumulative, +Inf last), sum]
+        self._values = {}
+
+    def observe(self, value: float, *labels):
+        if not METRICS_ENABLED:
+            return
+        if METRICS_DIR and _flusher_pid != os.getpid():
+            start_flusher()
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {json.dumps(key): [list(counts), total] for key, (counts, total) in self._values.items()}
+
+    @staticmethod
+    def merge(total, value):
+        if total is None:
+            return [list(value[0]), value[1]]
+        return [[a + b for a, b in zip(total[0], value[0])], total[1] + value[1]]
+
+    def lines(self, values: dict):
+        bounds = [repr(float(bound)) for bound in self.buckets] + ["+Inf"]
+        for key, (counts, total) in sorted(values.items()):
+            labels = json.loads(key)
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_labels(self.labels, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {total}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {cumulative}"
+
+
+_registry = {}
+_gauges = {}
+
+
+def counter(name: str, help: str, labels=()) -> Counter:
+    return _registry.setdefault(name, Counter(name, help, labels))
+
+
+def histogram(name: str, help: str, labels=(), buckets=LATENCY_BUCKETS) -> Histogram:
+    return _registry.setdefault(name, Histogram(name, help, labels, buckets))
+
+
+def gauge(name: str, help: str, labels, collect):
+    """Registers a gauge read at scrape time: `collect()` returns {label values tuple: value}."""
+    _gauges[name] = (help, tuple(labels), collect)
+
+
+AGENT_STAGE_SECONDS = histogram(
+    "agent_stage_seconds",
+    "Time per agent and stage (research, captions, write, total)",
+    ("agent", "stage"),
+)
+AGENT_RUNS = counter("agent_runs_total", "Agent runs by outcome", ("agent", "outcome"))
+LLM_REQUEST_SECONDS = histogram(
+    "llm_request_seconds",
+    "Provider request latency per attempt, up to the response headers for streams",
+    ("provider", "model", "outcome"),
+)
+RATE_LIMIT_WAIT_SECONDS = histogram(
+    "rate_limit_wait_seconds", "Time spent waiting on a model's rate limiter", ("model",)
+)
+HTTP_REQUEST_SECONDS = histogram(
+    "http_request_seconds",
+    "Request latency per route, up to the first byte for streamed responses",
+    ("route", "method", "status"),
+)
+EXECUTOR_QUEUE_WAIT_SECONDS = histogram(
+    "executor_queue_wait_seconds", "Time tasks wait for a thread of the shared executor"
+)
+EVALUATE_SECONDS = histogram(
+    "evaluate_content_seconds", "Time to score one result, including the wait for the evaluation pool"
+)
+
+
+# Per agent run: the agent's label and the seconds spent in each timed stage
+_agent_run = contextvars.ContextVar("agent_run", default=None)
+
+
+@contextmanager
+def agent_run(agent: str):
+    """
+    Times one agent run. Stages timed inside it with `agent_stage` are
+    recorded per stage; whatever remains of the total is the write stage.
+    """
+    run = {"agent": agent, "stages": 0.0}
+    token = _agent_run.set(run)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _agent_run.reset(token)
+        total = time.perf_counter() - start
+        AGENT_STAGE_SECONDS.observe(total, agent, "total")
+        AGENT_STAGE_SECONDS.observe(max(0.0, total - run["stages"]), agent, "write")
+
+
+@contextmanager
+def agent_stage(stage: str):
+    """Times one stage of the current agent run; a no-op outside one."""
+    run = _agent_run.get()
+    if run is None or not METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        run["stages"] += elapsed
+        AGENT_STAGE_SECONDS.observe(elapsed, run["agent"], stage)
+
+
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    # A forked child starts from zero; otherwise its snapshot would count the
+    # parent's observations a second time
+    for metric in _registry.values():
+        metric._lock = threading.Lock()
+        metric._values = {}
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _snapshot_path(pid: int) -> str:
+    return os.path.join(METRICS_DIR, f"{pid}.json")
+
+
+def _flush():
+    """Writes this process's counters and histograms to METRICS_DIR."""
+    path = _snapshot_path(os.getpid())
+    snapshot = {name: metric.snapshot() for name, metric in _registry.items()}
+    with open(path + ".tmp", "w") as handle:
+        json.dump(snapshot, handle)
+    os.replace(path + ".tmp", path)
+
+
+def _flush_forever():
+    pid = os.getpid()
+    while _flusher_pid == pid:
+        time.sleep(METRICS_FLUSH_INTERVAL)
+        try:
+            _flush()
+        except OSError as e:
+            logging.warning("Could not write metrics snapshot: %s", e)
+
+
+def start_flusher():
+    """Starts this process's snapshot thread when METRICS_DIR is set (again after a fork)."""
+    global _flusher_pid
+    if not METRICS_DIR or _flusher_pid == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher_pid != os.getpid():
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            _flusher_pid = os.getpid()
+            threading.Thread(target=_flush_forever, name="metrics-flush", daemon=True).start()
+            # Keep what was observed since the last flush when the worker exits
+            atexit.register(_flush)
+
+
+def _merged() -> dict:
+    """Every metric's values, summed over all workers' snapshots when METRICS_DIR is set."""
+    if not METRICS_DIR:
+        return {name: metric.snapshot() for name, metric in _registry.items()}
+    start_flusher()
+    _flush()
+    merged = {name: {} for name in _registry}
+    for filename in os.listdir(METRICS_DIR):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(METRICS_DIR, filename)) as handle:
+                snapshot = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        for name, values in snapshot.items():
+            metric = _registry.get(name)
+            if metric is None:
+                continue
+            for key, value in values.items():
+                merged[name][key] = metric.merge(merged[name].get(key), value)
+    return merged
+
+
+def render() -> str:
+    """Returns every metric in the Prometheus text exposition format."""
+    lines = []
+    for name, values in _merged().items():
+        metric = _registry[name]
+        lines.append(f"# HELP {name} {metric.help}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        lines.extend(metric.lines(values))
+    for name, (help, labels, collect) in _gauges.items():
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} gauge")
+        for key, value in sorted(collect().items()):
+            lines.append(f"{name}{_labels(labels, key)} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,319 @@
+# backend/rate_limit.py
+import os
+import json
+import time
+import asyncio
+import random
+import logging
+import threading
+import metrics
+import tracing
+
+# Requests-per-minute and tokens-per-minute ceilings per model, e.g.
+# RATE_LIMITS='{"llama-3.3-70b-versatile": [30, 12000], "gemini-2.5-flash": [10, 250000]}'.
+# A limit of 0 means unlimited; nothing is paced unless configured here or
+# through the defaults below.
+# The limits are enforced per worker process: with several gunicorn
+# workers, divide the provider's quota by the number of workers.
+# A 429 from the provider still backs off every caller of that model in
+# the worker, with or without limits.
+MODEL_LIMITS = {k: tuple(v) for k, v in json.loads(os.getenv("RATE_LIMITS", "{}")).items()}
+
+# Used for models without an explicit entry (e.g. the Azure deployment)
+DEFAULT_LIMITS = (
+    int(os.getenv("RATE_LIMIT_DEFAULT_RPM", "0")),
+    int(os.getenv("RATE_LIMIT_DEFAULT_TPM", "0")),
+)
+
+# Tokens reserved for the completion when estimating a request's cost
+OUTPUT_TOKEN_RESERVE = int(os.getenv("RATE_LIMIT_OUTPUT_RESERVE", "1024"))
+
+# Per-request retry budget; RETRY_MAX_ATTEMPTS counts every call, the first included
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "4"))
+RETRY_MAX_SECONDS = float(os.getenv("RETRY_MAX_SECONDS", "60"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "1"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+
+
+class ProviderError(RuntimeError):
+    """A provider call failed; raised instead of returning error text as content."""
+
+    def __init__(self, provider: str, message: str, status: int = None, retryable: bool = False):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+        self.status = status
+        self.retryable = retryable
+
+
+class RateLimitError(ProviderError):
+    """The provider answered 429; `retry_after` holds its hint in seconds, if any."""
+
+    def __init__(self, provider: str, message: str, retry_after: float = None):
+        super().__init__(provider, message, status=429, retryable=True)
+        self.retry_after = retry_after
+
+
+class RetryBudgetExceeded(ProviderError):
+    """Retries for one request ran out of attempts or time."""
+
+
+def parse_retry_after(value) -> float:
+    """Parses a Retry-After header given in seconds; returns None when absent or malformed."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+_encoding = None
+_encoding_failed = False
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the token count of `text` with tiktoken's cl100k_base encoding,
+    falling back to ~4 characters per token when the encoding is unavailable.
+    """
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logging.warning("tiktoken encoding unavailable, estimating tokens by length: %s", e)
+            _encoding_failed = True
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `per_minute / 60` per
+    second. A bucket of 0 per minute never makes anyone wait.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Takes `amount` tokens (possibly going negative) and returns the wait needed."""
+        if not self.rate:
+            return 0.0
+        amount = min(amount, self.capacity)
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def refund(self, amount: float):
+        """Gives back tokens taken by a reservation that will not be used."""
+        if not self.rate:
+            return
+        amount = min(amount, self.capacity)
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """Paces calls to one model against its requests- and tokens-per-minute ceilings."""
+
+    def __init__(self, model: str, rpm: int, tpm: int):
+        self.model = model
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.lock = threading.Lock()
+        # Set after a 429 so every caller of this model waits out the backoff
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+        self.rate_limited = 0
+
+    def reserve(self, tokens: int, deadline: float = None) -> float:
+        """
+        Reserves one request and `tokens` tokens; returns how long to wait
+        first. When that wait would run past `deadline` (a monotonic time),
+        nothing is reserved and None is returned instead.
+        """
+        with self.lock:
+            blocked = self.blocked_until - time.monotonic()
+        wait = max(blocked, self.requests.reserve(1), self.tokens.reserve(tokens))
+        if deadline is not None and time.monotonic() + wait > deadline:
+            self.requests.refund(1)
+            self.tokens.refund(tokens)
+            return None
+        if wait > 0:
+            with self.lock:
+                self.throttled += 1
+                self.throttled_seconds += wait
+        return wait
+
+    def acquire(self, tokens: int, deadline: float = None) -> bool:
+        """Waits for the model's pacing; returns False, without waiting, when it would outlast `deadline`."""
+        wait = self.reserve(tokens, deadline)
+        if wait is None:
+            return False
+        metrics.RATE_LIMIT_WAIT_SECONDS.observe(wait, self.model)
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    async def aacquire(self, tokens: int, deadline: float = None) -> bool:
+        wait = self.reserve(tokens, deadline)
+        if wait is None:
+            return False
+        metrics.RATE_LIMIT_WAIT_SECONDS.observe(wait, self.model)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+    def backoff(self, seconds: float):
+        with self.lock:
+            self.rate_limited += 1
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "rpm": int(self.requests.capacity),
+                "tpm": int(self.tokens.capacity),
+                "throttled": self.throttled,
+                "throttled_seconds": round(self.throttled_seconds, 6),
+                "rate_limited": self.rate_limited,
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(model: str) -> RateLimiter:
+    """Returns this worker process's limiter for `model`."""
+    with _limiters_lock:
+        if model not in _limiters:
+            rpm, tpm = MODEL_LIMITS.get(model, DEFAULT_LIMITS)
+            _limiters[model] = RateLimiter(model, rpm, tpm)
+        return _limiters[model]
+
+
+def limiter_stats() -> dict:
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {model: limiter.stats() for model, limiter in limiters.items()}
+
+
+def backoff_delay(attempt: int, retry_after: float = None) -> float:
+    """Full-jitter exponential backoff, never shorter than the provider's Retry-After."""
+    delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def call_with_retries(provider: str, model: str, prompt: str, call):
+    """
+    Runs `call()` for one provider request: paces it through the model's rate
+    limiter, then retries 429s and transient failures with jittered
+    exponential backoff until the request's retry budget is spent.
+
+    `call` must raise `RateLimitError`/`ProviderError` for provider failures.
+    """
+    limiter = get_limiter(model)
+    cost = estimate_tokens(prompt) + OUTPUT_TOKEN_RESERVE
+    deadline = time.monotonic() + RETRY_MAX_SECONDS
+    attempt = 0
+    with tracing.span(f"llm {provider}", tracing.CLIENT, provider=provider, model=model) as span:
+        while True:
+            if not limiter.acquire(cost, deadline):
+                raise _pacing_exceeds_budget(provider, model, attempt)
+            start = time.perf_counter()
+            try:
+                response = call()
+            except ProviderError as error:
+                _observe_attempt(provider, model, start, error)
+                delay = _retry_delay(provider, model, limiter, error, attempt, deadline)
+                attempt += 1
+                if delay:
+                    time.sleep(delay)
+                continue
+            _observe_attempt(provider, model, start)
+            if span is not None:
+                span.set_attribute("attempts", attempt + 1)
+            return response
+
+
+async def acall_with_retries(provider: str, model: str, prompt: str, call):
+    """Async counterpart of `call_with_retries`; `call` is a coroutine function."""
+    limiter = get_limiter(model)
+    cost = estimate_tokens(prompt) + OUTPUT_TOKEN_RESERVE
+    deadline = time.monotonic() + RETRY_MAX_SECONDS
+    attempt = 0
+    with tracing.span(f"llm {provider}", tracing.CLIENT, provider=provider, model=model) as span:
+        while True:
+            if not await limiter.aacquire(cost, deadline):
+                raise _pacing_exceeds_budget(provider, model, attempt)
+            start = time.perf_counter()
+            try:
+                response = await call()
+            except ProviderError as error:
+                _observe_attempt(provider, model, start, error)
+                delay = _retry_delay(provider, model, limiter, error, attempt, deadline)
+                attempt += 1
+                if delay:
+                    await asyncio.sleep(delay)
+                continue
+            _observe_attempt(provider, model, start)
+            if span is not None:
+                span.set_attribute("attempts", attempt + 1)
+            return response
+
+
+def _pacing_exceeds_budget(provider: str, model: str, attempt: int) -> RetryBudgetExceeded:
+    return RetryBudgetExceeded(
+        provider, f"gave up on {model} after {attempt} attempt(s): the rate limit wait outlasts the retry budget"
+    )
+
+
+def _observe_attempt(provider: str, model: str, start: float, error: ProviderError = None):
+    if error is None:
+        outcome = "ok"
+    elif isinstance(error, RateLimitError):
+        outcome = "rate_limited"
+    else:
+        outcome = "error"
+    metrics.LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, provider, model, outcome)
+
+
+def _retry_delay(provider: str, model: str, limiter: RateLimiter, error: ProviderError, attempt: int, deadline: float) -> float:
+    """
+    Decides what to do after a failed attempt: re-raises when the error is
+    final or the budget is spent, otherwise returns how long the caller
+    itself must sleep (0 when a 429 backoff is left to the limiter).
+    """
+    if not error.retryable:
+        raise error
+    retry_after = getattr(error, "retry_after", None)
+    delay = backoff_delay(attempt, retry_after)
+    attempt += 1
+    if attempt >= RETRY_MAX_ATTEMPTS or time.monotonic() + delay > deadline:
+        raise RetryBudgetExceeded(
+            provider,
+            f"gave up on {model} after {attempt} attempt(s): {error}",
+            status=error.status,
+        ) from error
+    logging.warning("%s %s failed (%s), retrying in %.1fs", provider, model, error, delay)
+    if isinstance(error, RateLimitError):
+        # The next acquire() sleeps out the backoff for every caller of this model
+        limiter.backoff(delay)
+        return 0.0
+    return delay
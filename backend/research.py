@@ -0,0 +1,120 @@
+# backend/research.py
+import os
+import asyncio
+import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import Future
+from metrics import agent_stage
+
+# Share research between blog, LinkedIn and travel agents for the same topic.
+# Whichever category asks first runs its researcher, so the research the others
+# get depends on timing; off by default. Variants of one category always share.
+SHARE_ACROSS_CATEGORIES = os.getenv("RESEARCH_SHARE_ACROSS_CATEGORIES", "0") == "1"
+
+# Categories whose research is interchangeable when sharing across categories.
+# YouTube "research" is caption fetching and is only shared between summarizers.
+CROSS_CATEGORY = {"blog", "linkedin", "travel"}
+
+_current_batch = contextvars.ContextVar("research_batch", default=None)
+
+
+def normalize_input(text: str) -> str:
+    """Collapses whitespace and case so trivially different inputs share research."""
+    return " ".join(str(text).split()).casefold()
+
+
+class ResearchBatch:
+    """
+    Research results shared by the agents of one /generate_content batch.
+
+    The first agent asking for a key runs the research (single-flight); every
+    other agent asking for the same key waits for and reuses that result.
+    Keys are (category, input): every variant of a category researches with
+    the same researcher (ai_agents/researchers.py), so they share by default;
+    `share_across_categories` also pools blog, LinkedIn and travel.
+    """
+
+    def __init__(self, share_across_categories: bool = SHARE_ACROSS_CATEGORIES):
+        self.share_across_categories = share_across_categories
+        self._lock = threading.Lock()
+        self._results = {}
+        self.runs = 0
+        self.reused = 0
+
+    def key(self, category: str, topic: str) -> tuple:
+        if self.share_across_categories and category in CROSS_CATEGORY:
+            category = "*"
+        return category, normalize_input(topic)
+
+    def _claim(self, category: str, topic: str):
+        """Returns the key's future and whether the caller must run the research."""
+        key = self.key(category, topic)
+        with self._lock:
+            future = self._results.get(key)
+            leader = future is None
+            if leader:
+                future = self._results[key] = Future()
+                self.runs += 1
+            else:
+                self.reused += 1
+        return future, leader
+
+    def get_or_run(self, category: str, topic: str, run):
+        future, leader = self._claim(category, topic)
+        if leader:
+            try:
+                future.set_result(run())
+            except BaseException as error:
+                future.set_exception(error)
+        return future.result()
+
+    async def aget_or_run(self, category: str, topic: str, arun):
+        """Async `get_or_run`; `arun` is a coroutine function."""
+        future, leader = self._claim(category, topic)
+        if leader:
+            try:
+                future.set_result(await arun())
+            except BaseException as error:
+                future.set_exception(error)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"runs": self.runs, "reused": self.reused}
+
+
+@contextmanager
+def use_research_batch(batch: ResearchBatch):
+    """Makes `batch` the current research batch for the calling thread."""
+    token = _current_batch.set(batch)
+    try:
+        yield batch
+    finally:
+        _current_batch.reset(token)
+
+
+def _stage(category: str) -> str:
+    return "captions" if category == "youtube" else "research"
+
+
+def shared_research(category: str, topic: str, run):
+    """
+    Returns the research for `topic`, running `run()` only if no other agent
+    of `category` in the current batch has already researched it. Outside a
+    batch this is just `run()`.
+    """
+    batch = _current_batch.get()
+    with agent_stage(_stage(category)):
+        if batch is None:
+            return run()
+        return batch.get_or_run(category, topic, run)
+
+
+async def ashared_research(category: str, topic: str, arun):
+    """Async `shared_research`; `arun` is a coroutine function."""
+    batch = _current_batch.get()
+    with agent_stage(_stage(category)):
+        if batch is None:
+            return await arun()
+        return await batch.aget_or_run(category, topic, arun)
@@ -1,9 +1,21 @@
+import os
 import re
+import sys
+import gzip
 import json
+import time
+import zlib
+import operator
+import argparse
+import contextlib
+import collections
+import threading
+import multiprocessing
 
-def evaluate_content(results):
+def evaluate_content(results, near_duplicates: bool = True):
     try:
         evaluations = []
+        contents = []
         for item in results:
             if 'error' in item:
                 continue
@@ -12,28 +24,16 @@ def evaluate_content(results):
             if not content:
                 continue
             
-            # Calculate scores
-            scores = {
-                'id': item['id'],
-                'scores': {
-                    'clarity': evaluate_clarity(content),
-                    'structure': evaluate_structure(content),
-                    'engagement': evaluate_engagement(content),
-                    'depth': evaluate_depth(content),
-                    'formatting': evaluate_formatting(content)
-                }
-            }
-            
-            # Calculate average score
-            avg_score = sum(scores['scores'].values()) / len(scores['scores'])
-            scores['average_score'] = round(avg_score, 1)
+            evaluations.append({'id': item['id'], **score_content(content)})
+            contents.append(content)
             
-            evaluations.append(scores)
-            
-        return {
+        summary = {
             'status': 'success',
             'evaluations': evaluations
         }
+        if near_duplicates:
+            summary['near_duplicates'] = near_duplicate_ids(evaluations, contents)
+        return summary
         
     except Exception as e:
         return {
@@ -41,60 +41,524 @@ def evaluate_content(results):
             'message': str(e)
         }
 
-def evaluate_clarity(content: str) -> int:
-    """Evaluates content clarity based on sentence structure and readability"""
+ENGAGEMENT_INDICATORS = [
+    '?', '!', 'imagine', 'consider', 'you', 'we', 'discover',
+    'explore', 'learn', 'understand', 'revolutionize'
+]
+
+_DIGIT_RUN = re.compile(r'\d+')
+_NON_ASCII_DIGIT = re.compile(r'[^\D0-9]')
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+# UTF-8 bytes with sentence ends folded into '.' and ASCII digits into '0',
+# so runs of either are counted by one split each
+_RUN_TABLE = bytes.maketrans(b'!?123456789', b'..000000000')
+_ASCII = bytes(range(128))
+
+def _run_count(pieces: list) -> int:
+    """Number of runs of the separator that split a string into `pieces`."""
+    if len(pieces) == 1:
+        return 0
+    # An empty piece between two separators joins them into one run
+    inner_empty = pieces.count(b'') - (pieces[0] == b'') - (pieces[-1] == b'')
+    return len(pieces) - 1 - inner_empty
+
+class ContentFeatures:
+    """
+    Everything the scorers look at, computed once per document: one split
+    into words, one lowercase copy and one translated byte copy for the
+    sentence-end and digit runs, instead of each scorer rescanning the content.
+    """
+    __slots__ = (
+        'word_count', 'sentence_count', 'has_headers', 'starts_with_emphasis', 'has_emphasis',
+        'has_blank_line', 'paragraph_count', 'line_count', 'has_paragraph_break', 'digit_runs',
+        'engagement_hits'
+    )
+
+    def __init__(self, content: str):
+        self.word_count = len(content.split())
+        self.has_headers = '###' in content
+        self.starts_with_emphasis = content.startswith('*')
+        self.has_emphasis = '*' in content
+        self.has_blank_line = '\n\n' in content
+        self.paragraph_count = content.count('\n\n') + 1
+        self.line_count = content.count('\n') + 1
+        # A blank line implies a paragraph break, so the regex only runs without one
+        self.has_paragraph_break = self.has_blank_line or _PARAGRAPH_BREAK.search(content) is not None
+        lowered = content.lower()
+        self.engagement_hits = sum(1 for indicator in ENGAGEMENT_INDICATORS if indicator in lowered)
+
+        # Multi-byte UTF-8 sequences contain no ASCII bytes, so runs of ASCII
+        # characters count the same in bytes as in the string
+        encoded = content.encode('utf-8', 'surrogatepass')
+        folded = encoded.translate(_RUN_TABLE)
+        # One more piece than there are sentence ends, as with re.split('[.!?]+')
+        self.sentence_count = _run_count(folded.split(b'.')) + 1
+        non_ascii = encoded.translate(None, _ASCII)
+        if non_ascii and _NON_ASCII_DIGIT.search(non_ascii.decode('utf-8', 'surrogatepass')):
+            # \d also matches other scripts' digits
+            self.digit_runs = len(_DIGIT_RUN.findall(content))
+        else:
+            self.digit_runs = _run_count(folded.split(b'0'))
+
+def extract_features(content: str) -> ContentFeatures:
+    return ContentFeatures(content)
+
+def score_clarity(features: ContentFeatures) -> int:
     # Simple metrics for clarity
-    avg_sentence_length = len(content.split()) / (len(re.split('[.!?]+', content)) + 1)
+    avg_sentence_length = features.word_count / (features.sentence_count + 1)
     score = 5
     if avg_sentence_length > 25: score -= 1
     if avg_sentence_length > 35: score -= 1
-    if '###' not in content: score -= 1  # Checking for headers
-    if len(content.split()) < 100: score -= 1
+    if not features.has_headers: score -= 1  # Checking for headers
+    if features.word_count < 100: score -= 1
     return max(1, score)
 
-def evaluate_structure(content: str) -> int:
-    """Evaluates content structure and organization"""
+def score_structure(features: ContentFeatures) -> int:
+    score = 5
+    if not features.starts_with_emphasis: score -= 1  # Check for title
+    if not features.has_headers: score -= 2  # Check for sections
+    if not features.has_blank_line: score -= 1  # Check for paragraphs
+    if features.paragraph_count < 3: score -= 1  # Check for multiple paragraphs
+    return max(1, score)
+
+def score_engagement(features: ContentFeatures) -> int:
+    score = 1 + 0.5 * features.engagement_hits
+    return min(5, round(score))
+
+def score_depth(features: ContentFeatures) -> int:
+    score = 1
+    if features.word_count > 300: score += 1
+    if features.word_count > 600: score += 1
+    if features.word_count > 1000: score += 1
+    if features.digit_runs > 5: score += 1  # Check for data/statistics
+    return min(5, score)
+
+def score_formatting(features: ContentFeatures) -> int:
     score = 5
-    if not content.startswith('*'): score -= 1  # Check for title
-    if '###' not in content: score -= 2  # Check for sections
-    if '\n\n' not in content: score -= 1  # Check for paragraphs
-    if len(content.split('\n\n')) < 3: score -= 1  # Check for multiple paragraphs
+    if not features.has_emphasis: score -= 1  # Check for emphasis
+    if not features.has_headers: score -= 1  # Check for headers
+    if not features.has_blank_line: score -= 1  # Check for proper spacing
+    if features.line_count < 10: score -= 1  # Check for proper structure
+    if not features.has_paragraph_break: score -= 1  # Check for paragraph breaks
     return max(1, score)
 
+def score_content(content: str) -> dict:
+    """All five scores of one document and their average, from one feature pass"""
+    features = extract_features(content)
+    scores = {
+        'clarity': score_clarity(features),
+        'structure': score_structure(features),
+        'engagement': score_engagement(features),
+        'depth': score_depth(features),
+        'formatting': score_formatting(features)
+    }
+    # Calculate average score
+    avg_score = sum(scores.values()) / len(scores)
+    return {'scores': scores, 'average_score': round(avg_score, 1)}
+
+SCORE_NAMES = ('clarity', 'structure', 'engagement', 'depth', 'formatting')
+
+def extract_columns(contents: list) -> dict:
+    """
+    The raw feature counts of many documents as NumPy columns, one array per
+    ContentFeatures attribute (booleans as 0/1)
+    """
+    # Imported here so workers that never batch-score skip loading NumPy
+    import numpy as np
+
+    row = operator.attrgetter(*ContentFeatures.__slots__)
+    table = np.array([row(ContentFeatures(content)) for content in contents], dtype=np.int64)
+    table = table.reshape(len(contents), len(ContentFeatures.__slots__))
+    return {name: table[:, index] for index, name in enumerate(ContentFeatures.__slots__)}
+
+def score_columns(columns: dict) -> dict:
+    """
+    score_* over feature columns: every threshold as one vectorized
+    comparison. Returns a column per score plus 'average_score', equal
+    element for element to score_content.
+    """
+    import numpy as np
+
+    words = columns['word_count']
+    no_headers = columns['has_headers'] == 0
+    no_blank_line = columns['has_blank_line'] == 0
+    avg_sentence_length = words / (columns['sentence_count'] + 1)
+
+    clarity = 5 - (avg_sentence_length > 25) - (avg_sentence_length > 35) - no_headers - (words < 100)
+    structure = (
+        5 - (columns['starts_with_emphasis'] == 0) - 2 * no_headers - no_blank_line
+        - (columns['paragraph_count'] < 3)
+    )
+    depth = 1 + (words > 300) + (words > 600) + (words > 1000) + (columns['digit_runs'] > 5)
+    formatting = (
+        5 - (columns['has_emphasis'] == 0) - no_headers - no_blank_line - (columns['line_count'] < 10)
+        - (columns['has_paragraph_break'] == 0)
+    )
+    # Lookup tables built from the scalar rules, so rounding matches exactly
+    engagement_table = np.array(
+        [min(5, round(1 + 0.5 * hits)) for hits in range(len(ENGAGEMENT_INDICATORS) + 1)], dtype=np.int64
+    )
+    scores = {
+        'clarity': np.maximum(1, clarity),
+        'structure': np.maximum(1, structure),
+        'engagement': engagement_table[columns['engagement_hits']],
+        'depth': np.minimum(5, depth),
+        'formatting': np.maximum(1, formatting),
+    }
+    average_table = np.array([round(total / len(SCORE_NAMES), 1) for total in range(5 * len(SCORE_NAMES) + 1)])
+    scores['average_score'] = average_table[sum(scores[name] for name in SCORE_NAMES)]
+    return scores
+
+def score_batch(contents: list) -> dict:
+    """All five scores and the average of many documents, as NumPy columns"""
+    return score_columns(extract_columns(contents))
+
+def evaluate_batch(results, near_duplicates: bool = True):
+    """evaluate_content for large batches: same output, scored as columns"""
+    try:
+        items = [item for item in results if 'error' not in item and item.get('content', '')]
+        contents = [item['content'] for item in items]
+        columns = score_batch(contents)
+        scores = {name: columns[name].tolist() for name in SCORE_NAMES}
+        averages = columns['average_score'].tolist()
+        evaluations = [
+            {
+                'id': item['id'],
+                'scores': {name: scores[name][index] for name in SCORE_NAMES},
+                'average_score': averages[index]
+            }
+            for index, item in enumerate(items)
+        ]
+        summary = {
+            'status': 'success',
+            'evaluations': evaluations
+        }
+        if near_duplicates:
+            summary['near_duplicates'] = near_duplicate_ids(evaluations, contents)
+        return summary
+
+    except Exception as e:
+        return {
+            'status': 'error',
+            'message': str(e)
+        }
+
+def evaluate_clarity(content: str) -> int:
+    """Evaluates content clarity based on sentence structure and readability"""
+    return score_clarity(extract_features(content))
+
+def evaluate_structure(content: str) -> int:
+    """Evaluates content structure and organization"""
+    return score_structure(extract_features(content))
+
 def evaluate_engagement(content: str) -> int:
     """Evaluates how engaging the content is"""
-    engagement_indicators = [
-        '?', '!', 'imagine', 'consider', 'you', 'we', 'discover',
-        'explore', 'learn', 'understand', 'revolutionize'
-    ]
-    score = 1
-    for indicator in engagement_indicators:
-        if indicator.lower() in content.lower():
-            score += 0.5
-    return min(5, round(score))
+    return score_engagement(extract_features(content))
 
 def evaluate_depth(content: str) -> int:
     """Evaluates content depth and comprehensiveness"""
-    word_count = len(content.split())
-    score = 1
-    if word_count > 300: score += 1
-    if word_count > 600: score += 1
-    if word_count > 1000: score += 1
-    if len(re.findall(r'\d+', content)) > 5: score += 1  # Check for data/statistics
-    return min(5, score)
+    return score_depth(extract_features(content))
 
 def evaluate_formatting(content: str) -> int:
     """Evaluates content formatting quality"""
-    score = 5
-    if '*' not in content: score -= 1  # Check for emphasis
-    if '###' not in content: score -= 1  # Check for headers
-    if '\n\n' not in content: score -= 1  # Check for proper spacing
-    if len(content.split('\n')) < 10: score -= 1  # Check for proper structure
-    if not re.search(r'\n\s*\n', content): score -= 1  # Check for paragraph breaks
-    return max(1, score)
+    return score_formatting(extract_features(content))
+
+# Near-duplicate detection. A document's MinHash signature holds, for each
+# of MINHASH_PERMUTATIONS hash functions, the smallest hash of any of its
+# SHINGLE_WORDS-word shingles; the fraction of positions at which two
+# signatures agree estimates the Jaccard similarity of their shingle sets.
+# Signatures are cut into MINHASH_BANDS bands and only documents sharing a
+# whole band are compared (LSH banding), so grouping a batch or looking a
+# document up among many takes time linear in the number of documents.
+
+SHINGLE_WORDS = 3
+MINHASH_PERMUTATIONS = 128
+# 4 rows per band: pairs 0.6 similar share a band with probability ~0.99,
+# pairs 0.3 similar with probability ~0.23, before the full comparison
+MINHASH_BANDS = 32
+# About 8% of words changed; 3-word shingles keep small edits above it
+NEAR_DUPLICATE_THRESHOLD = 0.6
+
+# Lowercased UTF-8 with every ASCII byte but letters and digits blanked, so
+# one bytes.split() gives the words (non-ASCII characters stay in words)
+_WORD_BYTES = bytes.maketrans(
+    bytes(range(128)), bytes(byte if chr(byte).isalnum() else 32 for byte in range(128))
+)
+_minhash_parameters = None
+
+def _parameters():
+    """Multipliers and offsets of the hash functions, and the shingle mixers"""
+    global _minhash_parameters
+    if _minhash_parameters is None:
+        import numpy as np
+
+        # A fixed seed, so signatures compare across processes and restarts
+        rng = np.random.default_rng(0x5EED)
+        multipliers = rng.integers(0, 2**64, MINHASH_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+        offsets = rng.integers(0, 2**64, MINHASH_PERMUTATIONS, dtype=np.uint64)
+        # One per word position, for shingles of up to 8 words
+        mixers = rng.integers(0, 2**64, 8, dtype=np.uint64) | np.uint64(1)
+        _minhash_parameters = multipliers, offsets, mixers
+    return _minhash_parameters
+
+def minhash_signature(content: str, shingle_words: int = SHINGLE_WORDS):
+    """
+    The MinHash signature of a document's lowercased `shingle_words`-word
+    shingles, as a uint32 NumPy array, or None when it has no words
+    """
+    # Imported here so workers that never compare documents skip loading NumPy
+    import numpy as np
+
+    words = content.lower().encode('utf-8', 'surrogatepass').translate(_WORD_BYTES).split()
+    if not words:
+        return None
+    multipliers, offsets, mixers = _parameters()
+    hashes = np.fromiter(map(zlib.crc32, words), dtype=np.uint64, count=len(words))
+    # Documents shorter than a shingle are one shingle of all their words
+    width = min(shingle_words, len(words))
+    count = len(words) - width + 1
+    shingles = np.zeros(count, dtype=np.uint64)
+    for position in range(width):
+        shingles += hashes[position:position + count] * mixers[position]
+
+    # Multiply-add-shift hashing: the top bits of a * x + b (mod 2**64). Short
+    # inputs hash as one 2-D broadcast; past ~500 shingles one pass per hash
+    # function is faster (~1 ms for 10k shingles, against ~14 ms broadcast)
+    if count <= 512:
+        signature = (shingles[:, None] * multipliers + offsets).min(axis=0)
+    else:
+        signature = np.fromiter(
+            ((shingles * multiplier + offset).min() for multiplier, offset in zip(multipliers, offsets)),
+            dtype=np.uint64, count=MINHASH_PERMUTATIONS
+        )
+    return (signature >> np.uint64(32)).astype(np.uint32)
+
+def signature_similarity(first, second) -> float:
+    """Estimated Jaccard similarity of the documents behind two signatures"""
+    return int((first == second).sum()) / len(first)
+
+def _bands(signature) -> list:
+    rows = len(signature) // MINHASH_BANDS
+    return [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(MINHASH_BANDS)]
+
+def near_duplicate_groups(signatures: list, threshold: float = NEAR_DUPLICATE_THRESHOLD) -> list:
+    """
+    Groups of near-duplicate documents in a batch, as lists of indexes into
+    `signatures` (None entries are never grouped). Documents are grouped
+    transitively; only groups of two or more are returned.
+    """
+    parent = list(range(len(signatures)))
+
+    def root(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    # Each bucket keeps one member per group, so a batch of copies of the
+    # same document costs one comparison per band each, not one per copy
+    buckets = {}
+    for index, signature in enumerate(signatures):
+        if signature is None:
+            continue
+        for band in _bands(signature):
+            members = buckets.setdefault(band, [])
+            for other in members:
+                if root(other) == root(index):
+                    break
+                if signature_similarity(signature, signatures[other]) >= threshold:
+                    parent[root(index)] = root(other)
+                    break
+            else:
+                members.append(index)
+
+    groups = {}
+    for index, signature in enumerate(signatures):
+        if signature is not None:
+            groups.setdefault(root(index), []).append(index)
+    return sorted((group for group in groups.values() if len(group) > 1), key=lambda group: group[0])
+
+class MinHashIndex:
+    """
+    The signatures of recent documents, for near-duplicate lookup across
+    batches. A query only compares the stored signatures that share a band
+    with it; past `maxsize` entries the oldest are evicted. Thread-safe.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()  # key -> (signature, value)
+        self._buckets = {}  # band -> keys
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key, signature, value=None):
+        """Stores `value` under `key`, replacing any entry with the same key"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (signature, value)
+            for band in _bands(signature):
+                self._buckets.setdefault(band, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def discard(self, key):
+        """Removes the entry under `key`, if any"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def _remove(self, key):
+        signature, _ = self._entries.pop(key)
+        for band in _bands(signature):
+            bucket = self._buckets[band]
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[band]
+
+    def query(self, signature, threshold: float = NEAR_DUPLICATE_THRESHOLD, limit: int = None) -> list:
+        """(key, value, similarity) of the stored entries at least `threshold` similar, most similar first"""
+        with self._lock:
+            candidates = set()
+            for band in _bands(signature):
+                candidates.update(self._buckets.get(band, ()))
+            matches = []
+            for key in candidates:
+                stored, value = self._entries[key]
+                similarity = signature_similarity(signature, stored)
+                if similarity >= threshold:
+                    matches.append((key, value, similarity))
+        matches.sort(key=lambda match: -match[2])
+        return matches[:limit] if limit else matches
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+def near_duplicate_ids(evaluations: list, contents: list) -> list:
+    """near_duplicate_groups of a batch's contents, as lists of their evaluations' ids"""
+    groups = near_duplicate_groups([minhash_signature(content) for content in contents])
+    return [[evaluations[index]['id'] for index in group] for group in groups]
+
+def score_with_signature(content: str) -> tuple:
+    """score_content and the content's MinHash signature, from one call"""
+    return score_content(content), minhash_signature(content)
+
+# Bulk evaluation of JSONL corpora:
+#
+#     python resp.py generations.jsonl.gz -o scores.jsonl --processes 8
+#
+# Each input line is a result object ({"id": ..., "content": ...}); each
+# output line is its evaluation, as in evaluate_content, in input order.
+# Lines are read and written incrementally and parsed and scored by a pool
+# of processes, with at most a few chunks per process in flight, so memory
+# stays flat however large the corpus. Skipped results (errors, empty
+# content) and lines that are not valid JSON are counted, not written.
+# Without arguments, scores your_input.json as one batch.
+
+def _open_text(path: str, mode: str):
+    if path == '-':
+        return contextlib.nullcontext(sys.stdin if mode == 'r' else sys.stdout)
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+def _chunks(lines, size: int):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _bounded(chunks, slots: threading.Semaphore):
+    # Pool.imap reads its input as fast as it can; this holds it back until
+    # the writer has taken a finished chunk off the other end
+    for chunk in chunks:
+        slots.acquire()
+        yield chunk
+
+def _score_lines(lines: list):
+    """Scores one chunk of JSONL lines; returns (output lines, counts, characters read)."""
+    output = []
+    counts = {'scored': 0, 'skipped': 0, 'invalid': 0}
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            counts['invalid'] += 1
+            continue
+        # Valid JSON that is not a result object (null, 5, [...]) is invalid too
+        if not isinstance(item, dict):
+            counts['invalid'] += 1
+            continue
+        content = item.get('content', '') if 'error' not in item else ''
+        if not content or not isinstance(content, str):
+            counts['skipped'] += 1
+            continue
+        output.append(json.dumps({'id': item.get('id'), **score_content(content)}) + '\n')
+        counts['scored'] += 1
+    return output, counts, sum(len(line) for line in lines)
+
+def evaluate_jsonl(input_path: str, output_path: str, processes: int = None, chunk_size: int = 256,
+                   progress_interval: float = 10) -> dict:
+    """Scores every result in a JSONL file (.gz or '-' for stdin/stdout); returns the totals"""
+    processes = processes or os.cpu_count() or 1
+    totals = {'scored': 0, 'skipped': 0, 'invalid': 0}
+    chars_read = 0
+    start = last_report = time.monotonic()
+
+    def report(final=False):
+        elapsed = max(time.monotonic() - start, 1e-9)
+        lines = sum(totals.values())
+        print(
+            f"{'done' if final else 'progress'}: {lines} lines ({totals['scored']} scored, "
+            f"{totals['skipped']} skipped, {totals['invalid']} invalid) in {elapsed:.1f}s, "
+            f"{lines / elapsed:.0f} lines/s, {chars_read / elapsed / 1e6:.1f}M chars/s",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    slots = threading.Semaphore(processes * 4)
+    with _open_text(input_path, 'r') as source, _open_text(output_path, 'w') as sink, \
+            multiprocessing.Pool(processes) as pool:
+        chunks = _bounded(_chunks(source, chunk_size), slots)
+        for output, counts, size in pool.imap(_score_lines, chunks):
+            slots.release()
+            sink.writelines(output)
+            for key, count in counts.items():
+                totals[key] += count
+            chars_read += size
+            if progress_interval and time.monotonic() - last_report >= progress_interval:
+                last_report = time.monotonic()
+                report()
+    report(final=True)
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description='Score agent results with the five evaluate_* metrics.')
+    parser.add_argument('input', nargs='?', help="JSONL file of results (.gz, or '-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="JSONL file for the evaluations (default stdout)")
+    parser.add_argument('--processes', type=int, default=None, help='scoring processes (default: all cores)')
+    parser.add_argument('--chunk-size', type=int, default=256, help='lines per task sent to a process')
+    parser.add_argument('--progress-interval', type=float, default=10, help='seconds between progress lines on stderr')
+    args = parser.parse_args()
+
+    if args.input is None:
+        with open('your_input.json', 'r') as file:
+            json_input = file.read()
+            result = evaluate_content(json.loads(json_input))
+            print(json.dumps(result, indent=2))
+        return
+    evaluate_jsonl(args.input, args.output, args.processes, args.chunk_size, args.progress_interval)
 
 if __name__ == "__main__":
-    with open('your_input.json', 'r') as file:
-        json_input = file.read()
-        result = evaluate_content(json.loads(json_input))
-        print(json.dumps(result, indent=2))
\ No newline at end of file
+    main()
@@ -0,0 +1,194 @@
+# backend/search_cache.py
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+SEARCH_CACHE_PATH = os.getenv(
+    "SEARCH_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "search_cache.sqlite3"),
+)
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", str(24 * 3600)))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "10000"))
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "1") == "1"
+# A hit only records its access time when the stored one is older than this,
+# so lookups stay reads; LRU eviction is that coarse
+SEARCH_CACHE_TOUCH_INTERVAL = float(os.getenv("SEARCH_CACHE_TOUCH_INTERVAL", "300"))
+# Expired and least recently used entries are evicted once every this many
+# puts (per process), so the table can briefly run that far past its size
+SEARCH_CACHE_EVICT_EVERY = int(os.getenv("SEARCH_CACHE_EVICT_EVERY", "100"))
+# Hit/miss counters are kept in memory and added to the shared ones this often
+SEARCH_CACHE_FLUSH_INTERVAL = float(os.getenv("SEARCH_CACHE_FLUSH_INTERVAL", "30"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL,
+    latency REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+INSERT OR IGNORE INTO counters (name, value) VALUES
+    ('hits', 0), ('misses', 0), ('saved_seconds', 0), ('evictions', 0);
+"""
+
+
+def search_key(engine: str, query: str, **params) -> str:
+    """Hashes the engine, the whitespace/case-normalised query and the parameters."""
+    normalized = " ".join(query.split()).casefold()
+    raw = json.dumps({"engine": engine, "q": normalized, **params}, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """
+    Disk-backed search-result cache shared by every worker on the node.
+
+    Entries live in SQLite (WAL mode, so readers never block the writer) with
+    a per-entry TTL. Every SEARCH_CACHE_EVICT_EVERY puts, expired entries and
+    the least recently used beyond `max_entries` are evicted. Lookups only
+    read: a hit refreshes the entry's access time only once it is
+    SEARCH_CACHE_TOUCH_INTERVAL old. Hit, miss and saved-latency counters are
+    counted in memory and added every SEARCH_CACHE_FLUSH_INTERVAL seconds to
+    the ones stored alongside, so those cover all workers.
+    """
+
+    def __init__(self, path: str = SEARCH_CACHE_PATH, ttl: float = SEARCH_CACHE_TTL, max_entries: int = SEARCH_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._counts_lock = threading.Lock()
+        self._counts = {}
+        self._counts_pid = os.getpid()
+        self._flushed = time.monotonic()
+        self._puts = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, re-opened in forked children
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _bump(self, conn: sqlite3.Connection, name: str, amount: float = 1):
+        conn.execute("UPDATE counters SET value = value + ? WHERE name = ?", (amount, name))
+
+    def _pending(self) -> dict:
+        # Counts made before a fork belong to the parent
+        if self._counts_pid != os.getpid():
+            self._counts = {}
+            self._counts_pid = os.getpid()
+        return self._counts
+
+    def _count(self, **amounts):
+        with self._counts_lock:
+            counts = self._pending()
+            for name, amount in amounts.items():
+                counts[name] = counts.get(name, 0) + amount
+            due = time.monotonic() - self._flushed >= SEARCH_CACHE_FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Adds this process's pending counts to the shared counters."""
+        with self._counts_lock:
+            counts = self._pending()
+            self._counts = {}
+            self._flushed = time.monotonic()
+        if not counts:
+            return
+        conn = self._connection()
+        with conn:
+            for name, amount in counts.items():
+                self._bump(conn, name, amount)
+
+    def get(self, key: str):
+        """Returns the cached value for `key`, or None when missing or expired."""
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, latency, accessed FROM entries WHERE key = ? AND expires > ?", (key, now)
+        ).fetchone()
+        if row is None:
+            self._count(misses=1)
+            return None
+        value, latency, accessed = row
+        if now - accessed > SEARCH_CACHE_TOUCH_INTERVAL:
+            with conn:
+                conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        self._count(hits=1, saved_seconds=latency)
+        return value
+
+    def put(self, key: str, value: str, latency: float):
+        """Stores `value` along with how long the original search took."""
+        conn = self._connection()
+        now = time.time()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires, accessed, latency) VALUES (?, ?, ?, ?, ?)",
+                (key, value, now + self.ttl, now, latency),
+            )
+        with self._counts_lock:
+            self._puts += 1
+            due = self._puts % SEARCH_CACHE_EVICT_EVERY == 0
+        if due:
+            self.evict(now)
+
+    def evict(self, now: float = None):
+        """Deletes expired entries, then the least recently used beyond `max_entries`."""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM entries WHERE expires <= ?", (now or time.time(),))
+            overflow = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed LIMIT ?)",
+                    (overflow,),
+                )
+                self._bump(conn, "evictions", overflow)
+
+    def stats(self) -> dict:
+        self.flush()
+        conn = self._connection()
+        counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "entries": conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0],
+            "max_entries": self.max_entries,
+            "hits": int(counters["hits"]),
+            "misses": int(counters["misses"]),
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+            "saved_seconds": round(counters["saved_seconds"], 3),
+            "evictions": int(counters["evictions"]),
+        }
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache():
+    """Returns the process-wide SearchCache, or None when disabled."""
+    global _search_cache
+    if not SEARCH_CACHE_ENABLED:
+        return None
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                _search_cache = SearchCache()
+    return _search_cache
@@ -0,0 +1,33 @@
+# backend/tests/test_agent_loader.py
+import pytest
+
+import app
+from agent_loader import AgentLoadError, LazyAgents
+
+
+@pytest.fixture
+def broken(tmp_path, monkeypatch):
+    """A category whose agent module raises KeyError on import, next to a working one."""
+    (tmp_path / "broken_agent.py").write_text("raise KeyError('MISSING_SETTING')\n")
+    (tmp_path / "working_agent.py").write_text(
+        "def agent(input_data, stream=False):\n    return {'content': 'ok ' + input_data}\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    agents = LazyAgents({"1": ("broken_agent", "agent"), "2": ("working_agent", "agent")})
+    monkeypatch.setitem(app.AI_FUNCTIONS, "broken", agents)
+    return agents
+
+
+def test_import_failures_are_not_key_errors(broken):
+    assert "1" in broken and "3" not in broken
+    with pytest.raises(AgentLoadError, match="MISSING_SETTING"):
+        broken["1"]
+    with pytest.raises(KeyError):
+        broken["3"]
+
+
+def test_import_failure_is_reported_for_its_entry_only(broken):
+    failed = app.execute_function("broken", 1, "input")
+    assert failed["id"] == 1 and failed["error"].startswith("Error loading agent:")
+    assert app.execute_function("broken", 2, "input")["content"] == "ok input"
+    assert "No function found" in app.execute_function("broken", 3, "input")["error"]
@@ -0,0 +1,18 @@
+# backend/tests/test_app_boot.py
+import os
+import sys
+import subprocess
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_cors_origins_come_from_dotenv(tmp_path):
+    (tmp_path / ".env").write_text("FRONTEND_URL1=https://one.example\nFRONTEND_URL2=https://two.example\n")
+    env = {key: value for key, value in os.environ.items() if not key.startswith("FRONTEND_URL")}
+    env["PYTHONPATH"] = BACKEND
+    # Run from the .env's directory; `python -c` makes load_dotenv search from there
+    origins = subprocess.run(
+        [sys.executable, "-c", "import app; print(app.CORS_ORIGINS)"],
+        cwd=tmp_path, env=env, capture_output=True, text=True, check=True,
+    ).stdout.strip().splitlines()[-1]
+    assert origins == "['http://localhost:3000', 'https://one.example', 'https://two.example']"
@@ -0,0 +1,39 @@
+# backend/tests/test_asgi.py
+import asyncio
+
+import asgi
+
+
+def test_unfinished_agents_are_cancelled_when_the_stream_closes(monkeypatch):
+    started = []
+
+    async def agent(entry):
+        if entry["id"] == "slow":
+            await asyncio.sleep(60)
+        return {"id": entry["id"], "output": "done"}
+
+    def start(entry, research, on_token=None):
+        task = asyncio.create_task(agent(entry))
+        started.append(task)
+        return task
+
+    async def evaluate_when_done(task):
+        await task
+        return None
+
+    monkeypatch.setattr(asgi, "_start", start)
+    monkeypatch.setattr(asgi.evaluation, "aevaluate_when_done", evaluate_when_done)
+
+    async def main():
+        stream = asgi.stream_generation([{"id": "fast"}, {"id": "slow"}], "ndjson")
+        first = await stream.__anext__()
+        # The client disconnects after the first result
+        await stream.aclose()
+        await asyncio.sleep(0.01)
+        # Checked before asyncio.run would cancel leftover tasks itself
+        fast, slow = started
+        assert fast.done() and not fast.cancelled()
+        assert slow.cancelled()
+        return first
+
+    assert '"fast"' in asyncio.run(main())
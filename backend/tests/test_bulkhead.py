@@ -0,0 +1,75 @@
+# backend/tests/test_bulkhead.py
+import asyncio
+from contextlib import AsyncExitStack, ExitStack
+
+import pytest
+
+import executor
+import rate_limit
+from executor import Bulkhead, aopen_in_slot, open_in_slot
+from rate_limit import ProviderError
+
+
+@pytest.fixture
+def slots(monkeypatch):
+    """A one-slot bulkhead for the "test" provider; backoff sleeps record its in-flight count."""
+    bulkhead = Bulkhead("test", 1, timeout=0.5)
+    monkeypatch.setitem(executor.BULKHEADS, "test", bulkhead)
+    backoffs = []
+
+    def sleep(delay):
+        backoffs.append(bulkhead.in_flight)
+
+    async def asleep(delay):
+        backoffs.append(bulkhead.in_flight)
+
+    monkeypatch.setattr(rate_limit.time, "sleep", sleep)
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", asleep)
+    return bulkhead, backoffs
+
+
+def flaky(bulkhead, attempts):
+    """An attempt that fails once with a retryable error, then opens a 'stream'."""
+    def open_stream():
+        attempts.append(bulkhead.in_flight)
+        if len(attempts) == 1:
+            raise ProviderError("test", "unavailable", status=503, retryable=True)
+        return iter(["chunk"])
+    return open_stream
+
+
+def test_stream_slot_is_released_during_backoff_and_held_while_streaming(slots):
+    bulkhead, backoffs = slots
+    attempts = []
+    open_stream = flaky(bulkhead, attempts)
+    with ExitStack() as slot:
+        stream = rate_limit.call_with_retries(
+            "test", "test-model", "prompt", lambda: open_in_slot("test", slot, open_stream)
+        )
+        assert list(stream) == ["chunk"]
+        assert bulkhead.in_flight == 1
+    assert attempts == [1, 1]
+    assert backoffs == [0]
+    assert bulkhead.in_flight == 0
+
+
+def test_async_stream_slot_is_released_during_backoff(slots):
+    bulkhead, backoffs = slots
+    attempts = []
+    open_stream = flaky(bulkhead, attempts)
+
+    async def opened():
+        return open_stream()
+
+    async def run():
+        async with AsyncExitStack() as slot:
+            stream = await rate_limit.acall_with_retries(
+                "test", "test-model", "prompt", lambda: aopen_in_slot("test", slot, opened)
+            )
+            assert bulkhead.in_flight == 1
+            return list(stream)
+
+    assert asyncio.run(run()) == ["chunk"]
+    assert attempts == [1, 1]
+    assert backoffs == [0]
+    assert bulkhead.in_flight == 0
@@ -0,0 +1,57 @@
+# backend/tests/test_cassette.py
+import pytest
+
+import cassette
+from rate_limit import ProviderError
+
+
+@pytest.fixture
+def tape(tmp_path, monkeypatch):
+    """Switches the cassette to a fresh file; returns a function setting the mode."""
+    monkeypatch.setattr(cassette, "CASSETTE_PATH", str(tmp_path / "cassette.jsonl"))
+    monkeypatch.setattr(cassette, "_entries", None)
+    monkeypatch.setattr(cassette, "_cursors", {})
+
+    def mode(value):
+        monkeypatch.setattr(cassette, "CASSETTE_MODE", value)
+        monkeypatch.setattr(cassette, "_entries", None)
+    return mode
+
+
+def test_replay_returns_recorded_results_in_order(tape):
+    tape("record")
+    assert cassette.call("tool", {"q": "a"}, lambda: "first") == "first"
+    assert cassette.call("tool", {"q": "a"}, lambda: "second") == "second"
+    tape("replay")
+    replayed = [cassette.call("tool", {"q": "a"}, lambda: pytest.fail("called in replay")) for _ in range(3)]
+    # A key replays its recordings in order, then starts over
+    assert replayed == ["first", "second", "first"]
+
+
+def test_replay_masks_timestamps_in_requests(tape):
+    tape("record")
+    cassette.call("llm", {"prompt": "now is 2026-10-18 10:00:01"}, lambda: "answer")
+    tape("replay")
+    assert cassette.call("llm", {"prompt": "now is 2026-10-19T08:30:00Z"}, lambda: None) == "answer"
+
+
+def test_recorded_errors_and_streams_replay(tape):
+    tape("record")
+
+    def fail():
+        raise ProviderError("groq", "overloaded", status=503, retryable=True)
+
+    with pytest.raises(ProviderError):
+        cassette.call("llm", "failing", fail)
+    assert list(cassette.call("llm", "stream", lambda: iter(["a", "b"]), stream=True)) == ["a", "b"]
+    tape("replay")
+    with pytest.raises(ProviderError) as error:
+        cassette.call("llm", "failing", fail)
+    assert (error.value.status, error.value.retryable) == (503, True)
+    assert list(cassette.call("llm", "stream", lambda: iter([]), stream=True)) == ["a", "b"]
+
+
+def test_missing_recording_fails_like_a_provider_error(tape):
+    tape("replay")
+    with pytest.raises(ProviderError):
+        cassette.call("llm", "never recorded", lambda: "live")
@@ -0,0 +1,99 @@
+# backend/tests/test_evaluation.py
+import asyncio
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+import evaluation
+import event_loop
+import resp
+
+
+@pytest.fixture
+def scoring_threads(monkeypatch):
+    """Records the thread every result is scored on."""
+    threads = []
+    score = evaluation.score_with_signature
+
+    def recording(content):
+        threads.append(threading.get_ident())
+        return score(content)
+
+    monkeypatch.setattr(evaluation, "score_with_signature", recording)
+    monkeypatch.setattr(evaluation, "EVAL_PROCESSES", 0)
+    evaluation._memo.clear()
+    return threads
+
+
+def test_aevaluate_when_done_scores_off_the_event_loop(scoring_threads):
+    async def main():
+        async def agent():
+            return {"id": "1", "content": "some generated content"}
+
+        scored = await evaluation.aevaluate_when_done(asyncio.ensure_future(agent()))
+        return scored, threading.get_ident()
+
+    scored, loop_thread = asyncio.run(main())
+    assert scored["id"] == "1" and "scores" in scored
+    assert scoring_threads and loop_thread not in scoring_threads
+
+
+def test_evaluate_when_done_leaves_the_agent_loop(scoring_threads):
+    async def agent():
+        return {"id": "2", "content": "content from the asyncio engine"}
+
+    loop_thread = event_loop.submit_coroutine(_thread_id()).result(timeout=5)
+    scored = evaluation.evaluate_when_done(event_loop.submit_coroutine(agent())).result(timeout=5)
+    assert scored["id"] == "2"
+    assert scoring_threads and loop_thread not in scoring_threads
+
+
+def test_evaluate_when_done_scores_inline_off_loops(scoring_threads):
+    agent_future = Future()
+    scored = evaluation.evaluate_when_done(agent_future)
+    agent_future.set_result({"id": "3", "content": "threaded engine content"})
+    assert scored.result(timeout=5)["id"] == "3"
+    assert scoring_threads == [threading.get_ident()]
+
+
+def test_evaluate_when_done_propagates_agent_errors():
+    agent_future = Future()
+    scored = evaluation.evaluate_when_done(agent_future)
+    agent_future.set_exception(RuntimeError("agent failed"))
+    with pytest.raises(RuntimeError):
+        scored.result(timeout=5)
+
+
+async def _thread_id():
+    return threading.get_ident()
+
+
+def test_collect_matches_evaluate_content(scoring_threads, monkeypatch):
+    monkeypatch.setattr(evaluation, "_recent", resp.MinHashIndex())
+    document = " ".join(f"word{index} and more" for index in range(100))
+    results = [
+        {"id": "a", "content": document},
+        {"id": "b", "content": document + " Imagine!"},
+        {"id": "c", "error": "failed"},
+        {"id": "d", "content": "something else entirely?"},
+    ]
+    summary = evaluation.collect([evaluation.evaluate(result) for result in results])
+    assert summary == resp.evaluate_content(results)
+    assert summary["near_duplicates"] == [["a", "b"]]
+
+
+def test_repeated_content_is_scored_once(scoring_threads):
+    first = evaluation.evaluate({"id": "1", "content": "the same output"}).result()
+    second = evaluation.evaluate({"id": "2", "content": "the same output"}).result()
+    assert len(scoring_threads) == 1
+    assert second["id"] == "2" and second["scores"] == first["scores"]
+
+
+def test_outputs_repeating_a_recent_batch_are_flagged(scoring_threads, monkeypatch):
+    monkeypatch.setattr(evaluation, "_recent", resp.MinHashIndex())
+    document = " ".join(f"word{index} in a long answer" for index in range(60))
+    first = evaluation.collect([evaluation.evaluate({"id": "1", "content": document})])
+    assert "recent_duplicate_similarity" not in first["evaluations"][0]
+    second = evaluation.collect([evaluation.evaluate({"id": "2", "content": document + " again"})])
+    assert second["evaluations"][0]["recent_duplicate_similarity"] >= evaluation.EVAL_DUPLICATE_THRESHOLD
@@ -0,0 +1,49 @@
+# backend/tests/test_gemini_service.py
+import json
+
+import pytest
+
+from app import GeminiService
+
+
+class FakeModel:
+    def __init__(self, text):
+        self.text = text
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        return self
+
+
+@pytest.fixture
+def service():
+    service = GeminiService("test-key")
+    service.model = FakeModel("```json\n" + json.dumps({
+        "content_type": "travel",
+        "recommended_agent": "travel",
+        "available_agents": ["travel"],
+        "confidence_score": 0.9,
+        "is_relevant": True,
+    }) + "\n```")
+    return service
+
+
+def test_classifications_are_cached_by_normalized_prompt(service):
+    first = service.generate_response("Plan a trip to  Paris")
+    assert first["recommended_agent"] == "travel"
+    assert service.generate_response("plan a TRIP to paris ") == first
+    assert len(service.model.prompts) == 1
+    assert (service.cache_stats()["hits"], service.cache_stats()["misses"]) == (1, 1)
+
+
+def test_cached_results_are_copies(service):
+    service.generate_response("Plan a trip")["recommended_agent"] = "changed"
+    assert service.generate_response("Plan a trip")["recommended_agent"] == "travel"
+
+
+def test_failed_classifications_are_not_cached(service):
+    service.model = FakeModel("not json")
+    assert service.generate_response("Plan a trip")["confidence_score"] == 0
+    service.generate_response("Plan a trip")
+    assert len(service.model.prompts) == 2
@@ -0,0 +1,96 @@
+# backend/tests/test_generation_cache.py
+import os
+import sys
+import subprocess
+
+import pytest
+
+import generation_cache
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULT = {"id": 1, "content": "generated output", "response_time": 2.0}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(generation_cache, "GENERATION_CACHE_ENABLED", True)
+    generation_cache._reset_after_fork()
+    yield generation_cache
+    generation_cache._reset_after_fork()
+
+
+def test_disabled_by_default():
+    # Imported fresh, without the variable set
+    env = {key: value for key, value in os.environ.items() if key != "GENERATION_CACHE_ENABLED"}
+    enabled = subprocess.run(
+        [sys.executable, "-c", "import generation_cache; print(generation_cache.GENERATION_CACHE_ENABLED)"],
+        cwd=BACKEND, env=env, capture_output=True, text=True, check=True,
+    ).stdout.strip()
+    assert enabled == "False"
+
+
+def test_serves_reworded_input_without_the_original(cache):
+    cache.store("travel", 1, "Trip to Paris", RESULT)
+    hit = cache.lookup("travel", 1, "paris trip itinerary")
+    assert hit["content"] == RESULT["content"]
+    assert hit["cache"]["similarity"] == pytest.approx(0.667, abs=0.001)
+    # Another user's input is never returned
+    assert "input" not in hit["cache"]
+    assert "Trip to Paris" not in repr(hit)
+
+
+def test_scoped_per_agent(cache):
+    cache.store("travel", 1, "Trip to Paris", RESULT)
+    assert cache.lookup("travel", 2, "Trip to Paris") is None
+    assert cache.lookup("blog", 1, "Trip to Paris") is None
+
+
+@pytest.mark.parametrize(
+    "stored, requested",
+    [
+        ("why you should learn Python", "why you should not learn Python"),
+        ("why you should not learn Python", "why you should learn Python"),
+        ("why you shouldn't learn Python", "why you should learn Python"),
+        ("remote work with meetings", "remote work without meetings"),
+    ],
+)
+def test_negation_never_matches(cache, stored, requested):
+    cache.store("blog", 1, stored, RESULT)
+    assert cache.lookup("blog", 1, requested) is None
+
+
+@pytest.mark.parametrize(
+    "stored, requested",
+    [
+        ("tips for junior engineers", "tips for senior engineers"),
+        ("remote work productivity blog", "remote work burnout blog"),
+        ("5 day itinerary for Lisbon", "7 day itinerary for Lisbon"),
+        ("Summarize https://youtu.be/abc123", "summarize https://youtu.be/xyz789"),
+    ],
+)
+def test_substituted_words_never_match(cache, stored, requested):
+    cache.store("blog", 1, stored, RESULT)
+    assert cache.lookup("blog", 1, requested) is None
+
+
+def test_errors_are_not_stored(cache):
+    cache.store("travel", 1, "Trip to Paris", {"id": 1, "error": "provider failed"})
+    cache.store("travel", 1, "Trip to Rome", {"id": 1, "content": None})
+    assert cache.lookup("travel", 1, "Trip to Paris") is None
+    assert cache.lookup("travel", 1, "Trip to Rome") is None
+
+
+def test_expired_entries_are_dropped(cache, monkeypatch):
+    cache.store("travel", 1, "Trip to Paris", RESULT)
+    monkeypatch.setattr(generation_cache, "GENERATION_CACHE_TTL", -1)
+    assert cache.lookup("travel", 1, "Trip to Paris") is None
+    assert cache.generation_cache_stats()["entries"] == 0
+
+
+def test_entries_are_bounded_per_agent(cache, monkeypatch):
+    monkeypatch.setattr(generation_cache, "GENERATION_CACHE_SIZE", 8)
+    for index in range(50):
+        cache.store("travel", 1, f"topic{index} trip", RESULT)
+    assert cache.generation_cache_stats()["entries"] == 8
+    assert cache.lookup("travel", 1, "topic49 trip") is not None
+    assert cache.lookup("travel", 1, "topic0 trip") is None
@@ -0,0 +1,90 @@
+# backend/tests/test_rate_limit.py
+import time
+import asyncio
+
+import pytest
+
+import rate_limit
+from rate_limit import RateLimiter, RetryBudgetExceeded
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    """A limiter with one request per minute, already used up."""
+    limiter = RateLimiter("test-model", 1, 10**9)
+    assert limiter.acquire(1)
+    monkeypatch.setitem(rate_limit._limiters, "test-model", limiter)
+    monkeypatch.setattr(rate_limit, "RETRY_MAX_SECONDS", 0.5)
+    return limiter
+
+
+def test_pacing_wait_past_the_deadline_raises_without_sleeping(limiter):
+    calls = []
+    start = time.monotonic()
+    with pytest.raises(RetryBudgetExceeded):
+        rate_limit.call_with_retries("test", "test-model", "prompt", lambda: calls.append(1))
+    assert time.monotonic() - start < 0.5
+    assert calls == []
+
+
+def test_async_pacing_wait_past_the_deadline_raises(limiter):
+    async def call():
+        raise AssertionError("must not be called")
+
+    with pytest.raises(RetryBudgetExceeded):
+        asyncio.run(rate_limit.acall_with_retries("test", "test-model", "prompt", call))
+
+
+def test_refused_reservation_is_given_back():
+    limiter = RateLimiter("test-model", 60, 10**9)
+    for _ in range(60):
+        assert limiter.reserve(1) == 0
+    assert limiter.reserve(1, deadline=time.monotonic()) is None
+    # The refused request did not push the next one further out
+    assert limiter.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_wait_within_the_deadline_is_slept():
+    limiter = RateLimiter("test-model", 600, 10**9)
+    for _ in range(600):
+        limiter.reserve(1)
+    start = time.monotonic()
+    assert limiter.acquire(1, deadline=time.monotonic() + 5)
+    assert time.monotonic() - start >= 0.09
+
+
+def test_unconfigured_limits_do_not_pace():
+    limiter = RateLimiter("test-model", 0, 0)
+    for _ in range(1000):
+        assert limiter.reserve(10**6) == 0
+    assert limiter.stats()["throttled"] == 0
+
+
+def test_unconfigured_limits_still_back_off_after_a_429():
+    limiter = RateLimiter("test-model", 0, 0)
+    limiter.backoff(5)
+    assert limiter.reserve(1) == pytest.approx(5, abs=0.05)
+    assert limiter.reserve(1, deadline=time.monotonic() + 1) is None
+
+
+def test_limits_come_from_the_environment(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_limiters", {})
+    monkeypatch.setattr(rate_limit, "MODEL_LIMITS", {"configured": (30, 12000)})
+    monkeypatch.setattr(rate_limit, "DEFAULT_LIMITS", (0, 0))
+    assert rate_limit.get_limiter("configured").stats()["rpm"] == 30
+    assert rate_limit.get_limiter("other").stats()["rpm"] == 0
+
+
+def test_transient_failures_stop_after_max_attempts_calls(monkeypatch):
+    monkeypatch.setitem(rate_limit._limiters, "test-model", RateLimiter("test-model", 0, 0))
+    monkeypatch.setattr(rate_limit, "RETRY_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(rate_limit.time, "sleep", lambda delay: None)
+    calls = []
+
+    def call():
+        calls.append(1)
+        raise rate_limit.ProviderError("test", "unavailable", status=503, retryable=True)
+
+    with pytest.raises(RetryBudgetExceeded, match="after 3 attempt"):
+        rate_limit.call_with_retries("test", "test-model", "prompt", call)
+    assert len(calls) == 3
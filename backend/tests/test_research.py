@@ -0,0 +1,95 @@
+# backend/tests/test_research.py
+import asyncio
+import threading
+
+from ai_agents import researchers
+from research import ResearchBatch, shared_research, use_research_batch
+
+
+def test_variants_of_a_category_share_research(monkeypatch):
+    prompts = []
+
+    class Researcher:
+        def run(self, prompt, stream=False):
+            prompts.append(prompt)
+            return "blog research"
+
+    monkeypatch.setattr(researchers, "get_assistants", lambda *args: Researcher())
+    batch = ResearchBatch()
+    with use_research_batch(batch):
+        # What blog1 and blog2 both call for their research phase
+        first = researchers.research_topic("blog", "Remote work", "serp-key")
+        second = researchers.research_topic("blog", "remote  WORK", "serp-key")
+    assert (first, second) == ("blog research", "blog research")
+    assert prompts == ["Research blog topic: Remote work"]
+    assert batch.stats() == {"runs": 1, "reused": 1}
+
+
+def test_every_shared_category_has_a_researcher():
+    assert set(researchers.RESEARCHERS) == {"blog", "linkedin", "travel"}
+
+
+def test_caption_fetches_are_shared_between_summarizers():
+    batch = ResearchBatch()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return "captions"
+
+    with use_research_batch(batch):
+        results = [shared_research("youtube", "https://youtu.be/dQw4w9WgXcQ", fetch) for _ in range(3)]
+    assert results == ["captions"] * 3 and calls == [1]
+
+
+def test_concurrent_requests_for_one_key_run_once():
+    batch = ResearchBatch()
+    started = threading.Event()
+    release = threading.Event()
+    results = []
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "research"
+
+    def agent():
+        with use_research_batch(batch):
+            results.append(shared_research("travel", "Lisbon", slow))
+
+    threads = [threading.Thread(target=agent) for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["research"] * 4
+    assert batch.stats() == {"runs": 1, "reused": 3}
+
+
+def test_categories_keep_their_own_research_by_default():
+    batch = ResearchBatch(share_across_categories=False)
+    with use_research_batch(batch):
+        blog = shared_research("blog", "AI", lambda: "blog")
+        linkedin = shared_research("linkedin", "AI", lambda: "linkedin")
+    assert (blog, linkedin) == ("blog", "linkedin")
+    assert batch.stats() == {"runs": 2, "reused": 0}
+
+
+def test_sharing_across_categories_is_opt_in():
+    batch = ResearchBatch(share_across_categories=True)
+
+    async def run(text):
+        return text
+
+    async def main():
+        with use_research_batch(batch):
+            return [
+                await batch.aget_or_run("blog", "AI", lambda: run("blog")),
+                await batch.aget_or_run("linkedin", "ai", lambda: run("linkedin")),
+                await batch.aget_or_run("youtube", "ai", lambda: run("captions")),
+            ]
+
+    assert asyncio.run(main()) == ["blog", "blog", "captions"]
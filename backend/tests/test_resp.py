@@ -0,0 +1,200 @@
+# backend/tests/test_resp.py
+import re
+import json
+import random
+
+import resp
+
+
+def test_score_lines_counts_non_object_json_as_invalid():
+    lines = ['{"id": 1, "content": "x"}\n', 'null\n', '5\n', '[1]\n', '"text"\n', 'not json\n', '\n']
+    output, counts, _ = resp._score_lines(lines)
+    assert counts == {'scored': 1, 'skipped': 0, 'invalid': 5}
+    assert json.loads(output[0]) == {'id': 1, **resp.score_content('x')}
+
+
+def test_score_lines_skips_errors_and_empty_content():
+    lines = ['{"id": 1, "error": "failed"}\n', '{"id": 2, "content": ""}\n', '{"id": 3, "content": 7}\n']
+    output, counts, _ = resp._score_lines(lines)
+    assert output == []
+    assert counts == {'scored': 0, 'skipped': 3, 'invalid': 0}
+
+
+def test_evaluate_jsonl_survives_invalid_lines(tmp_path):
+    source = tmp_path / 'results.jsonl'
+    source.write_text('{"id": 1, "content": "x"}\nnull\n{"id": 2, "content": "y"}\n')
+    target = tmp_path / 'scores.jsonl'
+    totals = resp.evaluate_jsonl(str(source), str(target), processes=1, progress_interval=0)
+    assert totals == {'scored': 2, 'skipped': 0, 'invalid': 1}
+    assert [json.loads(line)['id'] for line in target.read_text().splitlines()] == [1, 2]
+
+
+# Golden comparison: the single-pass scorers against the per-scorer
+# implementation they replaced, kept here verbatim as the reference
+
+def reference_clarity(content: str) -> int:
+    avg_sentence_length = len(content.split()) / (len(re.split('[.!?]+', content)) + 1)
+    score = 5
+    if avg_sentence_length > 25: score -= 1
+    if avg_sentence_length > 35: score -= 1
+    if '###' not in content: score -= 1
+    if len(content.split()) < 100: score -= 1
+    return max(1, score)
+
+def reference_structure(content: str) -> int:
+    score = 5
+    if not content.startswith('*'): score -= 1
+    if '###' not in content: score -= 2
+    if '\n\n' not in content: score -= 1
+    if len(content.split('\n\n')) < 3: score -= 1
+    return max(1, score)
+
+def reference_engagement(content: str) -> int:
+    engagement_indicators = [
+        '?', '!', 'imagine', 'consider', 'you', 'we', 'discover',
+        'explore', 'learn', 'understand', 'revolutionize'
+    ]
+    score = 1
+    for indicator in engagement_indicators:
+        if indicator.lower() in content.lower():
+            score += 0.5
+    return min(5, round(score))
+
+def reference_depth(content: str) -> int:
+    word_count = len(content.split())
+    score = 1
+    if word_count > 300: score += 1
+    if word_count > 600: score += 1
+    if word_count > 1000: score += 1
+    if len(re.findall(r'\d+', content)) > 5: score += 1
+    return min(5, score)
+
+def reference_formatting(content: str) -> int:
+    score = 5
+    if '*' not in content: score -= 1
+    if '###' not in content: score -= 1
+    if '\n\n' not in content: score -= 1
+    if len(content.split('\n')) < 10: score -= 1
+    if not re.search(r'\n\s*\n', content): score -= 1
+    return max(1, score)
+
+REFERENCE = {
+    'clarity': reference_clarity,
+    'structure': reference_structure,
+    'engagement': reference_engagement,
+    'depth': reference_depth,
+    'formatting': reference_formatting,
+}
+
+VOCABULARY = (
+    'the a of and to in for with travel itinerary budget guide data results growth team product launch '
+    'imagine consider you we discover explore learn understand revolutionize Paris Lisbon 2025 42 3.5%'
+).split()
+
+SEPARATORS = [' '] * 30 + ['. ', '! ', '? ', '... ', '?! ', '\n', '\n\n', '\n \n', ', ', ' ** ', '\t']
+
+EDGE_CASES = [
+    '', ' ', '\n', '\n\n', '\n \n', '\n\t\r\n', '*', '###', '?', '!', '.', '...', '?!.',
+    'Word', '**Title**\n\n### Section\n\nBody.', '### only headers ### here',
+    '٣٤٥ Arabic-Indic digits ١ ٢ ٦ ٧ ٨',  # \d matches Unicode digits
+    '²³ superscripts are not decimal digits',
+    'line separator paragraph\x1c\x1d\x1e\x1f\x85\xa0　',  # Unicode whitespace
+    '\n\x0b\n', '\n\x0c\n', '\r\n\r\n', '\n　\n',
+    'İMAGINE İstanbul',  # lowercases to two characters
+    'YOU WE LEARN UNDERSTAND EXPLORE DISCOVER CONSIDER IMAGINE REVOLUTIONIZE ?!',
+    'Kelvin sign and ﬁ ligature',
+    '1٣2 mixed-script digit run', 'lone surrogate \ud800 after text 12',
+    '1' * 50, '1 2 3 4 5', '1 2 3 4 5 6', 'a1b2c3d4e5f6', '12.34.56.78',
+    '* ' * 200, '\n' * 9, '\n' * 10, 'word\n' * 9 + 'word',
+]
+
+def random_document(rng: random.Random, words: int) -> str:
+    parts = []
+    if rng.random() < 0.5:
+        parts.append('**Title**\n\n')
+    for _ in range(words):
+        if rng.random() < 0.01:
+            parts.append('\n\n### Section\n\n')
+        parts.append(rng.choice(VOCABULARY))
+        parts.append(rng.choice(SEPARATORS))
+    return ''.join(parts)
+
+def golden_corpus() -> list:
+    rng = random.Random(1)
+    corpus = list(EDGE_CASES)
+    corpus += [a + b for a in EDGE_CASES for b in EDGE_CASES[:12]]
+    corpus += [random_document(rng, rng.choice([0, 5, 50, 150, 400, 800, 1200])) for _ in range(300)]
+    # Perturbed copies hit thresholds from both sides
+    corpus += [doc.replace('\n\n', '\n', rng.randint(0, 3)) for doc in corpus[-100:]]
+    return corpus
+
+def test_feature_counts_match_the_reference():
+    for content in golden_corpus():
+        features = resp.extract_features(content)
+        assert (
+            features.word_count, features.sentence_count, features.digit_runs,
+            features.paragraph_count, features.line_count,
+        ) == (
+            len(content.split()), len(re.split('[.!?]+', content)), len(re.findall(r'\d+', content)),
+            len(content.split('\n\n')), len(content.split('\n')),
+        ), content[:80]
+
+def test_scores_match_the_reference():
+    for content in golden_corpus():
+        features = resp.extract_features(content)
+        for name, reference in REFERENCE.items():
+            expected = reference(content)
+            assert getattr(resp, f'score_{name}')(features) == expected, (name, content[:80])
+            assert getattr(resp, f'evaluate_{name}')(content) == expected, (name, content[:80])
+
+def test_evaluate_batch_matches_evaluate_content():
+    rng = random.Random(2)
+    results = [
+        {'id': str(index), 'content': random_document(rng, rng.choice([20, 150, 600, 1500]))}
+        for index in range(200)
+    ]
+    results += [{'id': f'edge{index}', 'content': content} for index, content in enumerate(EDGE_CASES)]
+    results += [{'id': 'copy', 'content': results[0]['content']}, {'id': 'error', 'error': 'failed'}]
+    batch = resp.evaluate_batch(results)
+    assert batch == resp.evaluate_content(results)
+    assert ['0', 'copy'] in batch['near_duplicates']
+
+# MinHash near-duplicate detection
+
+def edited(rng: random.Random, content: str, rate: float) -> str:
+    return ' '.join(word if rng.random() >= rate else 'edited' for word in content.split(' '))
+
+def test_minhash_signature_is_stable_and_case_insensitive():
+    first = resp.minhash_signature('Trip to Paris in the spring')
+    assert first.dtype.name == 'uint32' and len(first) == resp.MINHASH_PERMUTATIONS
+    assert (first == resp.minhash_signature('trip TO paris, in the spring!')).all()
+    assert resp.minhash_signature(' .,;\n') is None
+    # Long documents take the per-hash-function path; it must agree with the broadcast one
+    long = ' '.join(f'word{index}' for index in range(600))
+    assert resp.signature_similarity(resp.minhash_signature(long), resp.minhash_signature(long + ' extra')) > 0.95
+
+def test_near_duplicate_groups_finds_edited_copies_only():
+    rng = random.Random(3)
+    documents = [random_document(rng, 400) for _ in range(20)]
+    signatures = [resp.minhash_signature(content) for content in documents]
+    assert resp.near_duplicate_groups(signatures) == []
+    copies = [resp.minhash_signature(edited(rng, documents[index], 0.02)) for index in (3, 7)]
+    groups = resp.near_duplicate_groups(signatures + copies + [signatures[3], None])
+    assert groups == [[3, 20, 22], [7, 21]]
+
+def test_minhash_index_lookup_replacement_and_eviction():
+    rng = random.Random(4)
+    documents = [random_document(rng, 200) for _ in range(4)]
+    index = resp.MinHashIndex(maxsize=3)
+    for key, content in enumerate(documents[:3]):
+        index.add(key, resp.minhash_signature(content), f'value{key}')
+    query = resp.minhash_signature(edited(rng, documents[1], 0.02))
+    assert [match[:2] for match in index.query(query)] == [(1, 'value1')]
+    index.add(1, resp.minhash_signature(documents[1]), 'replaced')
+    assert index.query(query)[0][1] == 'replaced'
+    # Past maxsize the oldest entry goes
+    index.add(3, resp.minhash_signature(documents[3]), 'value3')
+    assert len(index) == 3
+    assert index.query(resp.minhash_signature(documents[0])) == []
+    index.discard(1)
+    assert index.query(query) == [] and len(index) == 2
@@ -0,0 +1,70 @@
+# backend/tests/test_search_cache.py
+import pytest
+
+import search_cache
+from search_cache import SearchCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SearchCache(path=str(tmp_path / "cache.sqlite3"), ttl=60, max_entries=100)
+
+
+def accessed(cache, key):
+    return cache._connection().execute("SELECT accessed FROM entries WHERE key = ?", (key,)).fetchone()[0]
+
+
+def test_lookups_do_not_write(cache):
+    cache.put("key", "value", 1.5)
+    conn = cache._connection()
+    changes = conn.total_changes
+    assert cache.get("key") == "value"
+    assert cache.get("missing") is None
+    assert conn.total_changes == changes
+
+
+def test_counters_are_flushed_to_the_shared_table(cache):
+    cache.put("key", "value", 1.5)
+    cache.get("key")
+    cache.get("key")
+    cache.get("missing")
+    # A second instance reads only what was flushed
+    other = SearchCache(path=cache.path)
+    assert other.stats()["hits"] == 0
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["saved_seconds"]) == (2, 1, 3.0)
+    assert other.stats()["hits"] == 2
+
+
+def test_stale_access_time_is_refreshed(cache, monkeypatch):
+    cache.put("key", "value", 1.5)
+    stored = accessed(cache, "key")
+    cache.get("key")
+    assert accessed(cache, "key") == stored
+    monkeypatch.setattr(search_cache, "SEARCH_CACHE_TOUCH_INTERVAL", 0)
+    cache.get("key")
+    assert accessed(cache, "key") > stored
+
+
+def test_eviction_runs_every_few_puts(cache, monkeypatch):
+    monkeypatch.setattr(search_cache, "SEARCH_CACHE_EVICT_EVERY", 10)
+    cache.max_entries = 5
+    for index in range(9):
+        cache.put(f"key{index}", "value", 0.1)
+    assert cache.stats()["entries"] == 9
+    cache.put("key9", "value", 0.1)
+    stats = cache.stats()
+    assert (stats["entries"], stats["evictions"]) == (5, 5)
+    # The most recently stored are kept
+    assert cache.get("key9") == "value" and cache.get("key0") is None
+
+
+def test_eviction_drops_expired_entries(cache):
+    cache.put("key", "value", 0.1)
+    cache.evict(now=cache._connection().execute("SELECT expires FROM entries").fetchone()[0])
+    assert cache.stats()["entries"] == 0
+
+
+def test_expires_is_indexed(cache):
+    plan = cache._connection().execute("EXPLAIN QUERY PLAN DELETE FROM entries WHERE expires <= 0").fetchall()
+    assert "entries_expires" in str(plan)
@@ -0,0 +1,105 @@
+# backend/tests/test_transcripts.py
+import pytest
+
+import transcripts
+from search_cache import SearchCache
+
+
+@pytest.fixture
+def fetches(tmp_path, monkeypatch):
+    """Empty memory and disk tiers; YouTube fetches are recorded instead of made."""
+    monkeypatch.setattr(transcripts, "_memory", {})
+    monkeypatch.setattr(transcripts, "_disk", SearchCache(path=str(tmp_path / "transcripts.sqlite3"), ttl=60))
+    calls = []
+
+    def fetch(video_id, languages=None):
+        calls.append(video_id)
+        return None if video_id == "no_captions" else {"video_id": video_id, "language": "en", "text": "hello"}
+
+    monkeypatch.setattr(transcripts, "fetch_transcript", fetch)
+    return calls
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42",
+    "youtu.be/dQw4w9WgXcQ",
+    "https://m.youtube.com/shorts/dQw4w9WgXcQ",
+    "https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ",
+    "dQw4w9WgXcQ",
+])
+def test_extract_video_id(url):
+    assert transcripts.extract_video_id(url) == "dQw4w9WgXcQ"
+
+
+def test_extract_video_id_rejects_other_links():
+    assert transcripts.extract_video_id("https://example.com/watch?v=dQw4w9WgXcQ") is None
+    assert transcripts.extract_video_id("https://youtu.be/short") is None
+
+
+def test_transcripts_are_fetched_once(fetches):
+    assert transcripts.get_transcript_text("https://youtu.be/dQw4w9WgXcQ") == "hello"
+    assert transcripts.get_transcript_text("https://youtu.be/dQw4w9WgXcQ") == "hello"
+    assert fetches == ["dQw4w9WgXcQ"]
+
+
+def test_disk_tier_serves_a_cold_memory_tier(fetches, monkeypatch):
+    transcripts.get_transcript("dQw4w9WgXcQ")
+    monkeypatch.setattr(transcripts, "_memory", {})
+    assert transcripts.get_transcript("dQw4w9WgXcQ")["text"] == "hello"
+    assert fetches == ["dQw4w9WgXcQ"]
+
+
+def test_missing_captions_are_not_cached(fetches):
+    assert transcripts.get_transcript("no_captions") is None
+    assert transcripts.get_transcript("no_captions") is None
+    assert fetches == ["no_captions", "no_captions"]
+
+
+def test_map_step_gives_every_part_its_own_llm(monkeypatch):
+    from gemini_patch import GeminiChat
+    from ai_agents import youtube3
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(youtube3, "get_transcript_text", lambda url: "word " * 20000)
+    llms = []
+
+    def run(self, prompt, stream=False, **kwargs):
+        llms.append(self)
+        return "summary"
+
+    monkeypatch.setattr(GeminiChat, "run", run)
+    result = youtube3.youtube_summarizer3("https://youtu.be/dQw4w9WgXcQ")
+    assert result["summary"] == "summary"
+    # Every part plus the final (reduce) summary ran on a distinct LLM object
+    assert len(llms) > 2 and len({id(llm) for llm in llms}) == len(llms)
+
+
+@pytest.mark.parametrize("error", [
+    transcripts.TranscriptsDisabled("dQw4w9WgXcQ"),
+    transcripts.VideoUnavailable("dQw4w9WgXcQ"),
+    transcripts.InvalidVideoId("dQw4w9WgXcQ"),
+])
+def test_videos_without_captions_have_no_transcript(error, monkeypatch):
+    def list_transcripts(video_id):
+        raise error
+
+    monkeypatch.setattr(transcripts.YouTubeTranscriptApi, "list_transcripts", list_transcripts)
+    assert transcripts._fetch_transcript("dQw4w9WgXcQ", ["en"]) is None
+
+
+def test_failed_youtube_requests_are_provider_errors(monkeypatch):
+    from requests import HTTPError, Response
+
+    def list_transcripts(video_id):
+        response = Response()
+        response.status_code = 503
+        try:
+            response.raise_for_status()
+        except HTTPError as error:
+            raise transcripts.YouTubeRequestFailed(error, video_id)
+
+    monkeypatch.setattr(transcripts.YouTubeTranscriptApi, "list_transcripts", list_transcripts)
+    with pytest.raises(transcripts.ProviderError) as raised:
+        transcripts._fetch_transcript("dQw4w9WgXcQ", ["en"])
+    assert raised.value.provider == "youtube"
+    assert raised.value.status == 503 and raised.value.retryable
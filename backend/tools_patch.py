@@ -0,0 +1,82 @@
+# backend/tools_patch.py
+import os
+import time
+import serpapi
+from phi.tools.serpapi_tools import SerpApiTools as PhiSerpApiTools
+from phi.tools.youtube_tools import YouTubeTools as PhiYouTubeTools
+from executor import bulkhead
+from search_cache import get_search_cache, search_key
+
+# Overridable to point at a local stub server (benchmarks/stub_servers.py)
+SERPAPI_BASE_URL = os.getenv("SERPAPI_BASE_URL")
+if SERPAPI_BASE_URL:
+    serpapi.SerpApiClient.BACKEND = SERPAPI_BASE_URL
+
+
+class SerpApiTools(PhiSerpApiTools):
+    """
+    phi's SerpApiTools with searches served from the shared on-disk search
+    cache when possible, and otherwise held inside the "serpapi" bulkhead.
+    """
+
+    def search_google(self, query: str, num_results: int = 10) -> str:
+        """
+        Search Google using the Serpapi API. Returns the search results.
+
+        Args:
+            query(str): The query to search for.
+            num_results(int): The number of results to return.
+
+        Returns:
+            str: The search results from Google.
+                Keys:
+                    - 'search_results': List of organic search results.
+                    - 'recipes_results': List of recipes search results.
+                    - 'shopping_results': List of shopping search results.
+                    - 'knowledge_graph': The knowledge graph.
+                    - 'related_questions': List of related questions.
+        """
+        cache = get_search_cache()
+        key = search_key("google", query or "", num=num_results)
+        if cache is not None and query:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        start = time.perf_counter()
+        with bulkhead("serpapi"):
+            result = super().search_google(query, num_results=num_results)
+
+        # Failures come back as plain text rather than JSON; never cache those
+        if cache is not None and query and result.startswith("{"):
+            cache.put(key, result, time.perf_counter() - start)
+        return result
+
+
+class YouTubeTools(PhiYouTubeTools):
+    """phi's YouTubeTools with YouTube requests held inside the "youtube" bulkhead."""
+
+    def get_youtube_video_data(self, url: str) -> str:
+        """Function to get video data from a YouTube URL.
+        Data returned includes {title, author_name, author_url, type, height, width, version, provider_name, provider_url, thumbnail_url}
+
+        Args:
+            url: The URL of the YouTube video.
+
+        Returns:
+            str: JSON data of the YouTube video.
+        """
+        with bulkhead("youtube"):
+            return super().get_youtube_video_data(url)
+
+    def get_youtube_video_captions(self, url: str) -> str:
+        """Use this function to get captions from a YouTube video.
+
+        Args:
+            url: The URL of the YouTube video.
+
+        Returns:
+            str: The captions of the YouTube video.
+        """
+        with bulkhead("youtube"):
+            return super().get_youtube_video_captions(url)
@@ -0,0 +1,284 @@
+# backend/tracing.py
+"""
+Lightweight request tracing.
+
+Spans nest through a context variable, follow work onto the shared executor
+and the event loop, and are exported in batches by a background thread as
+OTLP/JSON lines (the OpenTelemetry collector's file exporter format), so a
+trace file can be loaded into any OTLP-aware tool.
+
+Tracing is off unless TRACE_EXPORT_PATH is set. A trace is kept or dropped
+as a whole when its root span starts (TRACE_SAMPLE_RATE); spans of dropped
+traces cost one context-variable lookup. If the exporter falls behind,
+spans are dropped rather than queued without bound.
+"""
+import os
+import json
+import time
+import queue
+import atexit
+import random
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "10000"))
+TRACE_BATCH_SIZE = int(os.getenv("TRACE_BATCH_SIZE", "512"))
+TRACE_FLUSH_INTERVAL = float(os.getenv("TRACE_FLUSH_INTERVAL", "2"))
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "ai-content-backend")
+
+# OTLP span kinds
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+
+# Current span: a Span, _UNSAMPLED inside a dropped trace, or None
+_current = contextvars.ContextVar("trace_span", default=None)
+_UNSAMPLED = object()
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, kind: int, trace_id: str, parent_id: str = "", attributes: dict = None):
+        self.trace_id = trace_id
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+        self.error = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    @property
+    def traceparent(self) -> str:
+        """W3C trace context header value pointing at this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _RemoteParent:
+    """The caller's span, taken from an incoming `traceparent` header."""
+
+    def __init__(self, trace_id: str, span_id: str):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+
+def _attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def parse_traceparent(header: str):
+    """
+    Returns the parent for a W3C `traceparent` header: a remote span, the
+    unsampled marker when the caller dropped the trace, or None if absent/invalid.
+    """
+    parts = (header or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = int(parts[3], 16) & 1
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    return _RemoteParent(parts[1], parts[2]) if sampled else _UNSAMPLED
+
+
+@contextmanager
+def span(name: str, kind: int = INTERNAL, parent=None, **attributes):
+    """
+    Times `name` as a child of the current span (or of `parent`, e.g. from
+    `parse_traceparent`), starting and sampling a new trace when there is
+    none. Yields the Span, or None when the trace is not recorded.
+    """
+    if not TRACE_EXPORT_PATH:
+        yield None
+        return
+    if parent is None:
+        parent = _current.get()
+    if parent is None and random.random() >= TRACE_SAMPLE_RATE:
+        parent = _UNSAMPLED
+    if parent is _UNSAMPLED:
+        token = _current.set(_UNSAMPLED)
+        try:
+            yield None
+        finally:
+            _current.reset(token)
+        return
+
+    if parent is None:
+        current = Span(name, kind, "%032x" % random.getrandbits(128), attributes=attributes)
+    else:
+        current = Span(name, kind, parent.trace_id, parent.span_id, attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as error:
+        current.error = f"{type(error).__name__}: {error}"
+        raise
+    finally:
+        _current.reset(token)
+        current.end_ns = time.time_ns()
+        _export(current)
+
+
+def current_span():
+    """Returns the recording span of the caller, or None."""
+    current = _current.get()
+    return None if current is _UNSAMPLED else current
+
+
+def propagate(coro):
+    """
+    Wraps `coro` to run as part of the caller's trace, for coroutines handed
+    to another thread's event loop, which do not inherit the caller's context.
+    """
+    return _in_span(coro, _current.get())
+
+
+async def _in_span(coro, parent):
+    token = _current.set(parent)
+    try:
+        return await coro
+    finally:
+        _current.reset(token)
+
+
+_queue = None
+_exporter_pid = None
+_exporter_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"exported": 0, "dropped": 0}
+
+
+def _count(key: str, amount: int = 1):
+    with _stats_lock:
+        _stats[key] += amount
+
+
+def _export(finished: Span):
+    if _exporter_pid != os.getpid():
+        _start_exporter()
+    try:
+        _queue.put_nowait(finished)
+    except queue.Full:
+        _count("dropped")
+
+
+def _start_exporter():
+    """Starts this process's export thread (again in a forked child)."""
+    global _queue, _exporter_pid
+    with _exporter_lock:
+        if _exporter_pid != os.getpid():
+            _queue = queue.Queue(maxsize=TRACE_QUEUE_SIZE)
+            _exporter_pid = os.getpid()
+            thread = threading.Thread(target=_export_forever, args=(_queue,), name="trace-export", daemon=True)
+            thread.start()
+            atexit.register(_stop_exporter, _queue, thread)
+
+
+def _otlp_line(batch: list) -> str:
+    """One OTLP/JSON ExportTraceServiceRequest holding `batch`."""
+    resource = {
+        "attributes": [
+            _attribute("service.name", SERVICE_NAME),
+            _attribute("process.pid", os.getpid()),
+        ]
+    }
+    return json.dumps(
+        {
+            "resourceSpans": [
+                {
+                    "resource": resource,
+                    "scopeSpans": [{"scope": {"name": "backend"}, "spans": [s.to_otlp() for s in batch]}],
+                }
+            ]
+        }
+    )
+
+
+def _export_forever(spans: queue.Queue):
+    # A None in the queue asks the thread to write what it has and stop
+    stopping = False
+    while not stopping:
+        batch = [spans.get()]
+        deadline = time.monotonic() + TRACE_FLUSH_INTERVAL
+        while len(batch) < TRACE_BATCH_SIZE and batch[-1] is not None:
+            try:
+                batch.append(spans.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        if batch[-1] is None:
+            stopping = True
+            batch.pop()
+        if not batch:
+            continue
+        try:
+            _write_line(_otlp_line(batch))
+            _count("exported", len(batch))
+        except OSError as e:
+            logging.warning("Could not export %d span(s): %s", len(batch), e)
+            _count("dropped", len(batch))
+
+
+def _stop_exporter(spans: queue.Queue, thread: threading.Thread):
+    """Flushes the spans still queued or batched when the process exits."""
+    try:
+        spans.put(None, timeout=1)
+    except queue.Full:
+        return
+    thread.join(timeout=5)
+
+
+def _write_line(line: str):
+    # One O_APPEND write per batch, so workers sharing the file do not interleave
+    fd = os.open(TRACE_EXPORT_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, (line + "\n").encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+def _reset_after_fork():
+    for key in _stats:
+        _stats[key] = 0
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def tracing_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["enabled"] = bool(TRACE_EXPORT_PATH)
+    stats["sample_rate"] = TRACE_SAMPLE_RATE
+    stats["queued"] = _queue.qsize() if _queue is not None and _exporter_pid == os.getpid() else 0
+    return stats
@@ -0,0 +1,241 @@
+# backend/transcripts.py
+import os
+import re
+import asyncio
+import json
+import time
+import threading
+from typing import List, Optional
+from urllib.parse import urlparse, parse_qs
+from cachetools import TTLCache
+from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api import _transcripts
+from youtube_transcript_api._errors import (
+    CouldNotRetrieveTranscript,
+    InvalidVideoId,
+    NoTranscriptAvailable,
+    NoTranscriptFound,
+    TooManyRequests,
+    TranscriptsDisabled,
+    VideoUnavailable,
+    YouTubeRequestFailed,
+)
+import cassette
+from executor import bulkhead, map_parallel, to_executor
+from rate_limit import ProviderError, estimate_tokens
+from search_cache import SearchCache
+
+# Preferred caption languages, in order; any other available language is used as a fallback
+TRANSCRIPT_LANGUAGES = os.getenv("TRANSCRIPT_LANGUAGES", "en").split(",")
+TRANSCRIPT_CACHE_TTL = float(os.getenv("TRANSCRIPT_CACHE_TTL", str(7 * 24 * 3600)))
+TRANSCRIPT_CACHE_PATH = os.getenv(
+    "TRANSCRIPT_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "transcripts.sqlite3"),
+)
+
+# Map-reduce summarization of long transcripts
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "3000"))
+SUMMARY_PARALLELISM = int(os.getenv("SUMMARY_PARALLELISM", "4"))
+
+# Watch-page URL template ("...?v={video_id}"), overridable to point at a local
+# stub server (benchmarks/stub_servers.py); the library reads it per fetch
+YOUTUBE_WATCH_URL = os.getenv("YOUTUBE_WATCH_URL")
+if YOUTUBE_WATCH_URL:
+    _transcripts.WATCH_URL = YOUTUBE_WATCH_URL
+
+_VIDEO_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+# In-memory tier in front of the on-disk cache shared by all workers
+_memory = TTLCache(maxsize=int(os.getenv("TRANSCRIPT_MEMORY_ENTRIES", "256")), ttl=TRANSCRIPT_CACHE_TTL)
+_memory_lock = threading.Lock()
+_disk = SearchCache(
+    path=TRANSCRIPT_CACHE_PATH,
+    ttl=TRANSCRIPT_CACHE_TTL,
+    max_entries=int(os.getenv("TRANSCRIPT_DISK_ENTRIES", "5000")),
+)
+
+
+def extract_video_id(url: str) -> Optional[str]:
+    """
+    Extracts the video ID from a YouTube URL (watch, youtu.be, embed, v,
+    shorts and live links) or returns a bare 11-character ID unchanged.
+    """
+    url = url.strip()
+    if _VIDEO_ID.match(url):
+        return url
+    parsed = urlparse(url if "//" in url else f"https://{url}")
+    hostname = (parsed.hostname or "").lower()
+    if hostname.startswith("www."):
+        hostname = hostname[4:]
+
+    candidate = None
+    if hostname == "youtu.be":
+        candidate = parsed.path.lstrip("/").split("/")[0]
+    elif hostname in ("youtube.com", "m.youtube.com", "music.youtube.com", "youtube-nocookie.com"):
+        if parsed.path == "/watch":
+            candidate = parse_qs(parsed.query).get("v", [None])[0]
+        else:
+            parts = parsed.path.strip("/").split("/")
+            if len(parts) >= 2 and parts[0] in ("embed", "v", "shorts", "live"):
+                candidate = parts[1]
+    if candidate and _VIDEO_ID.match(candidate):
+        return candidate
+    return None
+
+
+def fetch_transcript(video_id: str, languages: List[str] = None) -> Optional[dict]:
+    """
+    Fetches a transcript straight from YouTube, preferring `languages` and
+    falling back to any available one. Returns None if the video has none;
+    raises ProviderError when YouTube itself fails or throttles us.
+    """
+    languages = languages or TRANSCRIPT_LANGUAGES
+    return cassette.call(
+        "youtube", {"video_id": video_id, "languages": languages}, lambda: _fetch_transcript(video_id, languages)
+    )
+
+
+def _fetch_transcript(video_id: str, languages: List[str]) -> Optional[dict]:
+    try:
+        with bulkhead("youtube"):
+            transcripts = YouTubeTranscriptApi.list_transcripts(video_id)
+            try:
+                transcript = transcripts.find_transcript(languages)
+            except NoTranscriptFound:
+                transcript = next(iter(transcripts), None)
+                if transcript is None:
+                    return None
+            segments = transcript.fetch()
+    except TooManyRequests as e:
+        raise ProviderError("youtube", "transcript requests are being throttled", status=429) from e
+    except (TranscriptsDisabled, NoTranscriptFound, NoTranscriptAvailable, VideoUnavailable, InvalidVideoId):
+        # The video has no captions we can use: not an outage
+        return None
+    except YouTubeRequestFailed as e:
+        # Raised while handling the requests HTTPError, which has the status (0.6.3
+        # passes its arguments swapped, so `e.reason` is the video ID, not the error)
+        http_error = e.__context__
+        status = getattr(getattr(http_error, "response", None), "status_code", None)
+        raise ProviderError(
+            "youtube",
+            f"transcript request failed: {http_error or e.reason}",
+            status=status,
+            retryable=status is None or status >= 500,
+        ) from e
+    except CouldNotRetrieveTranscript as e:
+        raise ProviderError("youtube", f"could not retrieve transcript: {e.cause}") from e
+
+    return {
+        "video_id": video_id,
+        "language": transcript.language_code,
+        "text": " ".join(segment["text"].replace("\n", " ") for segment in segments),
+    }
+
+
+def get_transcript(video_id: str, languages: List[str] = None) -> Optional[dict]:
+    """Returns the transcript for `video_id`, from memory, disk or YouTube in that order."""
+    languages = languages or TRANSCRIPT_LANGUAGES
+    key = f"{video_id}:{','.join(languages)}"
+
+    with _memory_lock:
+        cached = _memory.get(key)
+    if cached is not None:
+        return cached
+
+    stored = _disk.get(key)
+    if stored is not None:
+        transcript = json.loads(stored)
+    else:
+        start = time.perf_counter()
+        transcript = fetch_transcript(video_id, languages)
+        if transcript is None:
+            return None
+        _disk.put(key, json.dumps(transcript), time.perf_counter() - start)
+
+    with _memory_lock:
+        _memory[key] = transcript
+    return transcript
+
+
+def get_transcript_text(video_url: str, languages: List[str] = None) -> Optional[str]:
+    """
+    Returns the caption text of a YouTube video, ready to feed to a
+    summarizer, or None when the URL is invalid or the video has no captions.
+    """
+    video_id = extract_video_id(video_url)
+    if video_id is None:
+        return None
+    transcript = get_transcript(video_id, languages)
+    return transcript["text"] if transcript else None
+
+
+async def aget_transcript_text(video_url: str, languages: List[str] = None) -> Optional[str]:
+    """Async `get_transcript_text`; the blocking fetch runs on the shared executor."""
+    return await to_executor(get_transcript_text, video_url, languages)
+
+
+def transcript_cache_stats() -> dict:
+    with _memory_lock:
+        memory_entries = len(_memory)
+    return {"memory_entries": memory_entries, "disk": _disk.stats()}
+
+
+def split_transcript(text: str, chunk_tokens: int = SUMMARY_CHUNK_TOKENS) -> List[str]:
+    """Splits `text` on word boundaries into segments of at most ~`chunk_tokens` tokens."""
+    chunks, current, current_tokens = [], [], 0
+    for word in text.split():
+        tokens = estimate_tokens(" " + word)
+        if current and current_tokens + tokens > chunk_tokens:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(word)
+        current_tokens += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def condense_transcript(
+    text: str,
+    summarize_part,
+    chunk_tokens: int = SUMMARY_CHUNK_TOKENS,
+    parallelism: int = SUMMARY_PARALLELISM,
+) -> str:
+    """
+    Map step of map-reduce summarization.
+
+    Transcripts that fit in one chunk are returned unchanged. Longer ones are
+    split into token-bounded segments, each summarized concurrently on the
+    shared executor with `summarize_part(segment)`, and the part summaries are
+    returned joined in order, ready for the agent's usual (reduce) summary.
+    """
+    chunks = split_transcript(text, chunk_tokens)
+    if len(chunks) <= 1:
+        return text
+    return _join_parts(map_parallel(summarize_part, chunks, parallelism))
+
+
+async def acondense_transcript(
+    text: str,
+    asummarize_part,
+    chunk_tokens: int = SUMMARY_CHUNK_TOKENS,
+    parallelism: int = SUMMARY_PARALLELISM,
+) -> str:
+    """Async `condense_transcript`; `asummarize_part` is a coroutine function."""
+    chunks = split_transcript(text, chunk_tokens)
+    if len(chunks) <= 1:
+        return text
+    semaphore = asyncio.Semaphore(parallelism)
+
+    async def summarize(chunk):
+        async with semaphore:
+            return await asummarize_part(chunk)
+
+    return _join_parts(await asyncio.gather(*(summarize(chunk) for chunk in chunks)))
+
+
+def _join_parts(summaries: List[str]) -> str:
+    return "\n\n".join(
+        f"Part {idx} of {len(summaries)} (summary):\n{summary}"
+        for idx, summary in enumerate(summaries, start=1)
+    )